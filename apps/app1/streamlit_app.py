@@ -1,4 +1,12 @@
 import streamlit as st
+import sys
+from pathlib import Path
+
+# Shared helpers live in apps/shared locally and next to the app on the stage
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+import perf_trace  # noqa: E402
+
+perf_trace.start_run("render")
 
 st.set_page_config(page_title="Hello Snowflake Streamlit", layout="centered")
 
@@ -6,3 +14,4 @@ st.title("👋 Hello, World!")
 st.write("This is your first Streamlit app running inside Snowflake.")
 
 st.success("You're all set to build something awesome.")
+perf_trace.finish()
@@ -1 +1,2 @@
 PUT file://../apps/app1/streamlit_app.py @APP1_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/shared/perf_trace.py @APP1_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
@@ -0,0 +1,118 @@
+"""Offset-indexed, streaming reader for the gallery catalog.
+
+The catalog may be a JSON array (apps.json as checked in) or JSON Lines,
+one app per line; the format is sniffed from the first byte. A scan parses
+one record at a time and remembers where each record sits in the file, so
+only the search fields and card keys stay in memory. Pages then read just
+their own records back from the file.
+"""
+import codecs
+import json
+import os
+import re
+import threading
+
+BLOCK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r"\s*")
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _scan_lines(f):
+    offset = 0
+    for line in f:
+        if line.strip():
+            yield offset, offset + len(line), json.loads(line)
+        offset += len(line)
+
+
+def _scan_array(f, block_size):
+    """(start, end, record) for each element of a top-level JSON array, read block by block"""
+    decoder = json.JSONDecoder()
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    text, pos, byte_pos = "", 0, 0  # byte_pos is the file offset of text[pos]
+    opened = eof = need_comma = False
+
+    def advance(new_pos):
+        nonlocal pos, byte_pos
+        byte_pos += len(text[pos:new_pos].encode("utf-8"))
+        pos = new_pos
+
+    while True:
+        advance(_WHITESPACE.match(text, pos).end())
+        if pos == len(text):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", text, pos)
+            block = f.read(block_size)
+            eof = not block
+            text = text[pos:] + decode(block, final=eof)
+            pos = 0
+            continue
+        if not opened:
+            if text[pos] != "[":
+                raise json.JSONDecodeError("Expecting '['", text, pos)
+            advance(pos + 1)
+            opened = True
+            continue
+        if text[pos] == "]":
+            return
+        if need_comma:
+            if text[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            advance(pos + 1)
+            need_comma = False
+            continue
+        try:
+            record, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Record straddles the block boundary: read on and retry
+            block = f.read(block_size)
+            eof = not block
+            text = text[pos:] + decode(block, final=eof)
+            pos = 0
+            continue
+        start = byte_pos
+        advance(end)
+        need_comma = True
+        yield start, byte_pos, record
+
+
+class Catalog:
+    """Record offsets of one catalog file version; records are read on demand"""
+
+    def __init__(self, path, block_size=BLOCK_SIZE, offsets=None):
+        """`offsets` from an earlier scan of the same file version skip the scan"""
+        self.path = path
+        self.block_size = block_size
+        self.offsets = list(offsets or [])
+        self.lock = threading.Lock()
+        # Kept open so pages read the version that was scanned even if the file is replaced
+        self.file = open(path, "rb")
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def scan(self):
+        """Yield every record once, in file order, recording its byte range"""
+        f = self.file
+        head = f.read(64).lstrip()
+        f.seek(0)
+        rows = _scan_array(f, self.block_size) if head.startswith(b"[") else _scan_lines(f)
+        for start, end, record in rows:
+            self.offsets.append((start, end))
+            yield record
+
+    def records(self, positions):
+        """Records at the given positions, parsed from their byte ranges"""
+        out = []
+        with self.lock:
+            for i in positions:
+                start, end = self.offsets[i]
+                self.file.seek(start)
+                out.append(json.loads(self.file.read(end - start)))
+        return out
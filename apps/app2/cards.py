@@ -0,0 +1,81 @@
+"""Gallery card HTML, cached per app so reruns only join ready-made fragments."""
+import collections
+import hashlib
+import html
+import json
+import threading
+
+FRAGMENT_CACHE_SIZE = 4096
+GRID_OPEN = '<div class="app-wrapper"><div class="app-grid">'
+GRID_CLOSE = '</div></div>'
+CacheInfo = collections.namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+def card_key(app):
+    """(identity, content hash) of an app entry; any edit to the entry changes the hash"""
+    payload = json.dumps(app, sort_keys=True, default=str).encode()
+    return app.get("url") or app.get("name", ""), hashlib.sha1(payload).hexdigest()
+
+
+def render_card(app, thumb_class):
+    app_name = html.escape(app.get("name", ""))
+    app_author = html.escape(app.get("author", ""))
+    app_url = html.escape(app.get("url", "#"))
+    source_url = html.escape(app.get("source_url", "#"))
+    app_desc = html.escape(app.get("description", ""))
+    theme = html.escape(str(app.get("theme", "#4A90E2")))
+    tags_html = " ".join([f"<span class='tag'>{html.escape(tag)}</span>" for tag in app.get("tags", [])])
+    new_badge_html = '<div class="new-badge">NEW</div>' if app.get("new", False) else "<div></div>"
+    return (
+        f'<div class="app-card" style="--hover-border-color: {theme}">'
+        f'<a href="{app_url}" target="_blank" rel="noopener noreferrer" style="text-decoration:none; color:inherit;">'
+        f'<div style="position: relative;">'
+        f'<div class="app-thumb {thumb_class}" role="img" aria-label="{app_name} preview"></div>'
+        f'{new_badge_html}'
+        f'</div>'
+        f'<div class="app-content">'
+        f'<div class="app-name">{app_name}</div>'
+        f'<div class="app-author">{app_author}</div>'
+        f'<div class="app-description">{app_desc}</div>'
+        f'<div class="app-tags">{tags_html}</div>'
+        f'<a href="{source_url}" class="app-link" target="_blank" rel="noopener noreferrer">View source →</a>'
+        f'</div>'
+        f'</a>'
+        f'</div>'
+    )
+
+
+class FragmentCache:
+    """Process-wide LRU of escaped card HTML keyed by (card_key, thumbnail class)"""
+
+    def __init__(self, maxsize=FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.fragments = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self.fragments))
+
+    def card(self, app, key, thumb_class):
+        cache_key = (key, thumb_class)
+        with self.lock:
+            fragment = self.fragments.get(cache_key)
+            if fragment is not None:
+                self.fragments.move_to_end(cache_key)
+                self.hits += 1
+                return fragment
+        fragment = render_card(app, thumb_class)
+        with self.lock:
+            self.misses += 1
+            self.fragments[cache_key] = fragment
+            while len(self.fragments) > self.maxsize:
+                self.fragments.popitem(last=False)
+        return fragment
+
+
+fragment_cache = FragmentCache()
+
+
+def grid_html(fragments):
+    return GRID_OPEN + "".join(fragments) + GRID_CLOSE
@@ -0,0 +1,71 @@
+"""Gallery startup structures: catalog offsets, card keys and search index.
+
+They are built in one streaming pass over the catalog file, or loaded from
+the `<catalog>.index` file the deploy bundle step precomputes for the exact
+catalog bytes it ships. The prebuilt file is a zlib-compressed pickle
+written by our own build; it is only used when its recorded SHA-256
+matches the catalog.
+"""
+import os
+import pickle
+import sys
+import zlib
+from pathlib import Path
+
+from app_catalog import Catalog
+from cards import card_key
+from search_index import SearchIndex
+
+# Shared helpers live in apps/shared locally and next to the app on the stage
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from hashing import content_hash  # noqa: E402
+
+INDEX_SUFFIX = ".index"
+# Bump when the pickled layout of Catalog offsets or SearchIndex (or what it matches) changes
+INDEX_FORMAT = "2"
+
+
+def build(path):
+    """(catalog, card keys, search index) from one streaming scan of the catalog"""
+    catalog = Catalog(path)
+    card_keys = []
+
+    def records():
+        for app in catalog.scan():
+            card_keys.append(card_key(app))
+            yield app
+
+    return catalog, card_keys, SearchIndex(records())
+
+
+def write_prebuilt(path, gallery, index_path=None):
+    """Save a built gallery next to its catalog (or at `index_path`)"""
+    catalog, card_keys, search_index = gallery
+    payload = {
+        "format": INDEX_FORMAT,
+        "source_sha256": content_hash(path),
+        "offsets": catalog.offsets,
+        "card_keys": card_keys,
+        "search_index": search_index,
+    }
+    with open(index_path or str(path) + INDEX_SUFFIX, "wb") as f:
+        f.write(zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)))
+
+
+def read_prebuilt(path):
+    """The prebuilt gallery for this exact catalog file, or None"""
+    index_path = str(path) + INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, "rb") as f:
+            payload = pickle.loads(zlib.decompress(f.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if payload.get("format") != INDEX_FORMAT or payload.get("source_sha256") != content_hash(path):
+        return None
+    return Catalog(path, offsets=payload["offsets"]), payload["card_keys"], payload["search_index"]
+
+
+def load(path):
+    return read_prebuilt(path) or build(path)
@@ -0,0 +1,154 @@
+"""Card preview images: thumbnails, an LRU cache and per-page deduplication.
+
+Each image is resized once to the card height and encoded (WebP when
+Pillow supports it), then cached by (path, mtime, size) so edits to the
+file are picked up. A page embeds every distinct image once as a CSS class
+and cards refer to that class, so a preview shared by many apps costs one
+copy per page. When Streamlit static serving is enabled, thumbnails are
+written under ./static/thumbs and referenced by URL instead of inlined.
+"""
+import base64
+import functools
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import streamlit as st
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow missing: images are embedded at full size
+    Image = None
+
+CARD_HEIGHT = 180
+CACHE_SIZE = 256
+PLACEHOLDER_URL = "https://via.placeholder.com/300x180?text=No+Preview"
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_URL = "app/static"
+MIME_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif",
+              ".webp": "image/webp", ".svg": "image/svg+xml"}
+
+
+class Asset:
+    """An encoded image plus the CSS class cards use to show it"""
+
+    def __init__(self, data, mime):
+        self.data = data
+        self.mime = mime
+        self.digest = hashlib.sha1(data).hexdigest()[:12]
+        self.css_class = f"thumb-{self.digest}"
+        self._data_uri = None
+
+    @property
+    def data_uri(self):
+        if self._data_uri is None:
+            self._data_uri = f"data:{self.mime};base64,{base64.b64encode(self.data).decode()}"
+        return self._data_uri
+
+
+def thumbnail(data, height=CARD_HEIGHT):
+    """(bytes, mime) of `data` scaled down to `height`, or None if it can't be decoded"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            if img.height > height:
+                width = max(1, round(img.width * height / img.height))
+                img = img.resize((width, height), Image.LANCZOS)
+            out = io.BytesIO()
+            if features.check("webp"):
+                img.save(out, "WEBP", quality=80, method=4)
+                return out.getvalue(), "image/webp"
+            if img.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                img = img.convert("RGBA")
+            img.save(out, "PNG", optimize=True)
+            return out.getvalue(), "image/png"
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _load(path, mtime_ns, size, height):
+    with open(path, "rb") as f:
+        data = f.read()
+    thumb = thumbnail(data, height)
+    if thumb is None or len(thumb[0]) >= len(data):
+        return Asset(data, MIME_TYPES.get(Path(path).suffix.lower(), "application/octet-stream"))
+    return Asset(*thumb)
+
+
+def load_asset(img_path, height=CARD_HEIGHT):
+    """Cached thumbnail for an image path relative to the app, or None if missing"""
+    img_file = Path(__file__).parent / img_path
+    try:
+        stat = img_file.stat()
+    except (OSError, ValueError):
+        return None
+    if not img_file.is_file():
+        return None
+    return _load(str(img_file), stat.st_mtime_ns, stat.st_size, height)
+
+
+def cache_info():
+    """Hits and misses of the thumbnail cache"""
+    return _load.cache_info()
+
+
+def static_serving():
+    """True when Streamlit serves ./static, so thumbnails can be linked instead of inlined"""
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except RuntimeError:
+        return False
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _publish(asset):
+    """URL of `asset` under ./static/thumbs, writing the file once; None if not writable"""
+    ext = asset.mime.split("/")[-1].replace("svg+xml", "svg").replace("jpeg", "jpg")
+    name = f"{asset.digest}.{ext}"
+    target = STATIC_DIR / "thumbs" / name
+    try:
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{name}.{os.getpid()}")
+            tmp.write_bytes(asset.data)
+            os.replace(tmp, target)
+    except OSError:
+        return None
+    return f"{STATIC_URL}/thumbs/{name}"
+
+
+def asset_url(asset, use_static=None):
+    if use_static is None:
+        use_static = static_serving()
+    return (use_static and _publish(asset)) or asset.data_uri
+
+
+class PageImages:
+    """Distinct images used on one rendered page, each emitted once as a CSS rule"""
+
+    PLACEHOLDER_CLASS = "thumb-placeholder"
+
+    def __init__(self, use_static=None):
+        self.use_static = static_serving() if use_static is None else use_static
+        self.assets = {}
+
+    def css_class(self, img_path):
+        """Class that shows `img_path` as a card preview"""
+        asset = load_asset(img_path) if img_path else None
+        if asset is None:
+            self.assets.setdefault(self.PLACEHOLDER_CLASS, None)
+            return self.PLACEHOLDER_CLASS
+        self.assets.setdefault(asset.css_class, asset)
+        return asset.css_class
+
+    def style(self):
+        """<style> block with one background-image rule per distinct image"""
+        rules = []
+        for css_class, asset in self.assets.items():
+            url = PLACEHOLDER_URL if asset is None else asset_url(asset, self.use_static)
+            rules.append(f".{css_class} {{ background-image: url('{url}'); }}")
+        return "<style>\n" + "\n".join(rules) + "\n</style>" if rules else ""
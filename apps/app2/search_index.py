@@ -0,0 +1,197 @@
+"""Inverted index behind the gallery search box and tag filter.
+
+Membership follows the gallery's matching rules: the (lowercased) query is
+a substring of the app's name, author or one of its tags, and an app
+passes the tag filter when it has any selected tag. Substrings are found
+through 1-3 character n-gram postings, verified exactly for longer
+queries. Matches are ranked by how well query words hit word starts in
+each field, heaviest for the name; the description only adds to the
+rank, it never makes an app match. Ties keep catalog order.
+"""
+import bisect
+import functools
+import itertools
+import operator
+import re
+
+import numpy as np
+import pandas as pd
+
+# Fields whose words rank the matches; only name, author and tags decide whether an app matches
+RANK_FIELDS = ["name", "author", "description", "tags"]
+FIELD_WEIGHTS = {"name": 8.0, "tags": 4.0, "author": 2.0, "description": 1.0}
+EXACT_BONUS = 2.0  # a query word equal to a whole field word counts this many times over a prefix hit
+MAX_GRAM = 3
+QUERY_CACHE_SIZE = 512
+FLUSH_PAIRS = 500_000  # (key, position) pairs buffered before they are folded into postings
+TOKEN_RE = re.compile(r"\w+")
+FIELD_SEPARATOR = "\x1f"  # not NUL: pandas' string hashing stops at NUL bytes
+
+
+def field_texts(app):
+    tags = app.get("tags", []) or []
+    return {
+        "name": str(app.get("name", "") or ""),
+        "author": str(app.get("author", "") or ""),
+        "description": str(app.get("description", "") or ""),
+        "tags": " ".join(str(t) for t in tags),
+    }
+
+
+def ngrams(text):
+    """Distinct substrings of `text` of length 1 to MAX_GRAM"""
+    grams = set(text)
+    grams.update(map(operator.add, text, text[1:]))
+    grams.update(map("".join, zip(text, text[1:], text[2:])))
+    return grams
+
+
+class PostingsBuilder:
+    """Collects (key, position) pairs in ascending position order, in bounded batches"""
+
+    def __init__(self):
+        self.keys, self.owners = [], []
+        self.parts = {}
+
+    def add(self, keys, position):
+        self.keys.extend(keys)
+        self.owners.extend(itertools.repeat(position, len(keys)))
+        if len(self.keys) >= FLUSH_PAIRS:
+            self.flush()
+
+    def flush(self):
+        if not self.keys:
+            return
+        codes, uniques = pd.factorize(pd.Series(self.keys, dtype=object), sort=False)
+        order = np.argsort(codes, kind="stable")
+        owners = np.asarray(self.owners, dtype=np.int32)[order]
+        bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+        for key, postings in zip(uniques.tolist(), np.split(owners, bounds)):
+            self.parts.setdefault(key, []).append(postings)
+        self.keys, self.owners = [], []
+
+    def build(self):
+        """key -> ascending int32 positions"""
+        self.flush()
+        return {key: parts[0] if len(parts) == 1 else np.concatenate(parts) for key, parts in self.parts.items()}
+
+
+def pack_postings(table):
+    """Postings as (keys, lengths, gaps): ascending positions store small gaps that compress well"""
+    keys = list(table)
+    arrays = [table[key] for key in keys]
+    lengths = np.array([len(a) for a in arrays], dtype=np.int64)
+    gaps = np.concatenate([np.diff(a, prepend=0) for a in arrays]) if arrays else np.empty(0)
+    return keys, lengths, gaps.astype(np.int32)
+
+
+def unpack_postings(packed):
+    keys, lengths, gaps = packed
+    parts = np.split(gaps, np.cumsum(lengths)[:-1]) if len(keys) else []
+    return {key: np.cumsum(part, dtype=np.int32) for key, part in zip(keys, parts)}
+
+
+class SearchIndex:
+    """Immutable search structures for one apps.json version"""
+
+    def __init__(self, apps):
+        """`apps` may be any iterable of app dicts; it is consumed once"""
+        grams = PostingsBuilder()
+        tokens = {field: PostingsBuilder() for field in RANK_FIELDS}
+        tag_members = {}
+        self.haystacks = []
+        for i, app in enumerate(apps):
+            texts = field_texts(app)
+            tags = [str(t) for t in app.get("tags", []) or []]
+            # Name, author and tags are joined with a control character so no match spans two of them
+            haystack = FIELD_SEPARATOR.join([texts["name"], texts["author"]] + tags).lower()
+            self.haystacks.append(haystack)
+            grams.add(ngrams(haystack), i)
+            for field in RANK_FIELDS:
+                tokens[field].add(set(TOKEN_RE.findall(texts[field].lower())), i)
+            for tag in set(tags):
+                tag_members.setdefault(tag, []).append(i)
+        self.size = len(self.haystacks)
+        self.grams = grams.build()
+        self.tokens = {field: builder.build() for field, builder in tokens.items()}
+        self.sorted_tokens = {field: sorted(table) for field, table in self.tokens.items()}
+        self.tags = sorted(tag_members)
+        self.tag_bits = {tag: self._bitset(np.asarray(ids)) for tag, ids in tag_members.items()}
+        self._match = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._match_uncached)
+
+    def __getstate__(self):
+        # Postings are gap-encoded; the sorted token lists and the query cache are rebuilt on load
+        state = dict(self.__dict__)
+        del state["_match"], state["sorted_tokens"]
+        state["grams"] = pack_postings(self.grams)
+        state["tokens"] = {field: pack_postings(table) for field, table in self.tokens.items()}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.grams = unpack_postings(state["grams"])
+        self.tokens = {field: unpack_postings(packed) for field, packed in state["tokens"].items()}
+        self.sorted_tokens = {field: sorted(table) for field, table in self.tokens.items()}
+        self._match = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._match_uncached)
+
+    def cache_info(self):
+        """Hits and misses of the query cache"""
+        return self._match.cache_info()
+
+    def _bitset(self, positions):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return np.packbits(mask)
+
+    def _candidates(self, query):
+        if len(query) <= MAX_GRAM:
+            return self.grams.get(query, np.empty(0, dtype=np.int32))
+        lists = []
+        for gram in {query[j:j + MAX_GRAM] for j in range(len(query) - MAX_GRAM + 1)}:
+            postings = self.grams.get(gram)
+            if postings is None:
+                return np.empty(0, dtype=np.int32)
+            lists.append(postings)
+        lists.sort(key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
+
+    def _match_uncached(self, query):
+        """(sorted positions, scores) for a non-empty lowercased query"""
+        candidates = self._candidates(query)
+        if len(query) > MAX_GRAM:
+            candidates = np.array([i for i in candidates.tolist() if query in self.haystacks[i]], dtype=np.int32)
+        scores = np.zeros(self.size, dtype=np.float32)
+        for word in TOKEN_RE.findall(query):
+            for field, weight in FIELD_WEIGHTS.items():
+                keys = self.sorted_tokens[field]
+                postings = self.tokens[field]
+                lo = bisect.bisect_left(keys, word)
+                hi = bisect.bisect_left(keys, word + "\U0010ffff")
+                for token in keys[lo:hi]:
+                    scores[postings[token]] += weight * (EXACT_BONUS if token == word else 1.0)
+        return candidates, scores[candidates]
+
+    def search(self, query="", tags=()):
+        """Positions of matching apps, best match first"""
+        if query:
+            positions, scores = self._match(query.lower())
+        else:
+            positions, scores = np.arange(self.size), None
+        if tags:
+            # Apps with any selected tag: OR the tag bitsets, then intersect with the matches
+            bitsets = [self.tag_bits[t] for t in set(tags) if t in self.tag_bits]
+            if not bitsets:
+                return []
+            allowed = np.unpackbits(np.bitwise_or.reduce(bitsets), count=self.size).astype(bool)
+            keep = allowed[positions]
+            positions = positions[keep]
+            if scores is not None:
+                scores = scores[keep]
+        if scores is not None and len(positions):
+            positions = positions[np.argsort(-scores, kind="stable")]
+        return positions.tolist()
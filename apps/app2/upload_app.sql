@@ -1,3 +1,11 @@
 PUT file://../apps/app2/streamlit_app.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/app_catalog.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/cards.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/image_cache.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/search_index.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/gallery_index.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app2/gallery.css @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/shared/perf_trace.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/shared/hashing.py @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
 PUT file://../apps/app2/apps.json @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
 PUT file://../apps/app2/preview.png @APP2_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
\ No newline at end of file
@@ -0,0 +1,76 @@
+import pandas as pd
+
+# Columns with more distinct values than this get a search box instead of a full option list
+MAX_OPTIONS = 200
+
+
+class ValueCatalog:
+    """Distinct values and counts per column, plus incident_id -> incident_number.
+
+    Built once per data version (columns lazily, on first use) and kept
+    current on save with `record_changes`, so widgets never rescan the
+    frame to list their options.
+    """
+
+    def __init__(self, df):
+        self.counts = {}
+        self.numbers = dict(zip(df["incident_id"].tolist(), df["incident_number"].tolist()))
+
+    def _counts(self, df, col):
+        counts = self.counts.get(col)
+        if counts is None:
+            counts = df[col].value_counts(dropna=True)
+            counts = {k: int(v) for k, v in counts.items() if v > 0}
+            self.counts[col] = counts
+        return counts
+
+    def values(self, df, col):
+        """Distinct non-null values of `col`, sorted by label"""
+        return sorted(self._counts(df, col), key=str)
+
+    def count(self, df, col, value):
+        return self._counts(df, col).get(value, 0)
+
+    def cardinality(self, df, col):
+        return len(self._counts(df, col))
+
+    def search(self, df, col, query="", limit=MAX_OPTIONS):
+        """Most frequent values of `col` containing `query` (case-insensitive)"""
+        query = query.strip().lower()
+        counts = self._counts(df, col)
+        matches = [v for v in counts if query in str(v).lower()] if query else list(counts)
+        matches.sort(key=lambda v: (-counts[v], str(v)))
+        return matches[:limit]
+
+    def copy(self, columns=()):
+        """Copy whose counts for `columns` can be changed without touching this one"""
+        new = ValueCatalog.__new__(ValueCatalog)
+        new.counts = {col: dict(c) if col in columns else c for col, c in self.counts.items()}
+        new.numbers = self.numbers
+        return new
+
+    def incident_label(self, incident_id):
+        return f"ID {incident_id} - {self.numbers.get(incident_id, '?')}"
+
+    def record_changes(self, df, deltas):
+        """Move counts from the current cell values in `df` to the delta values.
+
+        Call before the deltas are applied to `df`.
+        """
+        if not len(deltas):
+            return
+        rows = pd.Index(df["incident_id"]).get_indexer(deltas["incident_id"])
+        for col, group in deltas.assign(row=rows)[rows >= 0].groupby("column", sort=False):
+            counts = self.counts.get(col)
+            if counts is None:
+                continue
+            for old in df[col].iloc[group["row"].to_numpy()].tolist():
+                if pd.isna(old) or old not in counts:
+                    continue
+                counts[old] -= 1
+                if counts[old] == 0:
+                    del counts[old]
+            for new in group["value"].tolist():
+                if new is None or pd.isna(new):
+                    continue
+                counts[new] = counts.get(new, 0) + 1
@@ -0,0 +1,152 @@
+import contextlib
+import datetime
+import json
+import os
+
+import pandas as pd
+
+from incident_data import (
+    atomic_write,
+    file_signature,
+    load_incidents,
+    save_incidents,
+    set_cells,
+)
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks on this platform, appends stay single-write
+    fcntl = None
+
+LOG_SUFFIX = ".changes.jsonl"
+# Fold the log into the snapshot once it grows past this many bytes
+COMPACT_THRESHOLD_BYTES = 4 * 1024 * 1024
+
+
+def log_path(path):
+    return str(path) + LOG_SUFFIX
+
+
+def store_signature(path):
+    """Version of snapshot + change log, changes on every save or compaction"""
+    log = log_path(path)
+    return (file_signature(path), file_signature(log) if os.path.exists(log) else None)
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Exclusive lock shared by appends and compaction of one data file"""
+    if fcntl is None:
+        yield
+        return
+    with open(str(path) + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _json_value(val):
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return None
+    if isinstance(val, (pd.Timestamp, datetime.datetime)):
+        return val.isoformat()
+    if hasattr(val, "item"):  # numpy scalars
+        return val.item()
+    return val
+
+
+def iter_deltas(deltas):
+    """(incident_id, column, value) triples from a delta frame or a list"""
+    if isinstance(deltas, pd.DataFrame):
+        return deltas[["incident_id", "column", "value"]].itertuples(index=False, name=None)
+    return iter(deltas)
+
+
+def write_changes(path, deltas, user=None):
+    """Append one batch of deltas; the caller must hold `locked(path)`.
+
+    The batch is written as a single JSON line with one write call and
+    fsync'd, so a crash leaves at most a torn last line that replay skips.
+    """
+    cells = [[_json_value(eid), col, _json_value(val)] for eid, col, val in iter_deltas(deltas)]
+    if not cells:
+        return 0
+    entry = {
+        "at": datetime.datetime.now().isoformat(),
+        "by": user,
+        "changes": cells,
+    }
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+    fd = os.open(log_path(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return len(entry["changes"])
+
+
+def read_changes_from(path, offset=0):
+    """Deltas logged at or after byte `offset`, plus the offset to continue from.
+
+    Only complete lines are consumed, so an append still in flight is
+    picked up by the next call.
+    """
+    log = log_path(path)
+    if not os.path.exists(log):
+        return [], 0
+    with open(log, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    complete = data.rfind(b"\n") + 1
+    cells = []
+    for line in data[:complete].splitlines():
+        try:
+            cells.extend(json.loads(line)["changes"])
+        except (ValueError, KeyError):
+            continue  # torn write from a crash mid-append
+    return cells, offset + complete
+
+
+def read_changes(path):
+    """All logged cell deltas, in the order they were written"""
+    return read_changes_from(path)[0]
+
+
+def apply_changes(df, cells):
+    """Apply (incident_id, column, value) deltas to `df` in place.
+
+    Later deltas win over earlier ones for the same cell, and each column
+    is assigned in one call regardless of how many incidents it touches.
+    """
+    if len(cells) == 0:
+        return df
+    if isinstance(cells, pd.DataFrame):
+        deltas = cells[["incident_id", "column", "value"]]
+    else:
+        deltas = pd.DataFrame(cells, columns=["incident_id", "column", "value"])
+    deltas = deltas.drop_duplicates(["incident_id", "column"], keep="last")
+    deltas = deltas[deltas["column"].isin(df.columns)]
+    rows = pd.Index(df["incident_id"]).get_indexer(deltas["incident_id"])
+    deltas = deltas.assign(row=rows)[rows >= 0]
+    for col, group in deltas.groupby("column", sort=False):
+        set_cells(df, group["row"].to_numpy(), col, group["value"])
+    return df
+
+
+def log_size(path):
+    log = log_path(path)
+    return os.path.getsize(log) if os.path.exists(log) else 0
+
+
+def fold_log(path):
+    """Fold the change log into the base snapshot; the caller must hold `locked(path)`"""
+    cells = read_changes(path)
+    if not cells:
+        return 0
+    df = apply_changes(load_incidents(path), cells)
+    save_incidents(df, path)
+    atomic_write(log_path(path), lambda f: None)
+    return len(cells)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from incident_data import ID_COLUMNS, coerce_column, coerce_value
+
+DELTA_COLUMNS = ["incident_id", "column", "value"]
+
+
+def is_blank(values):
+    """None, NaN, NaT and "" are never written over an existing value"""
+    blank = values.isna()
+    if values.dtype == object:
+        blank |= values.eq("")
+    return blank.to_numpy()
+
+
+def diff_edits(original, edited, columns):
+    """Changed cells between two frames keyed by incident_id.
+
+    A cell counts as changed when the edited value is not blank and either
+    the original is missing or differs, which is the rule the row-by-row
+    save loop applied. Returns a long frame of (incident_id, column, value).
+    """
+    orig = original.set_index("incident_id")
+    new = edited.set_index("incident_id")
+    ids = new.index.intersection(orig.index)
+    orig = orig.loc[ids]
+    new = new.loc[ids]
+    parts = []
+    for col in columns:
+        if col in ID_COLUMNS or col not in new.columns:
+            continue
+        new_vals = coerce_column(col, new[col])
+        old_vals = orig[col]
+        old_missing = old_vals.isna().to_numpy()
+        if new_vals.dtype == object:  # text and categorical columns compare as str
+            old_vals = old_vals.astype(object)
+        # Only cells that differ (or had no value) can change; check blanks on those
+        candidates = np.flatnonzero((new_vals != old_vals).to_numpy() | old_missing)
+        candidate_vals = new_vals.iloc[candidates]
+        keep = ~is_blank(candidate_vals)
+        if keep.any():
+            parts.append(pd.DataFrame({
+                "incident_id": ids[candidates[keep]],
+                "column": col,
+                "value": candidate_vals.to_numpy(dtype=object)[keep],
+            }))
+    if not parts:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def bulk_edit_deltas(df, incident_ids, values):
+    """Cells that setting `values` ({column: value}) on `incident_ids` changes.
+
+    Mirrors the form's rules: blank inputs are skipped, values are cast to
+    the column type, and a cell changes when it is missing or differs. The
+    ids are resolved to row positions once and each column is compared in
+    a single vectorized pass.
+    """
+    rows = pd.Index(df["incident_id"]).get_indexer(incident_ids)
+    rows = rows[rows >= 0]
+    ids = df["incident_id"].to_numpy()
+    parts = []
+    for col, val in values.items():
+        if col in ID_COLUMNS or col not in df.columns:
+            continue
+        if isinstance(val, str) and val.strip() == "":
+            continue
+        val = coerce_value(col, val)
+        if val is None:
+            continue
+        old_vals = df[col].iloc[rows]
+        if old_vals.dtype.kind not in "fM":
+            old_vals = old_vals.astype(object)
+        changed = (old_vals.isna() | (old_vals != val)).to_numpy()
+        if changed.any():
+            parts.append(pd.DataFrame({
+                "incident_id": ids[rows[changed]],
+                "column": col,
+                "value": [val] * int(changed.sum()),
+            }))
+    if not parts:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
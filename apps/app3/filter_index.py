@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# Past this share of the rows, scanning a mask beats sorting merged positions
+DENSE_FRACTION = 0.1
+
+
+class ValueIndex:
+    """Rows of one column grouped by value: sorted position lists per code.
+
+    `order[offsets[c + 1]:offsets[c + 2]]` are the ascending row positions
+    holding dictionary code `c`; slot 0 holds the nulls.
+    """
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.uniques = pd.Index(uniques)
+        self.codes = codes
+        # Stable sort on small ints is a radix sort, so this stays linear
+        self.order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes.astype(np.int64) + 1, minlength=len(uniques) + 1)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _codes_for(self, values):
+        codes = self.uniques.get_indexer(pd.Index(list(values)))
+        return np.unique(codes[codes >= 0])
+
+    def count(self, values):
+        codes = self._codes_for(values)
+        return int((self.offsets[codes + 2] - self.offsets[codes + 1]).sum())
+
+    def positions(self, values):
+        codes = self._codes_for(values)
+        if len(codes) > 1 and self.count(values) > DENSE_FRACTION * len(self.codes):
+            return np.flatnonzero(self.contains(slice(None), values))
+        parts = [self.order[self.offsets[c + 1]:self.offsets[c + 2]] for c in codes]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def contains(self, positions, values):
+        lookup = np.zeros(len(self.uniques) + 1, dtype=bool)
+        lookup[self._codes_for(values)] = True  # trailing slot stays False for nulls (-1)
+        return lookup[self.codes[positions]]
+
+
+class DateRangeIndex:
+    """Sorted timestamps of one datetime column for range lookups"""
+
+    def __init__(self, series):
+        # NaT is the smallest int64, so it sorts first and never matches a range
+        self.values = series.to_numpy(dtype="datetime64[ns]").view("i8")
+        self.order = np.argsort(self.values, kind="stable")
+        self.sorted = self.values[self.order]
+
+    @staticmethod
+    def _bounds(start, end):
+        return pd.Timestamp(start).value, pd.Timestamp(end).value
+
+    def _slice(self, start, end):
+        lo, hi = self._bounds(start, end)
+        return (np.searchsorted(self.sorted, lo, side="left"),
+                np.searchsorted(self.sorted, hi, side="right"))
+
+    def count(self, start, end):
+        left, right = self._slice(start, end)
+        return int(right - left)
+
+    def positions(self, start, end):
+        left, right = self._slice(start, end)
+        if right - left > DENSE_FRACTION * len(self.values):
+            return np.flatnonzero(self.contains(slice(None), start, end))
+        return np.sort(self.order[left:right])
+
+    def contains(self, positions, start, end):
+        lo, hi = self._bounds(start, end)
+        vals = self.values[positions]
+        return (vals >= lo) & (vals <= hi)
+
+
+class FilterIndex:
+    """Precomputed per-column indexes answering the sidebar filters.
+
+    Indexes are built lazily the first time a column is filtered and kept
+    until `invalidate` drops them after an edit to that column. `query`
+    combines all active predicates, starting from the most selective one
+    and only checking the surviving rows against the rest.
+    """
+
+    def __init__(self):
+        self.indexes = {}
+
+    def _index(self, df, col, kind):
+        index = self.indexes.get((kind, col))
+        if index is None:
+            index = kind(df[col])
+            self.indexes[(kind, col)] = index
+        return index
+
+    def copy(self):
+        """New index sharing the already built (immutable) column indexes"""
+        new = FilterIndex()
+        new.indexes = dict(self.indexes)
+        return new
+
+    def invalidate(self, columns):
+        for key in [key for key in self.indexes if key[1] in columns]:
+            del self.indexes[key]
+
+    def query(self, df, mask=None, isin=None, date_ranges=None):
+        """Ascending row positions of `df` matching every given predicate.
+
+        `mask` is a precomputed boolean row mask, `isin` holds (column,
+        accepted values) pairs (a dict works too) and `date_ranges` maps
+        datetime columns to inclusive (start, end) bounds. Empty value lists
+        are ignored like in the UI.
+        """
+        if isinstance(isin, dict):
+            isin = isin.items()
+        predicates = []
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            predicates.append((
+                int(mask.sum()),
+                lambda: np.flatnonzero(mask),
+                lambda pos: mask[pos],
+            ))
+        for col, values in isin or []:
+            if len(values) == 0:
+                continue
+            index = self._index(df, col, ValueIndex)
+            predicates.append((
+                index.count(values),
+                lambda index=index, values=values: index.positions(values),
+                lambda pos, index=index, values=values: index.contains(pos, values),
+            ))
+        for col, (start, end) in (date_ranges or {}).items():
+            index = self._index(df, col, DateRangeIndex)
+            predicates.append((
+                index.count(start, end),
+                lambda index=index, start=start, end=end: index.positions(start, end),
+                lambda pos, index=index, start=start, end=end: index.contains(pos, start, end),
+            ))
+        if not predicates:
+            return np.arange(len(df))
+        predicates.sort(key=lambda p: p[0])
+        positions = predicates[0][1]()
+        for _, _, contains in predicates[1:]:
+            if len(positions) == 0:
+                break
+            positions = positions[contains(positions)]
+        return positions
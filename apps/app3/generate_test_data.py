@@ -1,20 +1,27 @@
-import pandas as pd
-import numpy as np
-import random
+"""Generate synthetic incidents for the dashboard, from a handful to millions.
+
+Rows are generated in vectorized chunks (optionally across processes) and
+streamed to disk, so memory stays bounded by the chunk size.
+
+Examples:
+    python generate_test_data.py                      # 100 rows -> data.json
+    python generate_test_data.py -n 5000000 --format jsonl -o incidents.jsonl --workers 8
+"""
+import argparse
+import collections
+import concurrent.futures
 import datetime
-import json, os
+import json
+import os
 
-N = 100
+import numpy as np
+import pandas as pd
+
+from taxonomy import FAILURE_CATEGORIES, FAILURE_SUB_CATEGORIES
 
 custodian_teams = ["Network", "Database", "Application", "Security", "DevOps", "Support"]
-failure_categories = ["Hardware", "Software", "Security", "Network", "Database"]
-failure_sub_categories = {
-    "Hardware": ["Router", "Switch", "Server", "Disk"],
-    "Software": ["API Outage", "Database Crash", "Firmware", "Service Down"],
-    "Security": ["Unauthorized Access", "Phishing", "Malware", "DDoS"],
-    "Network": ["Latency", "Packet Loss", "Link Down"],
-    "Database": ["Corruption", "Slow Query", "Crash"]
-}
+failure_categories = FAILURE_CATEGORIES
+failure_sub_categories = FAILURE_SUB_CATEGORIES
 failure_caused_by_list = ["Power Surge", "Bug", "Human Error", "Out of Memory", "Compromised Credentials", "Deployment Error", "Phishing Attack", "Network Issue"]
 failure_reasons = ["Overvoltage", "Memory Leak", "High query load", "Misconfigured env", "Phishing", "Firmware Bug", "Network Congestion", "Disk Full"]
 action_taken = ["Replaced Router", "Restarted Database", "Rolled Back Deployment", "Reset Credentials", "Patched Firmware", "Blocked Access", "Scaled Resources", "Restored Backup"]
@@ -32,83 +39,187 @@ comments_samples = [
 ]
 users = ["alice", "bob", "carol", "dave", "eve", "frank", "grace", "heidi"]
 
-def random_datetime(start, end):
-    """Generate a random datetime between start and end"""
-    return start + datetime.timedelta(
-        seconds=random.randint(0, int((end - start).total_seconds()))
-    )
-
 start_date = datetime.datetime(2021, 1, 1)
 end_date = datetime.datetime(2025, 7, 28)
 
-data = []
-for i in range(1, N+1):
-    fc = random.choice(failure_categories)
-    fsc = random.choice(failure_sub_categories[fc])
-    incident_id = i
-    incident_number = f"INC{1000+i}"
-    custodian_team = random.choice(custodian_teams)
-    failure_category = fc
-    failure_sub_category = fsc
-    failure_caused_by = random.choice(failure_caused_by_list)
-    failure_reason = random.choice(failure_reasons)
-    action_taken_val = random.choice(action_taken)
-    action_category_val = random.choice(action_category)
-    actual_time_spent = round(random.uniform(10, 120), 2) if random.random() > 0.05 else None
-    parent_incident_number = f"INC{random.randint(1001, 1000+N)}" if random.random() < 0.1 else ""
-    prior_notification_val = random.choice(prior_notification)
-    created_on = random_datetime(start_date, end_date)
-    updated_on = (created_on + datetime.timedelta(minutes=random.randint(1, 120))).isoformat()
-    created_on = (created_on).isoformat()
-    created_by = random.choice(users)
-    updated_by = random.choice(users)
-    comments = random.choice(comments_samples) if random.random() > 0.1 else ""
-
-    # --- Tagged/untagged logic ---
-    # About half tagged, half untagged
-    if random.random() < 0.9:
-        # Tagged: at least one field is filled
-        tagged = True
-    else:
-        # Untagged: most fields are empty or None
-        custodian_team = ""
-        failure_category = ""
-        failure_sub_category = ""
-        failure_caused_by = ""
-        failure_reason = ""
-        action_taken_val = ""
-        action_category_val = ""
-        actual_time_spent = None
-        parent_incident_number = ""
-        prior_notification_val = ""
-        created_by = ""
-        updated_by = ""
-        comments = ""
-        tagged = False
-        created_on = None
-        updated_on = None
-
-    data.append({
-        "incident_id": incident_id,
-        "incident_number": incident_number,
-        "custodian_team": custodian_team,
-        "failure_category": failure_category,
-        "failure_sub_category": failure_sub_category,
-        "failure_caused_by": failure_caused_by,
-        "failure_reason": failure_reason,
-        "action_taken": action_taken_val,
-        "action_category": action_category_val,
-        "actual_time_spent_in_minutes": actual_time_spent,
-        "parent_incident_number": parent_incident_number,
-        "prior_notification": prior_notification_val,
-        "record_created_on": created_on,
-        "record_created_by": created_by,
-        "record_updated_on": updated_on,
-        "record_updated_by": updated_by,
-        "comments": comments,
-        "tagged": tagged
+# Columns blanked out on untagged incidents
+UNTAGGED_BLANK = [
+    "custodian_team", "failure_category", "failure_sub_category", "failure_caused_by",
+    "failure_reason", "action_taken", "action_category", "parent_incident_number",
+    "prior_notification", "record_created_by", "record_updated_by", "comments",
+]
+FORMATS = ["json", "json-compact", "jsonl", "parquet"]
+
+
+def pick(rng, options, size):
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), size)]
+
+
+def generate_chunk(first_id, size, total, seed, tagged_ratio, time_null_rate,
+                   parent_rate, comment_null_rate):
+    """Incidents `first_id`..`first_id + size - 1` as a DataFrame.
+
+    Each chunk draws from its own generator seeded by (seed, first_id), so
+    for a given seed and chunk size the output does not depend on how many
+    workers produced it.
+    """
+    rng = np.random.default_rng([seed, first_id])
+    ids = np.arange(first_id, first_id + size)
+
+    # Sub-category is drawn within the chosen category
+    category_idx = rng.integers(0, len(failure_categories), size)
+    sub_lists = [failure_sub_categories[c] for c in failure_categories]
+    sub_lens = np.array([len(s) for s in sub_lists])
+    sub_idx = (rng.random(size) * sub_lens[category_idx]).astype(int)
+    sub_table = np.array([s + [""] * (sub_lens.max() - len(s)) for s in sub_lists], dtype=object)
+
+    seconds = rng.integers(0, int((end_date - start_date).total_seconds()) + 1, size)
+    created = np.datetime64(start_date, "s") + seconds.astype("timedelta64[s]")
+    updated = created + (rng.integers(1, 121, size) * 60).astype("timedelta64[s]")
+
+    time_spent = np.round(rng.uniform(10, 120, size), 2)
+    time_spent = np.where(rng.random(size) < time_null_rate, np.nan, time_spent)
+    parents = np.char.add("INC", (rng.integers(1001, 1001 + total, size)).astype(str)).astype(object)
+    comments = pick(rng, comments_samples, size)
+
+    df = pd.DataFrame({
+        "incident_id": ids,
+        "incident_number": np.char.add("INC", (ids + 1000).astype(str)).astype(object),
+        "custodian_team": pick(rng, custodian_teams, size),
+        "failure_category": np.asarray(failure_categories, dtype=object)[category_idx],
+        "failure_sub_category": sub_table[category_idx, sub_idx],
+        "failure_caused_by": pick(rng, failure_caused_by_list, size),
+        "failure_reason": pick(rng, failure_reasons, size),
+        "action_taken": pick(rng, action_taken, size),
+        "action_category": pick(rng, action_category, size),
+        "actual_time_spent_in_minutes": time_spent,
+        "parent_incident_number": np.where(rng.random(size) < parent_rate, parents, ""),
+        "prior_notification": pick(rng, prior_notification, size),
+        "record_created_on": np.datetime_as_string(created, unit="s").astype(object),
+        "record_created_by": pick(rng, users, size),
+        "record_updated_on": np.datetime_as_string(updated, unit="s").astype(object),
+        "record_updated_by": pick(rng, users, size),
+        "comments": np.where(rng.random(size) < comment_null_rate, "", comments),
+        "tagged": rng.random(size) < tagged_ratio,
     })
 
-output_path = os.path.join(os.path.dirname(__file__), "data.json")
-with open(output_path, "w") as f:
-    json.dump(data, f, indent=2)
\ No newline at end of file
+    # Untagged: every classified field empty, no timestamps or time spent
+    untagged = ~df["tagged"].to_numpy()
+    df.loc[untagged, UNTAGGED_BLANK] = ""
+    df["actual_time_spent_in_minutes"] = df["actual_time_spent_in_minutes"].mask(untagged)
+    df[["record_created_on", "record_updated_on"]] = df[["record_created_on", "record_updated_on"]].mask(
+        np.column_stack([untagged, untagged]), None
+    )
+    df["actual_time_spent_in_minutes"] = df["actual_time_spent_in_minutes"].astype(object).where(
+        df["actual_time_spent_in_minutes"].notna(), None
+    )
+    return df
+
+
+def render_chunk(fmt, df):
+    """Serialize one chunk; JSON arrays come back without brackets or separators"""
+    if fmt == "parquet":
+        import pyarrow as pa
+        return pa.Table.from_pandas(df.astype({"actual_time_spent_in_minutes": "float64"}), preserve_index=False)
+    if fmt == "jsonl":
+        text = df.to_json(orient="records", lines=True, force_ascii=False)
+        return text if text.endswith("\n") or not text else text + "\n"
+    if fmt == "json-compact":
+        return df.to_json(orient="records", force_ascii=False)[1:-1]
+    # Indented exactly like json.dump(records, f, indent=2)
+    return ",\n".join(
+        "  " + json.dumps(rec, indent=2).replace("\n", "\n  ") for rec in df.to_dict(orient="records")
+    )
+
+
+def build_chunk(fmt, first_id, size, total, options):
+    return render_chunk(fmt, generate_chunk(first_id, size, total, **options))
+
+
+def chunk_specs(rows, chunk_size):
+    for first in range(1, rows + 1, chunk_size):
+        yield first, min(chunk_size, rows + 1 - first)
+
+
+def generate(fmt, rows, chunk_size, workers, **options):
+    """Yield rendered chunks in id order, keeping at most 2 x workers in flight"""
+    if workers <= 1:
+        for first, size in chunk_specs(rows, chunk_size):
+            yield build_chunk(fmt, first, size, rows, options)
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = collections.deque()
+        for first, size in chunk_specs(rows, chunk_size):
+            in_flight.append(pool.submit(build_chunk, fmt, first, size, rows, options))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def write_array(parts, f, indent):
+    """Stream rendered chunks as one JSON array"""
+    f.write("[\n" if indent else "[")
+    first = True
+    for text in parts:
+        if not text:
+            continue
+        if not first:
+            f.write(",\n" if indent else ",")
+        f.write(text)
+        first = False
+    f.write("\n]" if indent else "]")
+
+
+def write_parquet(tables, path):
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for table in tables:
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--rows", type=int, default=100, help="number of incidents (default: 100)")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json"))
+    parser.add_argument("--format", choices=FORMATS, default="json",
+                        help="json is indented like the checked-in data.json (default: json)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tagged-ratio", type=float, default=0.9, help="share of tagged incidents (default: 0.9)")
+    parser.add_argument("--time-null-rate", type=float, default=0.05,
+                        help="share of tagged incidents without time spent (default: 0.05)")
+    parser.add_argument("--parent-rate", type=float, default=0.1,
+                        help="share of incidents with a parent incident (default: 0.1)")
+    parser.add_argument("--comment-null-rate", type=float, default=0.1,
+                        help="share of incidents without comments (default: 0.1)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1, help="generator processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    parts = generate(
+        args.format, args.rows, args.chunk_size, args.workers,
+        seed=args.seed,
+        tagged_ratio=args.tagged_ratio,
+        time_null_rate=args.time_null_rate,
+        parent_rate=args.parent_rate,
+        comment_null_rate=args.comment_null_rate,
+    )
+    if args.format == "parquet":
+        write_parquet(parts, args.output)
+        return
+    with open(args.output, "w") as f:
+        if args.format == "jsonl":
+            f.writelines(parts)
+        else:
+            write_array(parts, f, indent=2 if args.format == "json" else None)
+
+
+if __name__ == "__main__":
+    main()
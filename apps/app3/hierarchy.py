@@ -0,0 +1,225 @@
+"""Parent/child incident graph behind the hierarchy panel.
+
+`parent_incident_number` links an incident to its parent by number. The
+graph turns those links into integer row positions once per data version
+and precomputes, for every incident, its depth, the size of its subtree,
+the time spent in the subtree and along the chain from its root, plus an
+Euler tour: the subtree of `v` is the contiguous slice of tour positions
+starting at `tin[v]`. Subtree and ancestor queries then cost the size of
+their answer.
+
+Parents that do not exist are reported as dangling and their incidents
+treated as roots; every incident on a parent cycle is reported and cut
+loose from its parent. Saves move the graph along: new parents are
+re-linked and the tour rebuilt once for the whole save, and a new time
+spent is added to the chain above it. Renumbered incidents, edits that
+touch a cycle and bulk re-parenting rebuild it instead.
+"""
+import numpy as np
+import pandas as pd
+
+from incident_data import coerce_value
+from tagging import EMPTY_TOKENS, empty_mask
+
+HIERARCHY_COLUMNS = ["incident_id", "incident_number", "parent_incident_number", "actual_time_spent_in_minutes"]
+# Parent changes in one save that are re-linked in place; more rebuild the graph
+MOVE_LIMIT = 200
+ROOT = -1
+
+
+def _numbers(series):
+    """Stripped incident numbers as objects, None where empty"""
+    values = series.astype(object).to_numpy()
+    empty = empty_mask(pd.Series(values))
+    out = np.full(len(values), None, dtype=object)
+    out[~empty] = [str(v).strip() for v in values[~empty]]
+    return out
+
+
+def _gather(starts, counts):
+    """Concatenated ranges [starts[i], starts[i] + counts[i])"""
+    total = int(counts.sum())
+    firsts = np.cumsum(counts) - counts
+    return np.repeat(starts - firsts, counts) + np.arange(total)
+
+
+class IncidentGraph:
+    """Incident forest over row positions with precomputed subtree and chain aggregates"""
+
+    def __init__(self, df):
+        n = len(df)
+        self.ids = df["incident_id"].to_numpy()
+        self.numbers = _numbers(df["incident_number"])
+        self.parent_numbers = _numbers(df["parent_incident_number"])
+        self.minutes = df["actual_time_spent_in_minutes"].fillna(0).to_numpy(dtype="float64")
+        self.id_index = pd.Index(self.ids)
+        # First incident holding each number
+        numbered = pd.Series(np.arange(n), index=self.numbers)
+        numbered = numbered[numbered.index.notna() & ~numbered.index.duplicated()]
+        self.number_index = pd.Series(numbered.to_numpy(), index=pd.Index(numbered.index, dtype=object))
+
+        has_parent = pd.notna(self.parent_numbers)
+        parent = np.full(n, ROOT, dtype=np.int64)
+        if has_parent.any():
+            found = self.number_index.reindex(self.parent_numbers[has_parent]).to_numpy()
+            parent[has_parent] = np.where(np.isnan(found), ROOT, np.nan_to_num(found)).astype(np.int64)
+        self.dangling = has_parent & (parent == ROOT)
+        self.cycle = self._cycles(parent)
+        parent[self.cycle] = ROOT
+        self.parent = parent
+        self._build_tour()
+
+    @staticmethod
+    def _cycles(parent):
+        """Incidents on a parent cycle: what is left after repeatedly removing incidents without children"""
+        n = len(parent)
+        linked = parent >= 0
+        children = np.bincount(parent[linked], minlength=n)
+        removed = np.zeros(n, dtype=bool)
+        frontier = np.flatnonzero(children == 0)
+        while len(frontier):
+            removed[frontier] = True
+            parents = parent[frontier]
+            parents = parents[parents >= 0]
+            np.subtract.at(children, parents, 1)
+            parents = np.unique(parents)
+            frontier = parents[(children[parents] == 0) & ~removed[parents]]
+        return ~removed
+
+    def _build_tour(self):
+        """Depth, subtree sizes and minutes, chain minutes and the Euler tour, level by level"""
+        n, parent = len(self.parent), self.parent
+        kids = np.flatnonzero(parent >= 0)
+        child_order = kids[np.argsort(parent[kids], kind="stable")]
+        child_counts = np.bincount(parent[kids], minlength=n)
+        child_starts = np.cumsum(child_counts) - child_counts
+
+        levels = [np.flatnonzero(parent < 0)]
+        while True:
+            frontier = levels[-1]
+            counts = child_counts[frontier]
+            if not counts.sum():
+                break
+            levels.append(child_order[_gather(child_starts[frontier], counts)])
+
+        self.depth = np.zeros(n, dtype=np.int64)
+        self.size = np.ones(n, dtype=np.int64)
+        self.subtree_minutes = self.minutes.copy()
+        for d, level in reversed(list(enumerate(levels))):
+            self.depth[level] = d
+            if d:
+                np.add.at(self.size, parent[level], self.size[level])
+                np.add.at(self.subtree_minutes, parent[level], self.subtree_minutes[level])
+
+        # Pre-order: a child starts after its parent and the subtrees of its earlier siblings
+        self.tin = np.zeros(n, dtype=np.int64)
+        self.chain_minutes = self.minutes.copy()
+        roots = levels[0]
+        self.tin[roots] = np.cumsum(self.size[roots]) - self.size[roots]
+        for level in levels[1:]:
+            parents = parent[level]
+            before = np.cumsum(self.size[level]) - self.size[level]
+            group_start = np.r_[True, parents[1:] != parents[:-1]]
+            first = np.maximum.accumulate(np.where(group_start, np.arange(len(level)), 0))
+            self.tin[level] = self.tin[parents] + 1 + before - before[first]
+            self.chain_minutes[level] += self.chain_minutes[parents]
+        self.tour = np.empty(n, dtype=np.int64)
+        self.tour[self.tin] = np.arange(n)
+
+    # --- Queries (row positions) ---
+    def position(self, incident_number):
+        """Row position of an incident number, or ROOT when unknown"""
+        return int(self.number_index.get(str(incident_number).strip(), ROOT))
+
+    def subtree(self, pos):
+        """`pos` and all its descendants, each directly after its parent (depth-first)"""
+        return self.tour[self.tin[pos]:self.tin[pos] + self.size[pos]]
+
+    def ancestors(self, pos):
+        """Parent, grandparent, ... up to the root"""
+        chain = []
+        pos = self.parent[pos]
+        while pos != ROOT:
+            chain.append(int(pos))
+            pos = self.parent[pos]
+        return chain
+
+    def problems(self):
+        """(dangling positions, cycle positions)"""
+        return np.flatnonzero(self.dangling), np.flatnonzero(self.cycle)
+
+    # --- Incremental updates ---
+    def copy(self):
+        new = object.__new__(IncidentGraph)
+        new.__dict__.update({k: v.copy() if isinstance(v, np.ndarray) else v for k, v in self.__dict__.items()})
+        return new
+
+    def _walk_up(self, pos, size, minutes):
+        while pos != ROOT:
+            self.size[pos] += size
+            self.subtree_minutes[pos] += minutes
+            pos = self.parent[pos]
+
+    def _inside(self, pos, v):
+        """True when `pos` is `v` or one of its descendants, by the current parent links"""
+        while pos != ROOT:
+            if pos == v:
+                return True
+            pos = self.parent[pos]
+        return False
+
+    def advance(self, deltas):
+        """Graph after the (incident_id, column, value) `deltas`; None when it has to be rebuilt"""
+        deltas = deltas[deltas["column"].isin(HIERARCHY_COLUMNS)]
+        if not len(deltas):
+            return self
+        if (deltas["column"] == "incident_number").any():
+            return None
+        deltas = deltas.drop_duplicates(["incident_id", "column"], keep="last")
+        # Incidents the graph does not hold are not in the data either: apply_changes skips them too
+        deltas = deltas[deltas["incident_id"].isin(self.id_index)]
+        parents = deltas[deltas["column"] == "parent_incident_number"]
+        if len(parents) > MOVE_LIMIT:
+            return None
+        new = self.copy()
+        moved = False
+        for incident_id, value in zip(parents["incident_id"], parents["value"]):
+            v = new.id_index.get_loc(incident_id)
+            number = None if value is None or str(value).strip() in EMPTY_TOKENS else str(value).strip()
+            target = new.position(number) if number is not None else ROOT
+            if new.cycle[v] or new._inside(target, v):
+                return None  # a cycle opens or closes
+            new.parent_numbers[v] = number
+            new.dangling[v] = number is not None and target == ROOT
+            if target != new.parent[v]:
+                new.parent[v] = target
+                moved = True
+        if moved:
+            # One tour and its aggregates for all of the save's moves
+            new._build_tour()
+        minutes = deltas[deltas["column"] == "actual_time_spent_in_minutes"]
+        for incident_id, value in zip(minutes["incident_id"], minutes["value"]):
+            v = new.id_index.get_loc(incident_id)
+            value = coerce_value("actual_time_spent_in_minutes", value)
+            change = (0.0 if value is None else float(value)) - new.minutes[v]
+            new.minutes[v] += change
+            new._walk_up(v, 0, change)
+            new.chain_minutes[new.subtree(v)] += change
+        return new
+
+
+class Hierarchy:
+    """Lazily built incident graph of one data version; `advance` derives the next version's"""
+
+    def __init__(self, graph=None):
+        self.graph = graph
+
+    def get(self, df):
+        if self.graph is None:
+            self.graph = IncidentGraph(df[HIERARCHY_COLUMNS])
+        return self.graph
+
+    def advance(self, deltas):
+        if self.graph is None:
+            return Hierarchy()
+        return Hierarchy(self.graph.advance(deltas))
@@ -0,0 +1,279 @@
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import incident_io
+
+# Shared helpers live in apps/shared locally and next to the app on the stage
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+from hashing import content_hash  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # the sidecar is only a cache, JSON stays the source of truth
+    pa = None
+    feather = None
+
+# --- Incident schema ---
+ID_COLUMNS = ["incident_id", "incident_number"]
+CATEGORY_COLUMNS = [
+    "custodian_team",
+    "failure_category",
+    "failure_sub_category",
+    "failure_caused_by",
+    "failure_reason",
+    "action_taken",
+    "action_category",
+    "prior_notification",
+    "record_created_by",
+    "record_updated_by",
+]
+DATETIME_COLUMNS = ["record_created_on", "record_updated_on"]
+FLOAT_COLUMNS = ["actual_time_spent_in_minutes"]
+TEXT_COLUMNS = ["incident_number", "parent_incident_number", "comments"]
+# Arrow-backed strings when pyarrow is there: one buffer per column instead of a Python object per cell
+TEXT_DTYPE = pd.StringDtype("pyarrow") if pa is not None else object
+COLUMNS = [
+    "incident_id",
+    "incident_number",
+    "custodian_team",
+    "failure_category",
+    "failure_sub_category",
+    "failure_caused_by",
+    "failure_reason",
+    "action_taken",
+    "action_category",
+    "actual_time_spent_in_minutes",
+    "parent_incident_number",
+    "prior_notification",
+    "record_created_on",
+    "record_created_by",
+    "record_updated_on",
+    "record_updated_by",
+    "comments",
+]
+# Derived in the app, never persisted
+DERIVED_COLUMNS = ["tagged"]
+
+# Bump when the sidecar layout or the schema changes
+SIDECAR_FORMAT = "2"
+SIDECAR_SUFFIX = ".arrow"
+# Data files with this suffix are stored columnar (Arrow IPC, zstd) instead of as JSON
+COLUMNAR_SUFFIX = ".arrow"
+_INT32 = np.iinfo(np.int32)
+
+
+def apply_schema(df):
+    """Cast a raw incident frame to the declared column types"""
+    df = df.drop(columns=[c for c in DERIVED_COLUMNS if c in df.columns])
+    for col in COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    ids = pd.to_numeric(df["incident_id"], errors="raise")
+    fits = not len(ids) or (ids.min() >= _INT32.min and ids.max() <= _INT32.max)
+    df["incident_id"] = ids.astype("int32" if fits else "int64")
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    for col in DATETIME_COLUMNS + FLOAT_COLUMNS:
+        df[col] = coerce_column(col, df[col])
+    for col in TEXT_COLUMNS:
+        df[col] = df[col].astype(TEXT_DTYPE)
+    extra = [c for c in df.columns if c not in COLUMNS]
+    return df[COLUMNS + extra].reset_index(drop=True)
+
+
+def coerce_column(col, values):
+    """Cast a Series of raw or edited values to the column's schema type.
+
+    The one coercion behind loads, saves and imports: anything that does
+    not parse becomes NaN / NaT, other columns come back as objects.
+    """
+    if col in FLOAT_COLUMNS:
+        # float64 keeps NaN as the null marker, which the edit paths compare against
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+    if col in DATETIME_COLUMNS:
+        return pd.to_datetime(values, errors="coerce")
+    return values.astype(object)
+
+
+def coerce_value(col, val):
+    """Convert a single edited value to the column's schema type (None when empty)"""
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return None
+    if col not in FLOAT_COLUMNS and col not in DATETIME_COLUMNS:
+        return val
+    val = coerce_column(col, pd.Series([val], dtype=object)).iloc[0]
+    return None if pd.isna(val) else val
+
+
+def ensure_categories(df, col, values):
+    """Let a categorical column hold `values` before they are assigned"""
+    if not isinstance(df[col].dtype, pd.CategoricalDtype):
+        return
+    missing = pd.Index([v for v in values if v is not None]).unique()
+    missing = missing.difference(df[col].cat.categories)
+    if len(missing):
+        df[col] = df[col].cat.add_categories(missing)
+
+
+def set_cells(df, rows, col, values):
+    """Assign `values` to column `col` at integer `rows`, in one call"""
+    values = pd.Series(list(values) if not pd.api.types.is_scalar(values) else [values] * len(rows))
+    if col in DATETIME_COLUMNS or col in FLOAT_COLUMNS:
+        values = coerce_column(col, values)
+    ensure_categories(df, col, values.dropna().unique())
+    df.iloc[rows, df.columns.get_loc(col)] = values.to_numpy()
+
+
+def persisted_columns(df):
+    return [c for c in df.columns if c not in DERIVED_COLUMNS]
+
+
+def to_records(df):
+    """JSON-ready list of dicts (ISO timestamps, None for missing values)"""
+    return incident_io.to_records(df, persisted_columns(df))
+
+
+def read_chunks(path, chunk_rows=incident_io.CHUNK_ROWS):
+    """Typed frames of at most `chunk_rows` incidents from a JSON array or JSON Lines file"""
+    for records in incident_io.record_chunks(path, chunk_rows):
+        yield apply_schema(pd.DataFrame(records))
+
+
+def concat_incidents(frames):
+    """One typed frame from typed chunks; categoricals get the sorted union of the chunks' categories"""
+    frames = list(frames)
+    if not frames:
+        return apply_schema(pd.DataFrame(columns=COLUMNS))
+    if len(frames) == 1:
+        return frames[0]
+    categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    df = pd.concat([f.drop(columns=categorical) for f in frames], ignore_index=True)
+    for col in categorical:
+        # All-null chunks come with empty categories of another dtype
+        parts = [f[col] if len(f[col].cat.categories) else f[col].cat.set_categories(pd.Index([], dtype=object))
+                 for f in frames]
+        df[col] = union_categoricals(parts, sort_categories=True)
+    return df[frames[0].columns]
+
+
+# --- File versioning ---
+def file_signature(path):
+    """Cheap identity of the current file contents, used as a memo key"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _table(df):
+    """Arrow table of the persisted columns, read straight from `df` without a trimmed copy"""
+    return pa.Table.from_pandas(df, columns=persisted_columns(df), preserve_index=False)
+
+
+def _to_pandas(table):
+    """Arrow table as a frame; string columns stay Arrow-backed instead of becoming objects"""
+    text_types = {pa.string(): TEXT_DTYPE, pa.large_string(): TEXT_DTYPE} if TEXT_DTYPE is not object else {}
+    return table.to_pandas(types_mapper=text_types.get)
+
+
+# --- Columnar sidecar ---
+def sidecar_path(path):
+    """Next to the data file, or the temp dir when the app folder is read-only"""
+    local = str(path) + SIDECAR_SUFFIX
+    if os.access(os.path.dirname(os.path.abspath(local)), os.W_OK):
+        return local
+    name = hashlib.sha1(os.path.abspath(str(path)).encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"incidents-{name}{SIDECAR_SUFFIX}")
+
+
+def read_sidecar(path, digest):
+    """Memory-map the sidecar if it was built from the given data file hash"""
+    if feather is None:
+        return None
+    side = sidecar_path(path)
+    try:
+        table = feather.read_table(side, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    meta = table.schema.metadata or {}
+    if meta.get(b"source_sha256") != digest.encode() or meta.get(b"format") != SIDECAR_FORMAT.encode():
+        return None
+    return _to_pandas(table)
+
+
+def write_sidecar(df, path, digest):
+    if feather is None:
+        return
+    side = sidecar_path(path)
+    table = _table(df)
+    meta = dict(table.schema.metadata or {})
+    meta[b"source_sha256"] = digest.encode()
+    meta[b"format"] = SIDECAR_FORMAT.encode()
+    table = table.replace_schema_metadata(meta)
+    tmp = f"{side}.{os.getpid()}.tmp"
+    try:
+        # Uncompressed Arrow IPC so reads can memory-map the columns
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, side)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# --- Columnar data files ---
+def is_columnar(path):
+    return str(path).endswith(COLUMNAR_SUFFIX)
+
+
+def read_columnar(path):
+    if feather is None:
+        raise RuntimeError(f"Reading {path} needs pyarrow")
+    return apply_schema(_to_pandas(feather.read_table(path)))
+
+
+def write_columnar(df, path):
+    atomic_write(path, lambda f: feather.write_feather(_table(df), f, compression="zstd"), mode="wb")
+
+
+# --- Load / save ---
+def load_incidents(path):
+    """Typed incident frame for `path`, rebuilt from JSON only when it changed"""
+    if is_columnar(path):
+        return read_columnar(path)
+    digest = content_hash(path)
+    df = read_sidecar(path, digest)
+    if df is None:
+        # Parsed chunk by chunk: never a list of dicts for the whole file
+        df = concat_incidents(read_chunks(path))
+        write_sidecar(df, path, digest)
+    return df
+
+
+def atomic_write(path, write, mode="w"):
+    """Write via a temp file in the same folder, fsync, then rename over `path`"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def save_incidents(df, path):
+    """Write the frame back in the file's format; JSON and JSON Lines also refresh the sidecar from memory"""
+    if is_columnar(path):
+        write_columnar(df, path)
+        return
+    write = incident_io.write_jsonl if incident_io.is_jsonl(path) else incident_io.write_json
+    atomic_write(path, lambda f: write(df, f, persisted_columns(df)))
+    write_sidecar(df, path, content_hash(path))
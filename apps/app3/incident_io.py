@@ -0,0 +1,231 @@
+"""Streaming incident I/O: JSON Lines, the legacy JSON array and exports.
+
+Incident files are either one JSON array (data.json as checked in) or JSON
+Lines, one incident per line; readers sniff the format from the first
+character. Records are parsed one at a time and handed on in chunks of
+CHUNK_ROWS, and writers convert one chunk of a frame to Python objects at
+a time, so memory stays bounded by the chunk size whatever the file size.
+
+Command line:
+    python incident_io.py convert data.json incidents.jsonl    # format from the suffix
+    python incident_io.py import incidents.jsonl --sqlite incidents.db --workers 4 --problems problems.csv
+"""
+import argparse
+import json
+import re
+import tempfile
+
+CHUNK_ROWS = 50_000
+BLOCK_SIZE = 1 << 20
+JSONL_SUFFIX = ".jsonl"
+# Download formats: label -> (file suffix, MIME type)
+EXPORT_FORMATS = {"CSV": (".csv", "text/csv"), "JSON Lines": (JSONL_SUFFIX, "application/x-ndjson")}
+# Exports spill from memory to a temp file past this size
+EXPORT_SPOOL_BYTES = 16 << 20
+_WHITESPACE = re.compile(r"\s*")
+
+
+def is_jsonl(path):
+    return str(path).endswith(JSONL_SUFFIX)
+
+
+# --- Reading ---
+def _array_records(f, block_size):
+    """Elements of a top-level JSON array, read block by block"""
+    decoder = json.JSONDecoder()
+    text, pos = "", 0
+    eof = opened = need_comma = False
+    while True:
+        pos = _WHITESPACE.match(text, pos).end()
+        if pos == len(text):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", text, pos)
+            block = f.read(block_size)
+            text, pos, eof = text[pos:] + block, 0, not block
+            continue
+        if not opened:
+            if text[pos] != "[":
+                raise json.JSONDecodeError("Expecting '['", text, pos)
+            opened, pos = True, pos + 1
+        elif text[pos] == "]":
+            return
+        elif need_comma:
+            if text[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            need_comma, pos = False, pos + 1
+        else:
+            try:
+                record, pos = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Record straddles the block boundary: read on and retry
+                block = f.read(block_size)
+                text, pos, eof = text[pos:] + block, 0, not block
+                continue
+            need_comma = True
+            yield record
+
+
+def iter_records(f, block_size=BLOCK_SIZE):
+    """Records of an open JSON array or JSON Lines text file, one at a time"""
+    head = f.read(64).lstrip()
+    f.seek(0)
+    if head.startswith("["):
+        yield from _array_records(f, block_size)
+        return
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+def record_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Lists of at most `chunk_rows` records from the file at `path`"""
+    with open(path, "r", encoding="utf-8") as f:
+        chunk = []
+        for record in iter_records(f):
+            chunk.append(record)
+            if len(chunk) == chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def line_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Lists of at most `chunk_rows` undecoded lines of a JSON Lines file, left for workers to parse.
+
+    A JSON array has no line per record, so its records come parsed.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if f.read(64).lstrip().startswith("["):
+            f.close()
+            yield from record_chunks(path, chunk_rows)
+            return
+        f.seek(0)
+        chunk = []
+        for line in f:
+            if line.strip():
+                chunk.append(line)
+                if len(chunk) == chunk_rows:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+
+# --- Writing ---
+def to_records(df, columns=None):
+    """JSON-ready list of dicts of `columns` (ISO timestamps, None for missing values)"""
+    out = df[list(columns) if columns is not None else df.columns].astype(object)
+    for col in out.columns:
+        if df[col].dtype.kind == "M":
+            # astype: an all-NaT chunk would otherwise be inferred back to datetimes
+            out[col] = out[col].map(lambda ts: ts.isoformat(), na_action="ignore").astype(object)
+    out = out.where(out.notna(), None)
+    return out.to_dict(orient="records")
+
+
+def _dumps(records):
+    return json.dumps(records, separators=(",", ":"))
+
+
+def write_json(df, f, columns=None, chunk_rows=CHUNK_ROWS):
+    """Compact JSON array of the frame's records, `chunk_rows` rows converted at a time"""
+    f.write("[")
+    for start in range(0, len(df), chunk_rows):
+        if start:
+            f.write(",")
+        f.write(_dumps(to_records(df.iloc[start:start + chunk_rows], columns))[1:-1])
+    f.write("]")
+
+
+def write_jsonl(df, f, columns=None, chunk_rows=CHUNK_ROWS):
+    """One compact JSON record per line, `chunk_rows` rows converted at a time"""
+    for start in range(0, len(df), chunk_rows):
+        f.writelines(_dumps(r) + "\n" for r in to_records(df.iloc[start:start + chunk_rows], columns))
+
+
+def convert(src, dst, chunk_rows=CHUNK_ROWS):
+    """Rewrite the records of `src` as JSON Lines or a JSON array (by `dst`'s suffix); returns the count"""
+    count = 0
+    with open(dst, "w", encoding="utf-8") as f:
+        if not is_jsonl(dst):
+            f.write("[")
+        for chunk in record_chunks(src, chunk_rows):
+            if is_jsonl(dst):
+                f.writelines(_dumps(r) + "\n" for r in chunk)
+            else:
+                f.write(("," if count else "") + _dumps(chunk)[1:-1])
+            count += len(chunk)
+        if not is_jsonl(dst):
+            f.write("]")
+    return count
+
+
+# --- Exports ---
+def export_file(frames, fmt, columns=None):
+    """Binary file (rewound) with the rows of `frames` as CSV or JSON Lines, written frame by frame"""
+    suffix, _ = EXPORT_FORMATS[fmt]
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES, mode="w+b")
+    header = True
+    for frame in frames:
+        if suffix == ".csv":
+            text = frame.to_csv(columns=columns, index=False, header=header, date_format="%Y-%m-%dT%H:%M:%S")
+        else:
+            text = "".join(_dumps(r) + "\n" for r in to_records(frame, columns))
+        out.write(text.encode("utf-8"))
+        header = False
+    out.seek(0)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    to_format = commands.add_parser("convert", help="rewrite an incident file as JSON Lines or a JSON array")
+    to_format.add_argument("src")
+    to_format.add_argument("dst", help="*.jsonl for JSON Lines, anything else for a JSON array")
+    load = commands.add_parser("import", help="load an incident file into a SQL table, chunk by chunk")
+    load.add_argument("src")
+    load.add_argument("--sqlite", required=True, help="SQLite database file")
+    load.add_argument("--table", default="INCIDENTS")
+    load.add_argument("--workers", type=int, default=1, help="processes validating chunks (default: 1)")
+    load.add_argument("--problems", help="write the invalid values found to this CSV file")
+    for command in (to_format, load):
+        command.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"default: {CHUNK_ROWS}")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        print(f"Wrote {convert(args.src, args.dst, args.chunk_rows):,} incidents to {args.dst}")
+        return
+    import sqlite3
+
+    import pandas as pd
+
+    from normalize import PROBLEM_COLUMNS, normalize_chunks
+    from storage import SQLITE, SqlStorage
+
+    problems = []
+
+    def frames():
+        for df, found in normalize_chunks(line_chunks(args.src, args.chunk_rows), args.workers):
+            problems.append(found)
+            yield df
+
+    storage = SqlStorage(sqlite3.connect(args.sqlite), args.table, SQLITE)
+    try:
+        count = storage.create_table(frames())
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Imported {count:,} incidents into {args.table}")
+    problems = pd.concat(problems, ignore_index=True) if problems else pd.DataFrame(columns=PROBLEM_COLUMNS)
+    for (col, problem), n in problems.groupby(["column", "problem"]).size().items():
+        print(f"  {n:,} x {col}: {problem}")
+    if args.problems:
+        problems.to_csv(args.problems, index=False)
+        print(f"Wrote {len(problems):,} invalid values to {args.problems}")
+
+
+if __name__ == "__main__":
+    main()
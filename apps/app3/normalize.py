@@ -0,0 +1,171 @@
+"""Validation and normalization of incident records against the declared schema.
+
+The schema is incident_data's column lists plus the failure taxonomy in
+taxonomy.py, the one generate_test_data.py draws its incidents from.
+`normalize(raw)` takes a raw frame (JSON records, a bulk import chunk),
+coerces it with `apply_schema` and reports every cell it could not take
+as given, one vectorized pass per column:
+
+- ids that are missing, not integers or repeated (the rows are dropped,
+  nothing could key them);
+- a missing incident number;
+- time spent or timestamps that do not parse (they become missing) and
+  negative time spent;
+- failure categories outside the taxonomy, and sub-categories that do
+  not belong to their category (both are kept as entered).
+
+`normalize_chunks` parses and normalizes the chunks of a large import
+across a process pool; repeated ids are only found within a chunk there.
+Saves run their edits through `hold_invalid` first and only write the
+cells it lets through.
+"""
+import collections
+import concurrent.futures
+import json
+
+import numpy as np
+import pandas as pd
+
+from incident_data import COLUMNS, DATETIME_COLUMNS, FLOAT_COLUMNS, apply_schema, coerce_column
+from tagging import empty_mask
+from taxonomy import FAILURE_CATEGORIES, FAILURE_SUB_CATEGORIES
+
+PROBLEM_COLUMNS = ["row", "incident_id", "column", "value", "problem"]
+
+
+def _problems(raw, ids, mask, col, problem):
+    rows = np.flatnonzero(mask)
+    return pd.DataFrame({
+        "row": rows,
+        "incident_id": ids[rows],
+        "column": col,
+        "value": raw[col].to_numpy(dtype=object)[rows] if col in raw.columns else None,
+        "problem": problem,
+    })
+
+
+def taxonomy_mask(categories, sub_categories):
+    """(unknown category, sub-category outside its category) masks over two value Series"""
+    categories = categories.astype(object)
+    has_category = ~empty_mask(categories)
+    unknown = has_category & ~categories.isin(FAILURE_CATEGORIES).to_numpy()
+    pairs = pd.MultiIndex.from_arrays([categories, sub_categories.astype(object)])
+    valid = pd.MultiIndex.from_tuples([(c, s) for c, subs in FAILURE_SUB_CATEGORIES.items() for s in subs])
+    mismatch = has_category & ~unknown & ~empty_mask(sub_categories) & ~pairs.isin(valid)
+    return unknown, mismatch
+
+
+def _validate(raw):
+    """(problems, the float and datetime columns coerced) of a raw frame with a default index"""
+    coerced = {}
+    ids = pd.to_numeric(raw.get("incident_id", pd.Series(np.nan, index=raw.index)), errors="coerce")
+    bad_id = (ids.isna() | (ids % 1 != 0)).to_numpy()
+    id_values = np.where(bad_id, None, ids.to_numpy(dtype=object))
+    parts = [
+        _problems(raw, id_values, bad_id, "incident_id", "missing or not an integer"),
+        _problems(raw, id_values, ~bad_id & ids.duplicated().to_numpy(), "incident_id", "repeated incident_id"),
+    ]
+    if "incident_number" in raw.columns:
+        parts.append(_problems(raw, id_values, empty_mask(raw["incident_number"]), "incident_number", "missing"))
+    for col in FLOAT_COLUMNS + DATETIME_COLUMNS:
+        if col not in raw.columns:
+            continue
+        coerced[col] = coerce_column(col, raw[col])
+        unparsed = ~empty_mask(raw[col]) & coerced[col].isna().to_numpy()
+        parts.append(_problems(raw, id_values, unparsed, col, "not a number" if col in FLOAT_COLUMNS else "not a date"))
+        if col in FLOAT_COLUMNS:
+            parts.append(_problems(raw, id_values, (coerced[col] < 0).to_numpy(), col, "negative"))
+    if "failure_category" in raw.columns and "failure_sub_category" in raw.columns:
+        unknown, mismatch = taxonomy_mask(raw["failure_category"], raw["failure_sub_category"])
+        parts.append(_problems(raw, id_values, unknown, "failure_category", "not in the taxonomy"))
+        parts.append(_problems(raw, id_values, mismatch, "failure_sub_category", "not a sub-category of its category"))
+    problems = pd.concat(parts, ignore_index=True)
+    return problems.sort_values(["row", "column"], kind="stable", ignore_index=True)[PROBLEM_COLUMNS], coerced
+
+
+def validate(raw):
+    """Problems of a raw incident frame, one row per invalid cell (see PROBLEM_COLUMNS)"""
+    return _validate(raw.reset_index(drop=True))[0]
+
+
+def normalize(raw):
+    """(typed frame, problems) for a raw incident frame; rows without a usable, unique id are dropped"""
+    raw = raw.reset_index(drop=True)
+    problems, coerced = _validate(raw)
+    # Parsed once: apply_schema passes already typed columns through
+    raw = raw.assign(**coerced)
+    dropped = problems.loc[problems["column"] == "incident_id", "row"].to_numpy()
+    if len(dropped):
+        raw = raw.drop(index=dropped)
+    return apply_schema(raw), problems
+
+
+def _normalize_records(records):
+    if records and isinstance(records[0], str):
+        # Undecoded JSON Lines: parsing is most of an import's work, so it runs in the worker too
+        records = [json.loads(line) for line in records]
+    return normalize(pd.DataFrame(records, columns=None if records else COLUMNS))
+
+
+def normalize_chunks(chunks, workers=1):
+    """(typed frame, problems) per chunk of records or undecoded JSON Lines, in order.
+
+    Problem `row`s count from the start of the first chunk. With `workers`
+    > 1 the chunks are parsed and normalized in a process pool, at most
+    2 x workers in flight.
+    """
+    offset = 0
+
+    def numbered(records, result):
+        nonlocal offset
+        df, problems = result
+        problems["row"] += offset
+        offset += len(records)
+        return df, problems
+
+    if workers <= 1:
+        for records in chunks:
+            yield numbered(records, _normalize_records(records))
+        return
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = collections.deque()
+        for records in chunks:
+            in_flight.append((records, pool.submit(_normalize_records, records)))
+            if len(in_flight) >= 2 * workers:
+                records, future = in_flight.popleft()
+                yield numbered(records, future.result())
+        while in_flight:
+            records, future = in_flight.popleft()
+            yield numbered(records, future.result())
+
+
+def check_edits(rows, deltas):
+    """Problems of the edited incidents `rows` once the raw values of `deltas` are laid over them"""
+    columns = ["incident_id"] + FLOAT_COLUMNS + ["failure_category", "failure_sub_category"]
+    after = rows[columns].astype(object).reset_index(drop=True)
+    deltas = deltas.drop_duplicates(["incident_id", "column"], keep="last")
+    deltas = deltas[deltas["column"].isin(columns[1:])]
+    positions = pd.Index(after["incident_id"]).get_indexer(deltas["incident_id"])
+    deltas = deltas.assign(row=positions)[positions >= 0]
+    for col, group in deltas.groupby("column", sort=False):
+        after.iloc[group["row"].to_numpy(), after.columns.get_loc(col)] = group["value"].to_numpy(dtype=object)
+    return validate(after).drop(columns="row")
+
+
+def hold_invalid(rows, deltas):
+    """(deltas to save, deltas held back with a `problem` column) for edits to the incidents `rows`.
+
+    Edited cells `check_edits` flags are held back; a sub-category outside
+    its category holds back whichever of the two was edited.
+    """
+    problems = check_edits(rows, deltas)
+    pairs = problems[problems["problem"] == "not a sub-category of its category"]
+    problems = pd.concat([problems, pairs.assign(column="failure_category")], ignore_index=True)
+    found = pd.Series(
+        problems["problem"].to_numpy(),
+        index=pd.MultiIndex.from_arrays([pd.to_numeric(problems["incident_id"]), problems["column"]]),
+    )
+    found = found[~found.index.duplicated()]
+    problem = found.reindex(pd.MultiIndex.from_arrays([deltas["incident_id"], deltas["column"]])).to_numpy()
+    held = pd.notna(problem)
+    return deltas[~held].reset_index(drop=True), deltas[held].assign(problem=problem[held]).reset_index(drop=True)
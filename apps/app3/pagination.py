@@ -0,0 +1,53 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from change_log import apply_changes
+from edits import DELTA_COLUMNS
+
+PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+DEFAULT_PAGE_SIZE = 100
+
+
+def page_count(total, page_size):
+    return max(1, math.ceil(total / page_size))
+
+
+def sort_positions(df, positions, col, ascending=True):
+    """Reorder row positions by `col` on the server, nulls last.
+
+    Categorical columns sort by the rank of their category labels, so the
+    per-row work is an integer sort whatever order categories were added in.
+    """
+    series = df[col]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        rank = np.argsort(np.argsort(series.cat.categories.astype(str))).astype("float64")
+        codes = series.cat.codes.to_numpy()[positions]
+        keys = pd.Series(np.where(codes >= 0, rank[codes], np.nan))
+    else:
+        keys = series.iloc[positions].reset_index(drop=True)
+    order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+    return np.asarray(positions)[order.to_numpy()]
+
+
+def overlay_pending(page, pending):
+    """Copy of a page frame with not-yet-saved edits shown in place"""
+    page = page.copy()
+    if len(pending):
+        apply_changes(page, pending)
+    return page
+
+
+def merge_pending(pending, page_ids, page_deltas):
+    """Replace the pending edits of the rows on this page with `page_deltas`"""
+    kept = pending[~pending["incident_id"].isin(page_ids)]
+    if not len(page_deltas):
+        return kept.reset_index(drop=True)
+    if not len(kept):
+        return page_deltas.reset_index(drop=True)
+    return pd.concat([kept, page_deltas], ignore_index=True)
+
+
+def empty_pending():
+    return pd.DataFrame(columns=DELTA_COLUMNS)
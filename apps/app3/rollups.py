@@ -0,0 +1,105 @@
+"""Pre-aggregated incident rollups behind the analytics panel.
+
+A cube holds incident counts and time spent per (team, category,
+sub-category, created month, tagged) cell. It is a few thousand rows
+whatever the number of incidents, so every chart is a small groupby over
+the cube. The cube is built once per data file and then moved along with
+each save: the edited rows' old contributions are subtracted and their
+new ones added.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ["custodian_team", "failure_category", "failure_sub_category", "month", "tagged"]
+MEASURES = ["incidents", "minutes", "timed"]
+# Label of missing values in the cube
+NO_VALUE = "(none)"
+
+
+def _labels(values):
+    """Object labels for cube keys; nulls become NO_VALUE"""
+    values = pd.Series(values, dtype=object)
+    return values.where(values.notna(), NO_VALUE).astype(str).to_numpy(dtype=object)
+
+
+def contributions(df):
+    """Cube cells of the incidents in `df` (which must carry the `tagged` column)"""
+    minutes = df["actual_time_spent_in_minutes"]
+    keys = pd.DataFrame({
+        col: df[col].to_numpy() for col in DIMENSIONS if col not in ["month", "tagged"]
+    })
+    keys["month"] = df["record_created_on"].to_numpy().astype("datetime64[M]")
+    keys["tagged"] = df["tagged"].to_numpy()
+    keys["incidents"] = 1
+    keys["minutes"] = minutes.fillna(0).to_numpy()
+    keys["timed"] = minutes.notna().to_numpy().astype(np.int64)
+    # Group on the raw (categorical / datetime) keys, then label the few resulting cells
+    cube = keys.groupby(DIMENSIONS, sort=False, observed=True, dropna=False)[MEASURES].sum().reset_index()
+    return cube_from_rows(cube)
+
+
+def cube_from_rows(frame):
+    """Cube frame (DIMENSIONS index, MEASURES columns) from unlabelled aggregate rows"""
+    frame = frame.copy()
+    month = frame["month"]
+    if month.dtype.kind == "M":
+        month = month.dt.strftime("%Y-%m")
+    frame["month"] = _labels(month)
+    for col in ["custodian_team", "failure_category", "failure_sub_category"]:
+        frame[col] = _labels(frame[col])
+    frame["tagged"] = frame["tagged"].astype(bool)
+    frame["incidents"] = frame["incidents"].astype(np.int64)
+    frame["minutes"] = frame["minutes"].fillna(0).astype("float64")
+    frame["timed"] = frame["timed"].astype(np.int64)
+    return frame.groupby(DIMENSIONS, sort=True)[MEASURES].sum()
+
+
+class Rollups:
+    """Lazily built cube of one data version; `advance` derives the next version's"""
+
+    def __init__(self, cube=None):
+        self.cube = cube
+
+    def get(self, df):
+        if self.cube is None:
+            self.cube = contributions(df)
+        return self.cube
+
+    def advance(self, old_df, new_df, rows):
+        """Rollups after the incidents at positions `rows` changed from `old_df` to `new_df`"""
+        if self.cube is None:
+            return Rollups()
+        removed = contributions(old_df.iloc[rows])
+        added = contributions(new_df.iloc[rows])
+        cube = self.cube.add(added, fill_value=0).sub(removed, fill_value=0)
+        cube = cube[cube["incidents"] > 0].astype({"incidents": np.int64, "timed": np.int64})
+        return Rollups(cube)
+
+
+def sidebar_scope(teams, tagged):
+    """`summarize` arguments for the sidebar's teams and tagged state.
+
+    No team picked means every team, as in the incident table.
+    """
+    return {"teams": list(teams) or None, "tagged": tagged}
+
+
+def summarize(cube, by, teams=None, tagged=None):
+    """Incidents, time spent and tagged coverage per `by` dimensions of the cube.
+
+    `teams` and `tagged` narrow the cube (see `sidebar_scope`); `teams=None`
+    keeps every team, an empty list none.
+    """
+    frame = cube.reset_index()
+    if teams is not None:
+        frame = frame[frame["custodian_team"].isin([str(t) for t in teams])]
+    if tagged is not None:
+        frame = frame[frame["tagged"] == tagged]
+    frame = frame.assign(tagged_incidents=frame["incidents"].where(frame["tagged"], 0))
+    if by:
+        out = frame.groupby(by, sort=True)[MEASURES + ["tagged_incidents"]].sum()
+    else:
+        out = frame[MEASURES + ["tagged_incidents"]].sum().to_frame().T
+    out["avg_minutes"] = out["minutes"] / out["timed"].where(out["timed"] > 0)
+    out["tagged_ratio"] = out["tagged_incidents"] / out["incidents"].where(out["incidents"] > 0)
+    return out
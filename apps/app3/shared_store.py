@@ -0,0 +1,183 @@
+"""One copy of the incident data per server process, shared by every session.
+
+The store holds the current `Snapshot`: the typed frame (with the derived
+`tagged` column), its tagged state, filter indexes, value catalog and the
+version at which each incident last changed. Snapshots are never modified.
+A commit builds the next one copy-on-write: only the edited columns and
+derived structures are copied, and everything else is shared; the
+analytics rollups move by the edited rows' contributions, the text
+index patches in just the edited rows and the incident hierarchy moves
+the re-parented subtrees. Sessions can keep reading the
+snapshot they rendered while another user saves.
+
+Saves are checked optimistically. Each incident edited since the version
+the session based its edit on is reported as a conflict and not written,
+so concurrent users never silently overwrite each other. Changes made by
+other processes (other replicas, compaction) are picked up from the change
+log or, failing that, by a full reload.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from catalog import ValueCatalog
+from change_log import (
+    COMPACT_THRESHOLD_BYTES,
+    apply_changes,
+    fold_log,
+    locked,
+    log_size,
+    read_changes_from,
+    store_signature,
+    write_changes,
+)
+from edits import DELTA_COLUMNS
+from filter_index import FilterIndex
+from hierarchy import Hierarchy
+from incident_data import load_incidents
+from rollups import Rollups
+from tagging import TaggedState
+from text_index import TextIndex
+
+
+class Snapshot:
+    """Immutable view of one data version"""
+
+    def __init__(self, version, df, tagged_state, filter_index, catalog, row_versions, rollups, text_index, hierarchy):
+        self.version = version
+        self.df = df
+        self.tagged_state = tagged_state
+        self.filter_index = filter_index
+        self.catalog = catalog
+        self.row_versions = row_versions
+        self.rollups = rollups
+        self.text_index = text_index
+        self.hierarchy = hierarchy
+
+
+class CommitResult:
+    def __init__(self, version, applied, conflicts):
+        self.version = version
+        self.applied = applied
+        self.conflicts = conflicts
+
+
+class SharedStore:
+    """Process-wide holder of the current Snapshot of one data file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        with locked(path):
+            self._reload(version=1)
+
+    # --- Loading ---
+    def _reload(self, version):
+        """Full read of snapshot + log; every incident counts as changed at `version`"""
+        df = load_incidents(self.path)
+        cells, self.log_offset = read_changes_from(self.path)
+        apply_changes(df, cells)
+        self.signature = store_signature(self.path)
+        tagged_state = TaggedState(df)
+        df["tagged"] = tagged_state.tagged
+        self.current = Snapshot(
+            version, df, tagged_state, FilterIndex(), ValueCatalog(df),
+            np.full(len(df), version, dtype=np.int64), Rollups(), TextIndex(), Hierarchy(),
+        )
+
+    def _advance(self, deltas):
+        """Next snapshot with `deltas` applied; only touched columns are copied"""
+        snap = self.current
+        deltas = deltas[deltas["column"].isin(snap.df.columns) & (deltas["column"] != "tagged")]
+        # Several caught-up log batches may set one cell more than once; only its last value lands
+        deltas = deltas.drop_duplicates(["incident_id", "column"], keep="last")
+        if not len(deltas):
+            return snap
+        version = snap.version + 1
+        columns = set(deltas["column"])
+        incident_ids = deltas["incident_id"].unique()
+
+        catalog = snap.catalog.copy(columns)
+        catalog.record_changes(snap.df, deltas)  # reads the old values, so before apply
+        df = snap.df.copy(deep=False)
+        for col in columns:
+            df[col] = snap.df[col].copy()
+        apply_changes(df, deltas)
+        tagged_state = snap.tagged_state.copy(columns)
+        tagged_state.update(df, incident_ids, list(columns))
+        df["tagged"] = tagged_state.tagged
+        filter_index = snap.filter_index.copy()
+        filter_index.invalidate(columns | {"tagged"})
+        row_versions = snap.row_versions.copy()
+        rows = tagged_state.positions.get_indexer(incident_ids)
+        rows = rows[rows >= 0]
+        row_versions[rows] = version
+        rollups = snap.rollups.advance(snap.df, df, rows)
+        text_index = snap.text_index.advance(df, rows, columns)
+        hierarchy = snap.hierarchy.advance(deltas)
+
+        self.current = Snapshot(
+            version, df, tagged_state, filter_index, catalog, row_versions, rollups, text_index, hierarchy,
+        )
+        return self.current
+
+    def _refresh(self):
+        """Catch up with writes made outside this process"""
+        signature = store_signature(self.path)
+        if signature == self.signature:
+            return
+        log = signature[1]
+        if signature[0] == self.signature[0] and log is not None and log[1] >= self.log_offset:
+            # Only the log grew: replay just the new entries
+            cells, self.log_offset = read_changes_from(self.path, self.log_offset)
+            self.signature = signature
+            if cells:
+                self._advance(pd.DataFrame(cells, columns=DELTA_COLUMNS))
+            return
+        # Snapshot rewritten or log truncated elsewhere: no way to tell which incidents changed
+        self._reload(self.current.version + 1)
+
+    # --- Session API ---
+    def snapshot(self):
+        """Current snapshot, after checking the files for outside changes"""
+        with self.lock:
+            self._refresh()
+            return self.current
+
+    def commit(self, deltas, base_version, user=None):
+        """Apply the deltas whose incidents are unchanged since `base_version`.
+
+        Returns a CommitResult with the new version, the applied deltas and
+        the conflicting ones, which are not written.
+        """
+        with self.lock:
+            with locked(self.path):
+                self._refresh()
+                snap = self.current
+                rows = snap.tagged_state.positions.get_indexer(deltas["incident_id"])
+                stale = (rows >= 0) & (snap.row_versions[np.where(rows >= 0, rows, 0)] > base_version)
+                conflicts = deltas[stale].reset_index(drop=True)
+                applied = deltas[~stale].reset_index(drop=True)
+                if len(applied):
+                    write_changes(self.path, applied, user)
+                    cells, self.log_offset = read_changes_from(self.path, self.log_offset)
+                    self.signature = store_signature(self.path)
+                    self._advance(pd.DataFrame(cells, columns=DELTA_COLUMNS))
+                    if log_size(self.path) > COMPACT_THRESHOLD_BYTES:
+                        self._fold()
+            return CommitResult(self.current.version, applied, conflicts)
+
+    def compact(self):
+        """Fold the change log into the snapshot file; returns the number of cells folded"""
+        with self.lock:
+            with locked(self.path):
+                self._refresh()
+                return self._fold()
+
+    def _fold(self):
+        """Compact while caught up and holding the file lock: same data, new file identity"""
+        folded = fold_log(self.path)
+        self.signature = store_signature(self.path)
+        self.log_offset = 0
+        return folded
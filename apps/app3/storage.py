@@ -0,0 +1,630 @@
+"""Where the dashboard reads and writes incidents.
+
+Two backends expose the same interface:
+
+- `JsonStorage` serves the staged data.json through the process-wide
+  SharedStore: filters run on in-memory indexes and only the visible page
+  is sliced out of the shared frame.
+- `SqlStorage` keeps the incidents in a table. Filters, counts and paging
+  are pushed down as parameterized WHERE / ORDER BY / LIMIT / OFFSET
+  queries so only the rows on screen reach the app, and edits are written
+  back as batched MERGE statements guarded by a per-row version; save
+  versions come from a one-row counter table, bumped first in each save's
+  transaction so concurrent saves queue on its lock. It runs
+  on Snowflake and, for local runs and benchmarks, on SQLite. Text
+  queries become regular-expression predicates that match the in-memory
+  tokenizer; on Snowflake, search optimization on the text columns serves
+  them.
+
+Each rerun takes a `view()`, a read-only handle pinned to one data
+version; saves go through `commit()` on the storage itself.
+"""
+import datetime
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from catalog import MAX_OPTIONS
+from hierarchy import HIERARCHY_COLUMNS, IncidentGraph
+from incident_data import (
+    COLUMNS,
+    DATETIME_COLUMNS,
+    FLOAT_COLUMNS,
+    apply_schema,
+)
+from incident_io import CHUNK_ROWS
+from pagination import sort_positions
+from rollups import DIMENSIONS, MEASURES, cube_from_rows
+from shared_store import CommitResult, SharedStore
+from tagging import EMPTY_TOKENS, UNTAGGED_COLUMNS, TaggedState
+from text_index import COLUMN_WEIGHTS, SEARCH_COLUMNS, parse_query, term_pattern, term_weight
+
+# Rows per MERGE / IN (...) statement
+SQL_BATCH_ROWS = 500
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*){0,2}$")
+
+
+class Filters:
+    """Sidebar filter state: tagged flag, (column, accepted values) pairs, date ranges, text query.
+
+    With a text query (see text_index), matches come best first unless a
+    sort column is chosen.
+    """
+
+    def __init__(self, tagged=None, isin=(), date_ranges=None, text=""):
+        self.tagged = tagged
+        self.isin = [(col, list(values)) for col, values in isin if len(values)]
+        self.date_ranges = {col: (pd.Timestamp(a), pd.Timestamp(b)) for col, (a, b) in (date_ranges or {}).items()}
+        self.text = text.strip() if parse_query(text) else ""
+
+    def key(self):
+        return (
+            self.tagged,
+            tuple((col, tuple(values)) for col, values in self.isin),
+            tuple(sorted(self.date_ranges.items())),
+            self.text,
+        )
+
+
+def _matches_number(numbers, query):
+    return pd.Series(numbers).str.contains(query, case=False, regex=False).to_numpy()
+
+
+# --- JSON file, shared in memory ---
+class JsonView:
+    """One snapshot of the shared store, answered from its indexes"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.df = snapshot.df
+        self.catalog = snapshot.catalog
+        self.columns = [c for c in self.df.columns if c != "tagged"]
+        self._last = (None, None)
+
+    def _positions(self, filters):
+        if self._last[0] == filters.key():
+            return self._last[1]
+        mask = None
+        if filters.tagged is not None:
+            mask = self.df["tagged"].to_numpy() == filters.tagged
+        positions = self.snapshot.filter_index.query(
+            self.df, mask=mask, isin=filters.isin, date_ranges=filters.date_ranges
+        )
+        if filters.text:
+            # Ranked text matches that also pass the other filters
+            ranked, _ = self.snapshot.text_index.get(self.df).search(filters.text)
+            if len(positions) < len(self.df):
+                keep = np.zeros(len(self.df), dtype=bool)
+                keep[positions] = True
+                ranked = ranked[keep[ranked]]
+            positions = ranked
+        self._last = (filters.key(), positions)
+        return positions
+
+    def values(self, col):
+        return self.catalog.values(self.df, col)
+
+    def count(self, col, value):
+        return self.catalog.count(self.df, col, value)
+
+    def cardinality(self, col):
+        return self.catalog.cardinality(self.df, col)
+
+    def search_values(self, col, query="", limit=MAX_OPTIONS):
+        return self.catalog.search(self.df, col, query, limit)
+
+    def incident_labels(self, incident_ids):
+        return {i: self.catalog.incident_label(i) for i in incident_ids}
+
+    def count_matching(self, filters):
+        return len(self._positions(filters))
+
+    def page(self, filters, sort_by=None, descending=False, offset=0, limit=None):
+        positions = self._positions(filters)
+        if sort_by:
+            positions = sort_positions(self.df, positions, sort_by, ascending=not descending)
+        end = None if limit is None else offset + limit
+        return self.df.iloc[positions[offset:end]]
+
+    def matching_ids(self, filters, number_query="", limit=MAX_OPTIONS):
+        """(first `limit` matching incident ids, total matches), optionally by incident number"""
+        positions = self._positions(filters)
+        ids = self.df["incident_id"].to_numpy()[positions]
+        if number_query.strip():
+            numbers = self.df["incident_number"].to_numpy()[positions].astype(str)
+            ids = ids[_matches_number(numbers, number_query.strip())]
+        return ids[:limit].tolist(), len(ids)
+
+    def rows(self, incident_ids):
+        rows = self.snapshot.tagged_state.positions.get_indexer(list(incident_ids))
+        return self.df.iloc[rows[rows >= 0]]
+
+    def rollup(self):
+        return self.snapshot.rollups.get(self.df)
+
+    def chunks(self, filters, chunk_rows=CHUNK_ROWS):
+        """Matching incidents in incident_id order, sliced from the snapshot `chunk_rows` at a time"""
+        positions = self._positions(filters)
+        positions = positions[np.argsort(self.df["incident_id"].to_numpy()[positions], kind="stable")]
+        for start in range(0, len(positions), chunk_rows):
+            yield self.df.iloc[positions[start:start + chunk_rows]]
+
+    def hierarchy(self):
+        return self.snapshot.hierarchy.get(self.df)
+
+
+class JsonStorage:
+    """data.json plus its change log, held once per process by SharedStore"""
+
+    name = "json"
+
+    def __init__(self, path):
+        self.path = path
+        self.store = SharedStore(path)
+
+    def view(self):
+        return JsonView(self.store.snapshot())
+
+    def version(self):
+        return self.store.snapshot().version
+
+    def commit(self, deltas, base_version, user=None):
+        return self.store.commit(deltas, base_version, user)
+
+    def compact(self):
+        return self.store.compact()
+
+
+# --- SQL table ---
+class SqlDialect:
+    """Placeholders, column types, month bucket, regex match and the batched MERGE of one SQL engine"""
+
+    def __init__(self, name, placeholder, types, month, regexp, begin=None):
+        self.name = name
+        self.placeholder = placeholder
+        self.types = types
+        self.month = month
+        self.regexp = regexp
+        # Statement opening a multi-statement transaction, where the driver does not open one itself
+        self.begin = begin
+
+    def marks(self, n):
+        return ", ".join([self.placeholder] * n)
+
+    def column_type(self, col):
+        if col == "incident_id":
+            return self.types["int"]
+        if col in FLOAT_COLUMNS:
+            return self.types["float"]
+        if col in DATETIME_COLUMNS:
+            return self.types["datetime"]
+        return self.types["text"]
+
+    def merge(self, table, col, pairs, version, base_version):
+        """(sql, params) updating `col` from (incident_id, value) pairs, skipping rows changed after base"""
+        p = self.placeholder
+        values = ", ".join([f"({p}, {p})"] * len(pairs))
+        flat = [x for pair in pairs for x in pair]
+        if self.name == "sqlite":
+            # SQLite has no MERGE; UPDATE ... FROM a VALUES list is its single-statement equivalent
+            sql = (
+                f"WITH s(incident_id, value) AS (VALUES {values}) "
+                f"UPDATE {table} SET {col} = s.value, row_version = {p} FROM s "
+                f"WHERE {table}.incident_id = s.incident_id "
+                f"AND ({table}.row_version <= {p} OR {table}.row_version = {p})"
+            )
+            return sql, flat + [version, base_version, version]
+        sql = (
+            f"MERGE INTO {table} t "
+            f"USING (SELECT column1 AS incident_id, column2 AS value FROM VALUES {values}) s "
+            f"ON t.incident_id = s.incident_id "
+            f"WHEN MATCHED AND (t.row_version <= {p} OR t.row_version = {p}) "
+            f"THEN UPDATE SET {col} = s.value, row_version = {p}"
+        )
+        return sql, flat + [base_version, version, version]
+
+
+SQLITE = SqlDialect(
+    "sqlite", "?", {"int": "INTEGER", "float": "REAL", "datetime": "TEXT", "text": "TEXT"},
+    month="SUBSTR({}, 1, 7)", regexp="{} REGEXP {}",
+)
+# snowflake-connector-python binds client side with the default "pyformat" paramstyle
+SNOWFLAKE = SqlDialect("snowflake", "%s", {
+    "int": "NUMBER(38, 0)", "float": "FLOAT", "datetime": "TIMESTAMP_NTZ", "text": "VARCHAR",
+}, month="TO_CHAR({}, 'YYYY-MM')", regexp="REGEXP_LIKE({}, {}, 's')", begin="BEGIN")
+
+
+def sql_value(val):
+    """Python value the DB-API driver can bind (ISO text for timestamps, None for nulls)"""
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return None
+    if isinstance(val, datetime.datetime):
+        return pd.Timestamp(val).isoformat()
+    if isinstance(val, np.generic):
+        return val.item()
+    return val
+
+
+def tagged_sql(columns=COLUMNS):
+    """SQL predicate matching TaggedState: some classified column holds a value"""
+    tokens = ", ".join("'" + t + "'" for t in EMPTY_TOKENS)
+    parts = []
+    for col in columns:
+        if col in UNTAGGED_COLUMNS:
+            continue
+        if col in FLOAT_COLUMNS or col in DATETIME_COLUMNS:
+            parts.append(f"{col} IS NOT NULL")
+        else:
+            parts.append(f"({col} IS NOT NULL AND TRIM(CAST({col} AS VARCHAR)) NOT IN ({tokens}))")
+    return "(" + " OR ".join(parts) + ")"
+
+
+def _sqlite_regexp(pattern, value):
+    """SQLite's REGEXP operator, which it leaves to the application; whole-value match like Snowflake"""
+    return value is not None and re.fullmatch(pattern, value, re.S) is not None
+
+
+def _like_pattern(query):
+    escaped = query.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SqlView:
+    """Queries against the table for one data version; facet counts are cached per version"""
+
+    def __init__(self, storage, version):
+        self.storage = storage
+        self.version = version
+        self.columns = list(COLUMNS)
+
+    def _where(self, filters):
+        p = self.storage.dialect.placeholder
+        clauses, params = [], []
+        if filters.tagged is not None:
+            clauses.append(tagged_sql() if filters.tagged else f"NOT {tagged_sql()}")
+        for col, values in filters.isin:
+            self.storage.check_column(col)
+            clauses.append(f"{col} IN ({self.storage.dialect.marks(len(values))})")
+            params.extend(sql_value(v) for v in values)
+        for col, (start, end) in filters.date_ranges.items():
+            self.storage.check_column(col)
+            clauses.append(f"{col} >= {p} AND {col} <= {p}")
+            params.extend([sql_value(start), sql_value(end)])
+        for term in parse_query(filters.text):
+            clauses.append("(" + " OR ".join(self._matches(col) for col in SEARCH_COLUMNS) + ")")
+            params.extend([term_pattern(term)] * len(SEARCH_COLUMNS))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _matches(self, col):
+        return self.storage.dialect.regexp.format(f"LOWER({col})", self.storage.dialect.placeholder)
+
+    def _rank(self, filters):
+        """(ORDER BY clause, params): best text matches first, like TextIndex"""
+        terms = parse_query(filters.text)
+        if not terms:
+            return "incident_id", []
+        score = " + ".join(
+            f"CASE WHEN {self._matches(col)} THEN {COLUMN_WEIGHTS[col] * term_weight(term)} ELSE 0 END"
+            for term in terms for col in SEARCH_COLUMNS
+        )
+        return f"{score} DESC, incident_id", [term_pattern(term) for term in terms for _ in SEARCH_COLUMNS]
+
+    def _counts(self, col):
+        def load():
+            self.storage.check_column(col)
+            rows = self.storage.fetch(
+                f"SELECT {col}, COUNT(*) FROM {self.storage.table} WHERE {col} IS NOT NULL GROUP BY {col}"
+            )
+            return {value: int(n) for value, n in rows}
+        return self.storage.cached(self.version, ("counts", col), load)
+
+    def values(self, col):
+        return sorted(self._counts(col), key=str)
+
+    def count(self, col, value):
+        return self._counts(col).get(value, 0)
+
+    def cardinality(self, col):
+        return len(self._counts(col))
+
+    def search_values(self, col, query="", limit=MAX_OPTIONS):
+        self.storage.check_column(col)
+        p = self.storage.dialect.placeholder
+        where, params = f"WHERE {col} IS NOT NULL", []
+        if query.strip():
+            where += f" AND LOWER(CAST({col} AS VARCHAR)) LIKE {p} ESCAPE '\\'"
+            params.append(_like_pattern(query.strip()))
+        rows = self.storage.fetch(
+            f"SELECT {col}, COUNT(*) AS n FROM {self.storage.table} {where} "
+            f"GROUP BY {col} ORDER BY n DESC, {col} LIMIT {p}",
+            params + [limit],
+        )
+        return [value for value, _ in rows]
+
+    def incident_labels(self, incident_ids):
+        numbers = {}
+        for batch in _batches(list(incident_ids)):
+            rows = self.storage.fetch(
+                f"SELECT incident_id, incident_number FROM {self.storage.table} "
+                f"WHERE incident_id IN ({self.storage.dialect.marks(len(batch))})",
+                [sql_value(i) for i in batch],
+            )
+            numbers.update((int(i), n) for i, n in rows)
+        return {i: f"ID {i} - {numbers.get(i, '?')}" for i in incident_ids}
+
+    def count_matching(self, filters):
+        where, params = self._where(filters)
+        return self.storage.cached(
+            self.version, ("count", filters.key()),
+            lambda: int(self.storage.fetch(f"SELECT COUNT(*) FROM {self.storage.table}{where}", params)[0][0]),
+        )
+
+    def page(self, filters, sort_by=None, descending=False, offset=0, limit=None):
+        where, params = self._where(filters)
+        order, rank_params = self._rank(filters)
+        if sort_by:
+            self.storage.check_column(sort_by)
+            order = f"{sort_by} {'DESC' if descending else 'ASC'} NULLS LAST, {order}"
+        params = params + rank_params
+        p = self.storage.dialect.placeholder
+        sql = f"SELECT {', '.join(self.columns)} FROM {self.storage.table}{where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {p} OFFSET {p}"
+            params = params + [int(limit), int(offset)]
+        return self.storage.frame(sql, params)
+
+    def matching_ids(self, filters, number_query="", limit=MAX_OPTIONS):
+        where, params = self._where(filters)
+        if number_query.strip():
+            p = self.storage.dialect.placeholder
+            where += (" AND " if where else " WHERE ") + f"LOWER(incident_number) LIKE {p} ESCAPE '\\'"
+            params = params + [_like_pattern(number_query.strip())]
+        table = self.storage.table
+        total = int(self.storage.fetch(f"SELECT COUNT(*) FROM {table}{where}", params)[0][0])
+        order, rank_params = self._rank(filters)
+        rows = self.storage.fetch(
+            f"SELECT incident_id FROM {table}{where} ORDER BY {order} LIMIT {self.storage.dialect.placeholder}",
+            params + rank_params + [int(limit)],
+        )
+        return [int(i) for i, in rows], total
+
+    def chunks(self, filters, chunk_rows=CHUNK_ROWS):
+        """Matching incidents in incident_id order, one keyset-paginated query per `chunk_rows`"""
+        where, params = self._where(filters)
+        p = self.storage.dialect.placeholder
+        last = None
+        while True:
+            after = "" if last is None else (" AND " if where else " WHERE ") + f"incident_id > {p}"
+            frame = self.storage.frame(
+                f"SELECT {', '.join(self.columns)} FROM {self.storage.table}{where}{after} "
+                f"ORDER BY incident_id LIMIT {p}",
+                params + ([] if last is None else [last]) + [int(chunk_rows)],
+            )
+            if len(frame):
+                yield frame
+            if len(frame) < chunk_rows:
+                return
+            last = int(frame["incident_id"].iloc[-1])
+
+    def rows(self, incident_ids):
+        frames = []
+        for batch in _batches(list(incident_ids)):
+            frames.append(self.storage.frame(
+                f"SELECT {', '.join(self.columns)} FROM {self.storage.table} "
+                f"WHERE incident_id IN ({self.storage.dialect.marks(len(batch))}) ORDER BY incident_id",
+                [sql_value(i) for i in batch],
+            ))
+        if not frames:
+            return self.storage.frame(f"SELECT {', '.join(self.columns)} FROM {self.storage.table} WHERE 1 = 0")
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def rollup(self):
+        """Analytics cube aggregated by the warehouse, once per data version"""
+        def load():
+            month = self.storage.dialect.month.format("record_created_on")
+            rows = self.storage.fetch(
+                f"SELECT custodian_team, failure_category, failure_sub_category, {month}, "
+                f"CASE WHEN {tagged_sql()} THEN 1 ELSE 0 END, "
+                f"COUNT(*), SUM(actual_time_spent_in_minutes), COUNT(actual_time_spent_in_minutes) "
+                f"FROM {self.storage.table} GROUP BY 1, 2, 3, 4, 5"
+            )
+            return cube_from_rows(pd.DataFrame(rows, columns=DIMENSIONS + MEASURES))
+        return self.storage.cached(self.version, ("rollup",), load)
+
+    def hierarchy(self):
+        return self.storage.hierarchy(self.version)
+
+
+def _batches(items, size=SQL_BATCH_ROWS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SqlStorage:
+    """Incidents in a SQL table with a `row_version` column for optimistic saves"""
+
+    name = "sql"
+
+    def __init__(self, connection, table, dialect=SQLITE):
+        if not _IDENTIFIER.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.connection = connection
+        self.table = table
+        self.dialect = dialect
+        # DB-API connections are not safe to share between session threads
+        self.lock = threading.RLock()
+        if dialect.name == "sqlite":
+            connection.create_function("REGEXP", 2, _sqlite_regexp, deterministic=True)
+        self._cache_version = None
+        self._cache = {}
+        self._version_table_ready = False
+        # Incident graph and its version: kept across this process's own saves, rebuilt after anyone else's
+        self._graph = None
+        self._graph_version = None
+
+    @staticmethod
+    def check_column(col):
+        if col not in COLUMNS and col != "row_version":
+            raise ValueError(f"Unknown incident column: {col!r}")
+
+    def fetch(self, sql, params=()):
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.execute(sql, list(params))
+                return cur.fetchall()
+            finally:
+                cur.close()
+
+    def frame(self, sql, params=()):
+        """Query result typed like the JSON frame, with the derived tagged column"""
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.execute(sql, list(params))
+                names = [d[0].lower() for d in cur.description]
+                df = pd.DataFrame(cur.fetchall(), columns=names)
+            finally:
+                cur.close()
+        df = apply_schema(df)
+        df["tagged"] = TaggedState(df).tagged
+        return df
+
+    def cached(self, version, key, load):
+        with self.lock:
+            if self._cache_version != version:
+                self._cache_version, self._cache = version, {}
+            if key not in self._cache:
+                self._cache[key] = load()
+            return self._cache[key]
+
+    def hierarchy(self, version):
+        """Incident graph (row positions in incident_id order) at `version`"""
+        with self.lock:
+            if self._graph_version != version:
+                rows = self.fetch(f"SELECT {', '.join(HIERARCHY_COLUMNS)} FROM {self.table} ORDER BY incident_id")
+                df = pd.DataFrame(rows, columns=HIERARCHY_COLUMNS)
+                df["actual_time_spent_in_minutes"] = pd.to_numeric(df["actual_time_spent_in_minutes"], errors="coerce")
+                self._graph, self._graph_version = IncidentGraph(df), version
+            return self._graph
+
+    def version(self):
+        return int(self.fetch(f"SELECT COALESCE(MAX(row_version), 0) FROM {self.table}")[0][0])
+
+    @property
+    def version_table(self):
+        return f"{self.table}_version"
+
+    def _create_version_table(self, cur):
+        """The save version counter, seeded from the table's newest row version"""
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {self.version_table} (version INTEGER NOT NULL)")
+        cur.execute(
+            f"INSERT INTO {self.version_table} (version) "
+            f"SELECT v FROM (SELECT COALESCE(MAX(row_version), 0) AS v FROM {self.table}) seed "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {self.version_table})"
+        )
+        self.connection.commit()
+        self._version_table_ready = True
+
+    def _next_version(self, cur):
+        """Bump the counter inside the open transaction; its row lock holds off other saves until commit"""
+        if not self._version_table_ready:
+            self._create_version_table(cur)
+        if self.dialect.begin:
+            cur.execute(self.dialect.begin)
+        # Only ever one row; a second one from two concurrent first seeds is bumped alike and harmless
+        cur.execute(f"UPDATE {self.version_table} SET version = version + 1")
+        cur.execute(f"SELECT MAX(version) FROM {self.version_table}")
+        return int(cur.fetchone()[0])
+
+    def view(self):
+        return SqlView(self, self.version())
+
+    def commit(self, deltas, base_version, user=None):
+        """Write deltas whose incidents are unchanged since `base_version` in one transaction"""
+        deltas = deltas.drop_duplicates(["incident_id", "column"], keep="last").reset_index(drop=True)
+        ids = [sql_value(i) for i in deltas["incident_id"].unique()]
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                # Taken before the stale check, so no other save lands between the check and the MERGE
+                version = self._next_version(cur)
+                stale = set()
+                for batch in _batches(ids):
+                    cur.execute(
+                        f"SELECT incident_id FROM {self.table} WHERE row_version > {self.dialect.placeholder} "
+                        f"AND incident_id IN ({self.dialect.marks(len(batch))})",
+                        [base_version] + batch,
+                    )
+                    stale.update(int(i) for i, in cur.fetchall())
+                is_stale = deltas["incident_id"].isin(stale).to_numpy()
+                applied = deltas[~is_stale].reset_index(drop=True)
+                conflicts = deltas[is_stale].reset_index(drop=True)
+                if not len(applied):
+                    # Nothing to write: give the version back
+                    self.connection.rollback()
+                    return CommitResult(version - 1, applied, conflicts)
+                for col, group in applied.groupby("column", sort=False):
+                    self.check_column(col)
+                    pairs = [(sql_value(i), sql_value(v)) for i, v in zip(group["incident_id"], group["value"])]
+                    for batch in _batches(pairs):
+                        cur.execute(*self.dialect.merge(self.table, col, batch, version, base_version))
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cur.close()
+            if self._graph_version == version - 1:
+                self._graph = self._graph.advance(applied)
+                self._graph_version = version if self._graph is not None else None
+        return CommitResult(version, applied, conflicts)
+
+    def create_table(self, df):
+        """Create the table and load `df` into it (for seeding and local stand-ins).
+
+        `df` may also be an iterable of frames, e.g. `read_chunks(path)`, which
+        are inserted as they come so imports run in bounded memory. Returns
+        the number of rows inserted. Raises ValueError, before reading any
+        frame, when the table already holds incidents.
+        """
+        frames = [df] if isinstance(df, pd.DataFrame) else df
+        count = 0
+        columns = list(COLUMNS)
+        ddl = ", ".join(
+            f"{c} {self.dialect.column_type(c)}" + (" PRIMARY KEY" if c == "incident_id" else "") for c in columns
+        )
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.execute(f"CREATE TABLE IF NOT EXISTS {self.table} ({ddl}, row_version INTEGER NOT NULL DEFAULT 0)")
+                cur.execute(f"SELECT 1 FROM {self.table} LIMIT 1")
+                if cur.fetchall():
+                    raise ValueError(
+                        f"Table {self.table} already holds incidents; import into a new table or drop it first"
+                    )
+                if self.dialect.name == "sqlite":
+                    # Snowflake prunes by micro-partition; SQLite needs indexes for the pushed-down filters
+                    for col in ["custodian_team", "record_created_on", "row_version"]:
+                        cur.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_{col} ON {self.table} ({col})")
+                insert = (
+                    f"INSERT INTO {self.table} ({', '.join(columns)}, row_version) "
+                    f"VALUES ({self.dialect.marks(len(columns) + 1)})"
+                )
+                # Converted to Python values one batch at a time, never the whole frame
+                for frame in frames:
+                    for start in range(0, len(frame), 10_000):
+                        records = frame.iloc[start:start + 10_000][columns].itertuples(index=False, name=None)
+                        cur.executemany(insert, [[sql_value(v) for v in row] + [0] for row in records])
+                    count += len(frame)
+                self.connection.commit()
+                self._create_version_table(cur)
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cur.close()
+        return count
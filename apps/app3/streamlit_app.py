@@ -1,31 +1,118 @@
 import streamlit as st
-import pandas as pd
-import json
 import datetime
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+# Shared helpers live in apps/shared locally and next to the app on the stage
+sys.path.append(str(Path(__file__).resolve().parent.parent / "shared"))
+import perf_trace  # noqa: E402
+
+# Third-party and app modules, timed on a cold start (see perf_trace)
+with perf_trace.timed_imports():
+    import numpy as np
+    import pandas as pd
+    from edits import bulk_edit_deltas, diff_edits
+    from incident_io import EXPORT_FORMATS, export_file
+    from normalize import hold_invalid
+    from taxonomy import FAILURE_CATEGORIES
+    from catalog import MAX_OPTIONS
+    from change_log import log_size
+    from pagination import (
+        DEFAULT_PAGE_SIZE,
+        PAGE_SIZES,
+        empty_pending,
+        merge_pending,
+        overlay_pending,
+        page_count,
+    )
+    from rollups import NO_VALUE, sidebar_scope, summarize
+    from storage import SNOWFLAKE, SQLITE, Filters, JsonStorage, SqlStorage
+
+perf_trace.start_run("load")
 
 if "update_message" in st.session_state:
     st.success(st.session_state["update_message"])
     del st.session_state["update_message"]
+if "last_changes" in st.session_state:
+    last_changes = st.session_state.pop("last_changes")
+    if len(last_changes):
+        with st.expander(f"Changed cells ({len(last_changes)})"):
+            st.dataframe(last_changes.astype(str), hide_index=True)
+if "last_conflicts" in st.session_state:
+    last_conflicts = st.session_state.pop("last_conflicts")
+    st.warning(
+        f"{last_conflicts['incident_id'].nunique()} incident(s) were changed by another user after you "
+        "loaded them, so your edits to them were not saved. Review the latest values and edit again."
+    )
+    with st.expander(f"Edits not saved ({len(last_conflicts)})"):
+        st.dataframe(last_conflicts.astype(str), hide_index=True)
+if "last_problems" in st.session_state:
+    last_problems = st.session_state.pop("last_problems")
+    st.warning(
+        f"{len(last_problems)} edit(s) to {last_problems['incident_id'].nunique()} incident(s) were not saved: "
+        "their values are outside the schema (unknown category pairs, unparseable or negative time spent)."
+    )
+    with st.expander(f"Invalid values ({len(last_problems)})"):
+        st.dataframe(last_problems.astype(str), hide_index=True)
 
 
 st.set_page_config(page_title="Incident Management", layout="wide")
 
-DATA_FILE = "data.json"
-with open(DATA_FILE, "r") as f:
-    data = json.load(f)
-df = pd.DataFrame(data)
+# The deploy bundle ships the incidents columnar as data.arrow; locally they are data.json,
+# or data.jsonl (JSON Lines) for large dumps
+DATA_FILE = next((f for f in ["data.arrow", "data.jsonl"] if os.path.exists(f)), "data.json")
 
-def is_tagged(row):
-    cols = [c for c in df.columns if c not in ["incident_id", "incident_number"]]
-    return any(str(row[c]).strip() not in ["", "None", "nan", "NaN", None] for c in cols)
+# Where incidents live: "json" (DATA_FILE, the default), "snowflake" (INCIDENT_TABLE in the
+# app's database) or "sqlite" (INCIDENT_TABLE in a local SQLite file standing in for Snowflake)
+STORAGE_BACKEND = os.environ.get("INCIDENT_STORAGE", "json")
+INCIDENT_TABLE = os.environ.get("INCIDENT_TABLE", "INCIDENTS")
+SQLITE_FILE = os.environ.get("INCIDENT_SQLITE_FILE", "incidents.db")
 
-df["tagged"] = df.apply(is_tagged, axis=1)
+# Seconds between background checks for saves made by other users
+DATA_POLL_SECONDS = 15
+# Rows listed in the hierarchy panel's tables
+HIERARCHY_ROWS = 500
+
+@perf_trace.cached("storage", st.cache_resource(show_spinner="Loading incidents..."))
+def get_storage(backend, path):
+    """One storage handle per server process, shared by all sessions"""
+    if backend == "snowflake":
+        from snowflake.snowpark.context import get_active_session
+        return SqlStorage(get_active_session().connection, INCIDENT_TABLE, SNOWFLAKE)
+    if backend == "sqlite":
+        return SqlStorage(sqlite3.connect(SQLITE_FILE, check_same_thread=False), INCIDENT_TABLE, SQLITE)
+    return JsonStorage(path)
+
+# Read-only view of one data version; filters, counts and pages are answered by the backend.
+# Tagging happens when a version is loaded or saved, so it is timed as part of "load" / "save".
+storage = get_storage(STORAGE_BACKEND, DATA_FILE)
+view = storage.view()
+
+# Saves are checked against the version this session last showed
+base_version = st.session_state.get("seen_version", view.version)
+if view.version > base_version:
+    st.info("Incidents were changed by another user since your last view; showing the latest data.")
+st.session_state["seen_version"] = view.version
+perf_trace.mark("sidebar")
 
 # Sidebar filters
 st.sidebar.header("Filters")
 filter_type = st.sidebar.radio("Show", ["All", "Tagged", "Untagged"])
-custodian_teams = df["custodian_team"].dropna().unique().tolist()
-selected_teams = st.sidebar.multiselect("Custodian Team", custodian_teams, default=custodian_teams)
+text_query = st.sidebar.text_input(
+    "Search incidents",
+    key="text_search",
+    help="Finds words in the incident number, failure reason, caused by, action taken and comments. "
+    'Use disk* for words starting with "disk" and "disk full" in quotes for a phrase. Best matches come first.',
+)
+def with_count(col):
+    return lambda v: f"{v} ({view.count(col, v):,})"
+
+custodian_teams = view.values("custodian_team")
+selected_teams = st.sidebar.multiselect(
+    "Custodian Team", custodian_teams, default=custodian_teams, format_func=with_count("custodian_team")
+)
 
 # --- Date range filter ---
 max_date = datetime.datetime.today() + datetime.timedelta(days=1)
@@ -36,55 +123,162 @@ date_range = st.sidebar.date_input(
            max_date.date() if pd.notnull(max_date) else datetime.date.today())
 )
 
-filtered_df = df.copy()
-if filter_type == "Tagged":
-    filtered_df = filtered_df[filtered_df["tagged"]]
-elif filter_type == "Untagged":
-    filtered_df = filtered_df[~filtered_df["tagged"]]
-if selected_teams:
-    filtered_df = filtered_df[filtered_df["custodian_team"].isin(selected_teams)]
-
-# --- Apply date range filter ---
-if isinstance(date_range, tuple) and len(date_range) == 2:
-    start_date, end_date = date_range
-    start_ts = pd.Timestamp(start_date)
-    end_ts = pd.Timestamp(end_date)
-    filtered_df = filtered_df[
-        (pd.to_datetime(filtered_df["record_created_on"], errors="coerce") >= start_ts) &
-        (pd.to_datetime(filtered_df["record_created_on"], errors="coerce") <= end_ts)
-    ]
+# --- Change log maintenance (JSON backend only; tables are written in place) ---
+pending_bytes = log_size(storage.path) if isinstance(storage, JsonStorage) else None
+if pending_bytes is not None:
+    with st.sidebar.expander("Storage"):
+        st.caption(f"Unsaved-to-snapshot change log: {pending_bytes / 1024:.1f} KiB")
+        if st.button("Compact change log", disabled=pending_bytes == 0):
+            folded = storage.compact()
+            st.session_state["update_message"] = f"Compacted {folded} change(s) into {DATA_FILE}."
+            st.rerun()
 
 # --- Advanced Multi-Column Filter ---
 multi_filter_cols = st.sidebar.multiselect(
     "Select columns to filter",
-    options=[c for c in df.columns if c not in ["incident_id", "incident_number", "tagged", "record_created_on", "record_updated_on"]],
+    # Free-text comments are found through the search box; the searchable category columns keep their filters
+    options=[c for c in view.columns if c not in ["incident_id", "incident_number", "tagged", "record_created_on", "record_updated_on", "comments"]],
     key="multi_filter_columns"  # <-- Add a unique key here
 )
 multi_filter_values = {}
 for col in multi_filter_cols:
-    unique_vals = df[col].dropna().unique().tolist()
+    if view.cardinality(col) > MAX_OPTIONS:
+        # Too many distinct values for one list: search, then pick from the top matches
+        query = st.sidebar.text_input(f"Search {col.replace('_', ' ').title()}", key=f"multi_filter_search_{col}")
+        chosen = st.session_state.get(f"multi_filter_{col}", [])
+        unique_vals = chosen + [v for v in view.search_values(col, query) if v not in chosen]
+    else:
+        unique_vals = view.values(col)
     multi_filter_values[col] = st.sidebar.multiselect(
         f"Filter {col.replace('_', ' ').title()}",
         options=unique_vals,
         default=[],
+        format_func=with_count(col),
         key=f"multi_filter_{col}"  # <-- Unique key for each column
     )
-for col, vals in multi_filter_values.items():
-    if vals:
-        filtered_df = filtered_df[filtered_df[col].isin(vals)]
 
-# Convert date columns to datetime
-for date_col in ["record_created_on", "record_updated_on"]:
-    if date_col in filtered_df.columns:
-        filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], errors="coerce")
+# --- All filters as one query, run by the backend (indexes in memory, WHERE clause in SQL) ---
+perf_trace.mark("filter")
+date_ranges = {}
+if isinstance(date_range, tuple) and len(date_range) == 2:
+    start_date, end_date = date_range
+    date_ranges["record_created_on"] = (pd.Timestamp(start_date), pd.Timestamp(end_date))
+filters = Filters(
+    tagged={"Tagged": True, "Untagged": False}.get(filter_type),
+    isin=[("custodian_team", selected_teams)] + list(multi_filter_values.items()),
+    date_ranges=date_ranges,
+    text=text_query,
+)
+total_matching = view.count_matching(filters)
 
+perf_trace.mark("render")
 st.title("🚨 Incident Management Dashboard")
+
+# Poll the storage so other users' saves are flagged without waiting for an interaction
+fragment = getattr(st, "fragment", None)
+if fragment is not None:
+    @fragment(run_every=DATA_POLL_SECONDS)
+    def watch_for_updates():
+        if storage.version() > st.session_state.get("seen_version", 0):
+            st.warning("Incidents were changed by another user.")
+            if st.button("Load latest data"):
+                st.rerun()
+
+    watch_for_updates()
+
+# --- Analytics: answered from the rollup cube, never from the raw rows ---
+with st.expander("📊 Analytics"), perf_trace.phase("analytics"):
+    cube = view.rollup()
+    scope = sidebar_scope(selected_teams, filters.tagged)
+    st.caption("Selected teams and tagged state; date and column filters do not apply here.")
+    overall = summarize(cube, [], **scope).iloc[0]
+    total_col, minutes_col, coverage_col = st.columns(3)
+    total_col.metric("Incidents", f"{int(overall['incidents']):,}")
+    minutes_col.metric("Time spent (h)", f"{overall['minutes'] / 60:,.1f}")
+    coverage_col.metric("Tagged coverage", f"{overall['tagged_ratio']:.1%}" if pd.notna(overall["tagged_ratio"]) else "–")
+
+    group_labels = {
+        "Team": "custodian_team",
+        "Category": "failure_category",
+        "Sub-category": "failure_sub_category",
+    }
+    group_by = group_labels[st.radio("Group by", list(group_labels), horizontal=True, key="analytics_group")]
+    by_group = summarize(cube, [group_by], **scope)
+    if len(by_group):
+        count_col, time_col = st.columns(2)
+        count_col.bar_chart(by_group["incidents"], y_label="Incidents")
+        time_col.bar_chart(by_group["minutes"], y_label="Minutes spent")
+
+    st.write("Monthly trend (record created on)")
+    monthly = summarize(cube, ["month"], **scope).drop(index=NO_VALUE, errors="ignore")
+    if len(monthly):
+        st.line_chart(monthly[["incidents", "tagged_incidents"]])
+    else:
+        st.caption("No incidents with a creation date in this selection.")
+    st.dataframe(
+        by_group[["incidents", "minutes", "avg_minutes", "tagged_ratio"]],
+        column_config={
+            "minutes": st.column_config.NumberColumn("Minutes", format="%.0f"),
+            "avg_minutes": st.column_config.NumberColumn("Avg minutes", format="%.1f"),
+            "tagged_ratio": st.column_config.ProgressColumn("Tagged", min_value=0.0, max_value=1.0, format="%.2f"),
+        },
+    )
+
+# --- Hierarchy: parent/child links answered from the precomputed incident graph ---
+with st.expander("🌳 Incident hierarchy"), perf_trace.phase("hierarchy"):
+    graph = view.hierarchy()
+    dangling, cycles = graph.problems()
+    st.caption("All incidents; filters do not apply here.")
+    dangling_col, cycle_col = st.columns(2)
+    dangling_col.metric("Unknown parent", f"{len(dangling):,}")
+    cycle_col.metric("On a parent cycle", f"{len(cycles):,}")
+    problems = np.concatenate([dangling, cycles])[:HIERARCHY_ROWS]
+    if len(problems):
+        st.dataframe(
+            pd.DataFrame({
+                "incident_number": graph.numbers[problems],
+                "parent_incident_number": graph.parent_numbers[problems],
+                "problem": np.where(graph.cycle[problems], "parent cycle", "unknown parent"),
+            }),
+            hide_index=True,
+        )
+
+    number = st.text_input("Incident number", key="hierarchy_number").strip()
+    pos = graph.position(number) if number else -1
+    if number and pos < 0:
+        st.caption(f"No incident {number}.")
+    elif number:
+        chain = graph.ancestors(pos)
+        st.write("Parent chain: " + (" → ".join(graph.numbers[chain[::-1] + [pos]]) if chain else "(top-level incident)"))
+        sub_col, sub_time_col, chain_time_col = st.columns(3)
+        sub_col.metric("Descendants", f"{graph.size[pos] - 1:,}")
+        sub_time_col.metric("Subtree time spent (h)", f"{graph.subtree_minutes[pos] / 60:,.1f}")
+        chain_time_col.metric("Chain time spent (h)", f"{graph.chain_minutes[pos] / 60:,.1f}")
+        subtree = graph.subtree(pos)[:HIERARCHY_ROWS]
+        subtree_ids = graph.ids[subtree]
+        subtree_rows = view.rows(subtree_ids).set_index("incident_id").reindex(subtree_ids)
+        indent = graph.depth[subtree] - graph.depth[pos]
+        st.dataframe(
+            pd.DataFrame({
+                "incident": ["　" * d + str(n) for d, n in zip(indent.tolist(), graph.numbers[subtree])],
+                "failure_reason": subtree_rows["failure_reason"].to_numpy(),
+                "minutes": graph.minutes[subtree],
+                "subtree_minutes": graph.subtree_minutes[subtree],
+            }),
+            column_config={
+                "minutes": st.column_config.NumberColumn("Minutes", format="%.0f"),
+                "subtree_minutes": st.column_config.NumberColumn("Subtree minutes", format="%.0f"),
+            },
+            hide_index=True,
+        )
+        if graph.size[pos] > HIERARCHY_ROWS:
+            st.caption(f"Showing the first {HIERARCHY_ROWS} of {graph.size[pos]} incidents in the subtree.")
 st.caption("Bulk or individual edit of incidents. Select rows and update fields for all selected.")
 
 # Toggle for table editability
 editable = st.toggle("Enable Table Editing", value=False)
 
-edit_cols = [c for c in df.columns if c not in ["tagged"]]
+edit_cols = [c for c in view.columns if c not in ["tagged"]]
 
 # Set column config for data_editor
 column_config = {}
@@ -102,7 +296,7 @@ for col in edit_cols:
     elif col == "failure_category":
         column_config[col] = st.column_config.SelectboxColumn(
             col.replace("_", " ").title(),
-            options=["Hardware", "Software"]
+            options=FAILURE_CATEGORIES
         )
     elif col in [
         "record_created_on",
@@ -128,75 +322,100 @@ for col in edit_cols:
         )
 
 st.write("### Incident Table (Edit single rows directly below)")
+
+# --- Server-side sort and pagination: only the visible page is sent ---
+sort_col, sort_dir, size_col, page_col = st.columns([3, 2, 2, 2])
+sort_by = sort_col.selectbox("Sort by", ["(none)"] + edit_cols)
+descending = sort_dir.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Descending"
+page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+total_pages = page_count(total_matching, page_size)
+if st.session_state.get("incident_page", 1) > total_pages:
+    st.session_state["incident_page"] = total_pages
+page = page_col.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, step=1, key="incident_page")
+
+page_df = view.page(
+    filters,
+    sort_by=None if sort_by == "(none)" else sort_by,
+    descending=descending,
+    offset=(page - 1) * page_size,
+    limit=page_size,
+)[edit_cols]
+st.caption(
+    f"Rows {(page - 1) * page_size + min(1, len(page_df))}–{(page - 1) * page_size + len(page_df)} "
+    f"of {total_matching}"
+)
+
+# --- Download: every filtered incident, written chunk by chunk only when clicked ---
+format_col, download_col = st.columns([2, 3])
+export_format = format_col.radio("Download as", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+
+def export_filtered(view=view, filters=filters, export_format=export_format):
+    return export_file(view.chunks(filters), export_format, edit_cols)
+
+download_col.download_button(
+    f"Download {total_matching:,} filtered incidents",
+    data=export_filtered,
+    file_name="incidents" + EXPORT_FORMATS[export_format][0],
+    mime=EXPORT_FORMATS[export_format][1],
+    on_click="ignore",
+)
+
+# Edits are kept per incident_id across pages until saved
+pending = st.session_state.get("pending_edits", empty_pending())
 edited_df = st.data_editor(
-    filtered_df[edit_cols],
+    overlay_pending(page_df, pending),
     column_config=column_config,
     disabled=not editable,
     use_container_width=True,
     hide_index=True,
     num_rows="fixed"
 )
+if editable:
+    pending = merge_pending(pending, page_df["incident_id"], diff_edits(page_df, edited_df, edit_cols))
+    st.session_state["pending_edits"] = pending
+    if len(pending):
+        # Pending edits are checked against the version of their first edit
+        st.session_state.setdefault("pending_base", base_version)
+        st.caption(f"{len(pending)} unsaved cell edit(s) on {pending['incident_id'].nunique()} incident(s) across pages")
+    else:
+        st.session_state.pop("pending_base", None)
+
+def commit_deltas(deltas, base):
+    """Save changed cells through the storage backend; invalid values and incidents changed after `base` are refused"""
+    # Checked like imported records; cells outside the schema are held back and reported
+    deltas, held = hold_invalid(view.rows(deltas["incident_id"].unique()), deltas)
+    if len(held):
+        st.session_state["last_problems"] = held
+    result = storage.commit(deltas, base)
+    st.session_state["seen_version"] = result.version
+    st.session_state["last_changes"] = result.applied
+    if len(result.conflicts):
+        st.session_state["last_conflicts"] = result.conflicts
+    return result.applied["incident_id"].nunique()
 
 if editable and st.button("Save Table Changes"):
-    updated_count = 0
-    for idx, row in edited_df.iterrows():
-        eid = row["incident_id"]
-        orig_row = filtered_df[filtered_df["incident_id"] == eid].iloc[0]
-        row_updated = False
-        updated_cols = {}
-        for col in edit_cols:
-            if col in ["incident_id", "incident_number"]:
-                continue  # skip non-editable columns
-            old_val = orig_row[col]
-            new_val = row[col]
-            # Fix for actual_time_spent_in_minutes
-            if col == "actual_time_spent_in_minutes":
-                try:
-                    if new_val in ["", None]:
-                        new_val = None
-                    else:
-                        new_val = float(new_val)
-                except:
-                    new_val = None
-            # Fix for date columns
-            if col in ["record_created_on", "record_updated_on"]:
-                if pd.notnull(new_val) and isinstance(new_val, (datetime.datetime, pd.Timestamp)):
-                    new_val = new_val.isoformat()
-                elif isinstance(new_val, str):
-                    new_val = new_val
-                else:
-                    new_val = ""
-            if pd.isnull(old_val) and new_val not in [None, ""]:
-                row_updated = True
-            elif new_val != old_val and new_val not in [None, ""]:
-                row_updated = True
-            if row_updated:
-                updated_cols[col] = new_val
-        # Only update if changed
-        if row_updated:
-            for col, val in updated_cols.items():
-                df.loc[df["incident_id"] == eid, col] = val
-            updated_count += 1
-    df_save = df.drop(columns=["tagged"]).copy()
-    df_save = df_save.where(pd.notnull(df_save), None)
-    records = df_save.to_dict(orient="records")
-    # Replace any NaN with None in the dicts
-    for rec in records:
-        for k, v in rec.items():
-            if isinstance(v, float) and pd.isna(v):
-                rec[k] = None
-    with open(DATA_FILE, "w") as f:
-        json.dump(records, f, indent=2)
-    # st.session_state["update_message"] = f"Table changes saved! {updated_count} row(s) updated."
+    # Changed cells from every page, keyed by incident_id
+    with perf_trace.phase("save"):
+        commit_deltas(pending, st.session_state.pop("pending_base", base_version))
+    st.session_state["pending_edits"] = empty_pending()
     st.rerun()
 
 st.write("---")
 st.write("### Bulk Edit Selected Incidents")
+incident_query = st.text_input("Find incident number", key="incident_search")
+chosen_ids = st.session_state.get("bulk_selected_ids", [])
+# Offer at most MAX_OPTIONS incidents (plus the ones already picked)
+candidate_ids, candidate_total = view.matching_ids(filters, incident_query, MAX_OPTIONS)
+incident_options = chosen_ids + [i for i in candidate_ids if i not in chosen_ids]
+incident_labels = view.incident_labels(incident_options)
 selected_ids = st.multiselect(
     "Select Incident(s) to Edit",
-    filtered_df["incident_id"],
-    format_func=lambda x: f"ID {x} - {df[df['incident_id']==x]['incident_number'].values[0]}"
+    incident_options,
+    format_func=lambda i: incident_labels.get(i, f"ID {i}"),
+    key="bulk_selected_ids",
 )
+if candidate_total > MAX_OPTIONS:
+    st.caption(f"Showing the first {MAX_OPTIONS} of {candidate_total} matching incidents. Search to narrow down.")
 
 if selected_ids:
     st.popover("Bulk Edit Selected Incidents", use_container_width=True)
@@ -209,7 +428,7 @@ if selected_ids:
             if col == "failure_category":
                 bulk_edit_values[col] = st.selectbox(
                     f"{col.replace('_', ' ').title()} (leave blank to skip)",
-                    options=["", "Hardware", "Software"]
+                    options=[""] + FAILURE_CATEGORIES
                 )
             elif col in ["record_created_on", "record_updated_on"]:
                 date_val = st.date_input(
@@ -232,51 +451,11 @@ if selected_ids:
                 bulk_edit_values[col] = st.text_input(f"{col.replace('_', ' ').title()} (leave blank to skip)", value="")
         submitted_bulk = st.form_submit_button("Apply Changes to All Selected")
         if submitted_bulk:
-            updated_count = 0
-            for eid in selected_ids:
-                row_updated = False
-                for col in edit_cols:
-                    if col in ["incident_id", "incident_number"]:
-                        continue
-                    val = bulk_edit_values[col]
-                    # Handle skip logic for dropdown and datetime
-                    if col == "failure_category" and val == "":
-                        continue
-                    if col in ["record_created_on", "record_updated_on"] and val is None:
-                        continue
-                    if isinstance(val, str) and val.strip() == "":
-                        continue
-                    if col == "actual_time_spent_in_minutes":
-                        try:
-                            if val in ["", None]:
-                                val = None
-                            else:
-                                val = float(val)
-                        except:
-                            val = None
-                    # Only update if value is different
-                    old_val = df.loc[df["incident_id"] == eid, col].values[0]
-                    if pd.isnull(old_val) and val not in [None, ""]:
-                        df.loc[df["incident_id"] == eid, col] = val
-                        row_updated = True
-                    elif val != old_val and val not in [None, ""]:
-                        df.loc[df["incident_id"] == eid, col] = val
-                        row_updated = True
-                if row_updated:
-                    updated_count += 1
-            df_save = df.drop(columns=["tagged"]).copy()
-            for date_col in ["record_created_on", "record_updated_on"]:
-                if date_col in df_save.columns:
-                    df_save[date_col] = df_save[date_col].apply(
-                        lambda x: x.isoformat() if pd.notnull(x) and isinstance(x, (datetime.datetime, pd.Timestamp)) else (x if isinstance(x, str) else "")
-                    )
-            df_save = df_save.where(pd.notnull(df_save), None)
-            df_save = df_save.astype(object)  # Ensure all columns can hold None
-            df_save = df_save.where(pd.notnull(df_save), None)
-
-            with open(DATA_FILE, "w") as f:
-                json.dump(df_save.to_dict(orient="records"), f, indent=2)
+            deltas = bulk_edit_deltas(view.rows(selected_ids), selected_ids, bulk_edit_values)
+            with perf_trace.phase("save"):
+                updated_count = commit_deltas(deltas, base_version)
             st.session_state["update_message"] = f"Bulk update successful! {updated_count} row(s) updated."
             st.rerun()
 
-st.write("---")
\ No newline at end of file
+st.write("---")
+perf_trace.finish()
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Columns that never count towards an incident being "tagged"
+UNTAGGED_COLUMNS = ["incident_id", "incident_number", "tagged"]
+# str(value).strip() results that mean "no value"
+EMPTY_TOKENS = ["", "None", "nan", "NaN"]
+
+
+def tagged_columns(df):
+    """Columns whose values decide whether an incident is tagged"""
+    return [c for c in df.columns if c not in UNTAGGED_COLUMNS]
+
+
+def empty_mask(series):
+    """Vectorized `str(value).strip() in EMPTY_TOKENS` for a whole column.
+
+    Null-likes (None, NaN, NaT) count as empty. Strings are only evaluated
+    once per distinct value, so the cost is a hash pass instead of N str()
+    calls.
+    """
+    kind = series.dtype.kind
+    if kind in "fM":
+        return series.isna().to_numpy()
+    if kind in "iub":
+        return np.zeros(len(series), dtype=bool)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    unique_empty = pd.Index(uniques).astype(str).str.strip().isin(EMPTY_TOKENS)
+    # Sentinel -1 (null) maps onto the trailing True
+    lookup = np.append(np.asarray(unique_empty, dtype=bool), True)
+    return lookup[codes]
+
+
+class TaggedState:
+    """Columnar tagged/untagged state of an incident frame.
+
+    Keeps one emptiness mask per classified column plus a per-row count of
+    filled columns, so edits only re-evaluate the cells they touched. An
+    incident is tagged when at least one classified column is filled, which
+    is what the old row-wise `is_tagged` computed.
+    """
+
+    def __init__(self, df):
+        self.columns = tagged_columns(df)
+        self.positions = pd.Index(df["incident_id"])
+        self.empty = {col: empty_mask(df[col]) for col in self.columns}
+        filled = np.zeros(len(df), dtype=np.int32)
+        for mask in self.empty.values():
+            filled += ~mask
+        self.filled_count = filled
+
+    def copy(self, columns=()):
+        """Copy that owns its masks for `columns` and shares the others.
+
+        Updating only those columns on the copy leaves this state untouched.
+        """
+        new = TaggedState.__new__(TaggedState)
+        new.columns = self.columns
+        new.positions = self.positions
+        new.empty = {col: mask.copy() if col in columns else mask for col, mask in self.empty.items()}
+        new.filled_count = self.filled_count.copy()
+        return new
+
+    @property
+    def tagged(self):
+        return self.filled_count > 0
+
+    def series(self, df):
+        """Tagged flags aligned to the rows of `df`"""
+        rows = self.positions.get_indexer(df["incident_id"])
+        return pd.Series(self.tagged[rows], index=df.index, name="tagged")
+
+    def update(self, df, incident_ids, columns=None):
+        """Re-evaluate the given incidents after they were edited in `df`.
+
+        `columns` limits the work to the edited columns; by default every
+        classified column of those rows is re-checked.
+        """
+        if len(incident_ids) == 0:
+            return
+        rows = self.positions.get_indexer(incident_ids)
+        if (rows < 0).any():
+            raise KeyError("Unknown incident_id in tagged state update")
+        frame_rows = pd.Index(df["incident_id"]).get_indexer(incident_ids)
+        for col in columns or self.columns:
+            if col not in self.empty:
+                continue
+            new_empty = empty_mask(df[col].iloc[frame_rows])
+            old_empty = self.empty[col][rows]
+            self.filled_count[rows] += old_empty.astype(np.int32) - new_empty.astype(np.int32)
+            self.empty[col][rows] = new_empty
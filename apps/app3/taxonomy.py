@@ -0,0 +1,13 @@
+"""Failure taxonomy: the categories incidents are filed under and the sub-categories of each.
+
+Kept free of imports so the data generator can use it without pulling in
+the app's dependencies; normalize.py validates records against it.
+"""
+FAILURE_SUB_CATEGORIES = {
+    "Hardware": ["Router", "Switch", "Server", "Disk"],
+    "Software": ["API Outage", "Database Crash", "Firmware", "Service Down"],
+    "Security": ["Unauthorized Access", "Phishing", "Malware", "DDoS"],
+    "Network": ["Latency", "Packet Loss", "Link Down"],
+    "Database": ["Corruption", "Slow Query", "Crash"],
+}
+FAILURE_CATEGORIES = list(FAILURE_SUB_CATEGORIES)
@@ -0,0 +1,236 @@
+"""Full-text search over the incidents' free-text fields.
+
+A query is a list of terms: words (`disk`), prefixes (`disk*`) and quoted
+phrases (`"disk full"`). An incident matches when every term is found in
+at least one of SEARCH_COLUMNS. Text is split into lowercase runs of
+letters or digits, so `INC1042` is the phrase `inc 1042` and `1042`
+alone finds it too. Matches are ranked by the weights of the columns each
+term was found in, heaviest for the incident number; ties keep data
+order.
+
+The index is built once per data version over the distinct values of each
+column: every value is tokenized once, token postings list value codes
+and rows are grouped by value code, so a query touches only the rows it
+returns. Saves patch it: the edited rows are tokenized on their own and
+checked directly, until PATCH_LIMIT rows are patched and the next query
+rebuilds it.
+"""
+import bisect
+import collections
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+SEARCH_COLUMNS = ["incident_number", "failure_reason", "failure_caused_by", "action_taken", "comments"]
+COLUMN_WEIGHTS = {
+    "incident_number": 8.0, "failure_reason": 4.0, "failure_caused_by": 2.0, "action_taken": 2.0, "comments": 1.0,
+}
+TOKEN_RE = re.compile(r"[a-z]+|[0-9]+")
+VALUE_MARKER = "\x00"
+TOKEN_RE_WITH_MARKER = re.compile(r"[a-z]+|[0-9]+|\x00")
+QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+# Edited rows checked one by one before the index is rebuilt
+PATCH_LIMIT = 10_000
+QUERY_CACHE_SIZE = 16
+# Past this share of the rows, a row mask beats sorting merged positions
+DENSE_FRACTION = 0.1
+
+# `words` must follow each other; with `prefix` the last one only has to start the token
+Term = collections.namedtuple("Term", "words prefix")
+
+
+def tokenize(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ()
+    return tuple(TOKEN_RE.findall(str(value).lower()))
+
+
+def parse_query(query):
+    """Terms of a search box query; `disk-full` is the phrase "disk full" """
+    terms = []
+    for phrase, word in QUERY_RE.findall(query or ""):
+        text = phrase or word
+        words = tokenize(text)
+        if words:
+            terms.append(Term(words, text.rstrip().endswith("*")))
+    return terms
+
+
+def term_in(tokens, term):
+    """True when `term` occurs in the token sequence of one value"""
+    n = len(term.words)
+    head, last = term.words[:-1], term.words[-1]
+    for i in range(len(tokens) - n + 1):
+        token = tokens[i + n - 1]
+        if (token.startswith(last) if term.prefix else token == last) and tokens[i:i + n - 1] == head:
+            return True
+    return False
+
+
+def term_weight(term):
+    return float(len(term.words))
+
+
+def term_pattern(term):
+    """Regular expression a whole lowercased value matches when it contains `term`.
+
+    Used by the SQL backend, so it spells out the tokenizer: a token is a
+    maximal run of letters or of digits.
+    """
+    def letters(word):
+        return word[0].isalpha()
+
+    pattern = f"(^|[^{'a-z' if letters(term.words[0]) else '0-9'}])" + term.words[0]
+    for before, word in zip(term.words, term.words[1:]):
+        pattern += ("[^0-9a-z]+" if letters(before) == letters(word) else "[^0-9a-z]*") + word
+    if not term.prefix:
+        pattern += f"([^{'a-z' if letters(term.words[-1]) else '0-9'}]|$)"
+    return f".*{pattern}.*"
+
+
+def _distinct(values):
+    """Sorted distinct values (a sort, which beats hashing on large integer arrays)"""
+    values = np.sort(values)
+    return values[np.concatenate([[True], values[1:] != values[:-1]])] if len(values) else values
+
+
+class FieldIndex:
+    """Token postings over the distinct values of one column, and its rows grouped by value"""
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.values = [str(v) for v in uniques]
+        self.codes = codes.astype(np.int32)
+        self.order = np.argsort(self.codes, kind="stable")
+        counts = np.bincount(self.codes.astype(np.int64) + 1, minlength=len(self.values) + 1)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        # One regex pass over all values, separated by a marker the pattern also matches (id 0)
+        ids = {VALUE_MARKER: 0}
+        text = VALUE_MARKER.join(self.values).lower() if self.values else ""
+        found = np.fromiter((ids.setdefault(t, len(ids)) for t in TOKEN_RE_WITH_MARKER.findall(text)), dtype=np.int64)
+        marker = found == 0
+        owners = np.cumsum(marker)[~marker]
+        # Token ids renumbered in vocabulary order, so prefixes are contiguous ranges
+        self.vocabulary = sorted(ids)[1:] if len(ids) > 1 else []
+        rank = np.zeros(len(ids), dtype=np.int64)
+        rank[[ids[t] for t in self.vocabulary]] = np.arange(len(self.vocabulary))
+        # Distinct (token, value) pairs ordered by token, then value code: one flat postings array
+        width = max(len(self.values), 1)
+        token_codes, owners = np.divmod(_distinct(rank[found[~marker]] * width + owners), width)
+        self.token_ids = dict(zip(self.vocabulary, range(len(self.vocabulary))))
+        self.owners = owners.astype(np.int32)
+        self.bounds = np.concatenate([[0], np.cumsum(np.bincount(token_codes, minlength=len(self.vocabulary)))])
+
+    def _word_codes(self, word, prefix):
+        if not prefix:
+            i = self.token_ids.get(word)
+            return self.owners[self.bounds[i]:self.bounds[i + 1]] if i is not None else np.empty(0, dtype=np.int32)
+        lo = bisect.bisect_left(self.vocabulary, word)
+        hi = bisect.bisect_left(self.vocabulary, word + "\U0010ffff")
+        codes = self.owners[self.bounds[lo]:self.bounds[hi]]
+        return codes if hi - lo <= 1 else _distinct(codes)
+
+    def value_codes(self, term):
+        """Sorted codes of the values containing `term`"""
+        codes = self._word_codes(term.words[-1], term.prefix)
+        for word in term.words[:-1]:
+            if not len(codes):
+                break
+            codes = np.intersect1d(codes, self._word_codes(word, False), assume_unique=True)
+        if len(term.words) > 1:
+            codes = np.array([c for c in codes.tolist() if term_in(tokenize(self.values[c]), term)], dtype=np.int32)
+        return codes
+
+    def lookup(self, codes):
+        """Boolean table over value codes (plus a False slot for nulls)"""
+        table = np.zeros(len(self.values) + 1, dtype=bool)
+        table[codes] = True
+        return table
+
+    def row_count(self, codes):
+        return int((self.offsets[codes + 2] - self.offsets[codes + 1]).sum())
+
+    def rows(self, codes):
+        """Ascending row positions holding any of the value `codes`"""
+        if self.row_count(codes) > DENSE_FRACTION * len(self.codes):
+            return np.flatnonzero(self.lookup(codes)[self.codes])
+        parts = [self.order[self.offsets[c + 1]:self.offsets[c + 2]] for c in codes.tolist()]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+
+class TextIndex:
+    """Lazily built full-text index of one data version; `advance` derives the next version's"""
+
+    def __init__(self, fields=None, patch=None):
+        self.fields = fields
+        # Edited row position -> {column: tokens of its current value}
+        self.patch = patch or {}
+        self.patched_rows = np.array(sorted(self.patch), dtype=np.intp)
+        self._search = functools.lru_cache(maxsize=QUERY_CACHE_SIZE)(self._search_uncached)
+
+    def get(self, df):
+        if self.fields is None:
+            self.fields = {col: FieldIndex(df[col]) for col in SEARCH_COLUMNS if col in df.columns}
+        return self
+
+    def advance(self, df, rows, columns):
+        """Index after the incidents at positions `rows` changed `columns` in `df`"""
+        if self.fields is None:
+            return TextIndex()
+        if not set(columns) & set(self.fields):
+            return self
+        patch = dict(self.patch)
+        for row in np.asarray(rows).tolist():
+            patch[row] = {col: tokenize(df[col].iat[row]) for col in self.fields}
+        if len(patch) > PATCH_LIMIT:
+            return TextIndex()
+        return TextIndex(self.fields, patch)
+
+    def search(self, query):
+        """(row positions, scores) matching `query`, best match first; None for a query without terms"""
+        terms = tuple(parse_query(query))
+        return self._search(terms) if terms else None
+
+    def _search_uncached(self, terms):
+        matched = [{col: field.value_codes(term) for col, field in self.fields.items()} for term in terms]
+        # Rows of the term found in the fewest rows; the other terms are only checked on those
+        first = min(range(len(terms)), key=lambda i: sum(
+            self.fields[col].row_count(codes) for col, codes in matched[i].items()))
+        parts = [self.fields[col].rows(codes) for col, codes in matched[first].items()]
+        positions = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+        if len(self.patched_rows):
+            positions = positions[~np.isin(positions, self.patched_rows, assume_unique=True)]
+        scores = np.zeros(len(positions), dtype=np.float32)
+        for term, codes in zip(terms, matched):
+            found = np.zeros(len(positions), dtype=bool)
+            for col, field in self.fields.items():
+                hit = field.lookup(codes[col])[field.codes[positions]]
+                scores += hit * (COLUMN_WEIGHTS[col] * term_weight(term))
+                found |= hit
+            positions, scores = positions[found], scores[found]
+
+        extra, extra_scores = [], []
+        for row, tokens in self.patch.items():
+            score = 0.0
+            for term in terms:
+                hits = [col for col in self.fields if term_in(tokens[col], term)]
+                if not hits:
+                    break
+                score += sum(COLUMN_WEIGHTS[col] for col in hits) * term_weight(term)
+            else:
+                extra.append(row)
+                extra_scores.append(score)
+        if extra:
+            positions = np.concatenate([positions, np.asarray(extra, dtype=np.intp)])
+            scores = np.concatenate([scores, np.asarray(extra_scores, dtype=np.float32)])
+        order = np.lexsort((positions, -scores))
+        return positions[order], scores[order]
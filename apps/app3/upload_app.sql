@@ -1,2 +1,19 @@
 PUT file://../apps/app3/streamlit_app.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/tagging.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/incident_data.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/incident_io.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/change_log.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/edits.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/filter_index.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/pagination.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/catalog.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/shared_store.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/rollups.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/text_index.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/hierarchy.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/normalize.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/taxonomy.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/app3/storage.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/shared/perf_trace.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
+PUT file://../apps/shared/hashing.py @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
 PUT file://../apps/app3/data.json @APP3_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;
\ No newline at end of file
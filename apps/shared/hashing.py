@@ -0,0 +1,11 @@
+"""Content hashes of files, shared by the apps and the deploy tools."""
+import hashlib
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file, read `chunk_size` bytes at a time"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
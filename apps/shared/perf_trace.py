@@ -0,0 +1,315 @@
+"""Per-rerun performance tracing shared by the Streamlit apps.
+
+An app calls `start_run("load")` at the top of the script, `mark("...")`
+when it moves on to the next phase, wraps one-off work such as saves in
+`with phase("save"):` and calls `finish()` at the end. Timings of the
+most recent reruns are kept in session state under RUNS_KEY, where the
+benchmark harness reads them.
+
+Profiling mode is switched on with the PERF_TRACE environment variable or
+a `?perf=1` query parameter. It adds, for the reruns it is on:
+
+- an overlay in the sidebar with the rerun's spans, cache hits and misses
+  and the slowest imports of the process's cold start;
+- a trace file in Chrome trace format (chrome://tracing, Perfetto) at
+  PERF_TRACE_FILE, by default streamlit_perf_trace.json in the temp
+  directory, also offered as a download from the overlay.
+
+Imports are timed inside `with timed_imports():`, cache hits and misses
+are counted for Streamlit caches wrapped with `cached(...)` and for
+objects with a `cache_info()` (functools.lru_cache) passed to `watch()`.
+"""
+import builtins
+import contextlib
+import functools
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import streamlit as st
+
+RUNS_KEY = "_perf_runs"
+MAX_RUNS = 50
+
+ENV_VAR = "PERF_TRACE"
+QUERY_PARAM = "perf"
+TRACE_FILE = os.environ.get("PERF_TRACE_FILE") or os.path.join(tempfile.gettempdir(), "streamlit_perf_trace.json")
+# Oldest rerun events are dropped past this many; imports are kept
+MAX_TRACE_EVENTS = 20_000
+MAX_IMPORTS = 5_000
+# Slowest top-level imports listed in the overlay
+OVERLAY_IMPORTS = 10
+
+_EPOCH = time.perf_counter()
+_lock = threading.Lock()
+_events = []
+# (module, start, seconds, nesting depth, thread id) of modules first imported under timed_imports()
+_imports = []
+_import_depth = threading.local()
+_hook_users = 0
+_cold_start = True
+_original_import = builtins.__import__
+
+
+def enabled():
+    """True when profiling mode is on for this rerun"""
+    if os.environ.get(ENV_VAR, "").lower() in ("1", "true", "yes"):
+        return True
+    return st.query_params.get(QUERY_PARAM, "").lower() in ("1", "true", "yes")
+
+
+def _current():
+    runs = st.session_state.get(RUNS_KEY)
+    return runs[-1] if runs else None
+
+
+def _close(run, now):
+    name, began = run["_open"]
+    if name is not None:
+        run["phases"][name] = run["phases"].get(name, 0.0) + now - began
+        run["spans"].append((name, began, now))
+
+
+def start_run(first_phase):
+    """Begin timing a rerun, starting with `first_phase`"""
+    now = time.perf_counter()
+    runs = st.session_state.setdefault(RUNS_KEY, [])
+    runs.append({
+        "started": now, "phases": {}, "spans": [], "cache": {},
+        "trace": enabled(), "_open": (first_phase, now), "_watched": {},
+    })
+    del runs[:-MAX_RUNS]
+
+
+def mark(next_phase):
+    """End the current phase and start `next_phase`"""
+    run = _current()
+    if run is None:
+        return
+    now = time.perf_counter()
+    _close(run, now)
+    run["_open"] = (next_phase, now)
+
+
+def finish():
+    """End the last phase of the rerun; in profiling mode show the overlay and write the trace"""
+    mark(None)
+    run = _current()
+    if run is None or "finished" in run:
+        return
+    run["finished"] = time.perf_counter()
+    for name, (cache, hits, misses) in run.pop("_watched").items():
+        info = cache.cache_info()
+        _count(run, name, info.hits - hits, info.misses - misses)
+    if run["trace"]:
+        _record(run)
+        overlay(run)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a block on its own, e.g. a save that ends in st.rerun()"""
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        run = _current()
+        if run is not None:
+            now = time.perf_counter()
+            run["phases"][name] = run["phases"].get(name, 0.0) + now - began
+            run["spans"].append((name, began, now))
+
+
+# --- Cache hits and misses ---
+def _count(run, name, hits, misses):
+    old_hits, old_misses = run["cache"].get(name, (0, 0))
+    run["cache"][name] = (old_hits + hits, old_misses + misses)
+
+
+def count(name, hit):
+    """Count one hit (or miss) of cache `name` in the current rerun"""
+    run = _current()
+    if run is not None:
+        _count(run, name, int(hit), int(not hit))
+
+
+def cached(name, cache):
+    """Decorate with Streamlit cache decorator `cache`, counting hits and misses as `name`
+
+    @perf_trace.cached("storage", st.cache_resource(show_spinner=False))
+    """
+    def decorate(fn):
+        state = threading.local()
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            state.missed = True
+            return fn(*args, **kwargs)
+
+        cached_fn = cache(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            state.missed = False
+            result = cached_fn(*args, **kwargs)
+            count(name, not state.missed)
+            return result
+
+        call.clear = cached_fn.clear
+        return call
+
+    return decorate
+
+
+def watch(name, cache):
+    """Count the hits and misses `cache.cache_info()` gains between now and finish()"""
+    run = _current()
+    if run is not None and name not in run.get("_watched", (name,)):
+        info = cache.cache_info()
+        run["_watched"][name] = (cache, info.hits, info.misses)
+
+
+# --- Import timing ---
+def _absolute_name(name, globals, level):
+    """Module a relative import refers to, or None where its package cannot be told"""
+    globals = globals or {}
+    package = globals.get("__package__")
+    if package is None:
+        package = globals.get("__name__", "")
+        if "__path__" not in globals:
+            package = package.rpartition(".")[0]
+    try:
+        return importlib.util.resolve_name("." * level + name, package)
+    except (ImportError, ValueError):
+        return None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Already loaded: straight through, untimed
+    if (name if level == 0 else _absolute_name(name, globals, level)) in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    depth = getattr(_import_depth, "depth", 0)
+    _import_depth.depth = depth + 1
+    began = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _import_depth.depth = depth
+        if len(_imports) < MAX_IMPORTS:
+            _imports.append(("." * level + name, began, time.perf_counter() - began, depth, threading.get_ident()))
+
+
+@contextlib.contextmanager
+def timed_imports():
+    """Record how long each module first imported inside the block takes.
+
+    Only the process's cold start and reruns in profiling mode are timed;
+    other reruns import through the untouched builtin.
+    """
+    global _hook_users, _cold_start
+    with _lock:
+        install = _cold_start or enabled()
+        _cold_start = False
+        if install:
+            _hook_users += 1
+            builtins.__import__ = _timed_import
+    if not install:
+        yield
+        return
+    try:
+        yield
+    finally:
+        with _lock:
+            _hook_users -= 1
+            if not _hook_users and builtins.__import__ is _timed_import:
+                builtins.__import__ = _original_import
+
+
+def slowest_imports(limit=OVERLAY_IMPORTS):
+    """[(module, seconds)] of the slowest top-level timed imports"""
+    top = [(name, seconds) for name, _, seconds, depth, _ in list(_imports) if depth == 0]
+    return sorted(top, key=lambda item: -item[1])[:limit]
+
+
+# --- Chrome trace ---
+def _us(seconds):
+    return round((seconds - _EPOCH) * 1e6, 1)
+
+
+def _complete(name, category, began, ended, tid, args=None):
+    event = {"name": name, "cat": category, "ph": "X", "ts": _us(began),
+             "dur": round((ended - began) * 1e6, 1), "pid": os.getpid(), "tid": tid}
+    if args:
+        event["args"] = args
+    return event
+
+
+def _record(run):
+    tid = threading.get_ident()
+    events = [_complete("rerun", "rerun", run["started"], run["finished"], tid)]
+    events += [_complete(name, "phase", began, ended, tid) for name, began, ended in run["spans"]]
+    events += [
+        {"name": f"cache {name}", "cat": "cache", "ph": "C", "ts": _us(run["finished"]),
+         "pid": os.getpid(), "tid": tid, "args": {"hits": hits, "misses": misses}}
+        for name, (hits, misses) in run["cache"].items()
+    ]
+    with _lock:
+        _events.extend(events)
+        del _events[:-MAX_TRACE_EVENTS]
+    write_trace()
+
+
+def trace_events():
+    """Chrome trace events: timed imports and the reruns traced so far"""
+    events = [
+        _complete(name, "import", began, began + seconds, tid, {"depth": depth})
+        for name, began, seconds, depth, tid in list(_imports)
+    ]
+    with _lock:
+        return events + list(_events)
+
+
+def trace_json():
+    return json.dumps({"traceEvents": trace_events(), "displayTimeUnit": "ms"})
+
+
+def write_trace(path=None):
+    """Write the trace file; returns its path, or None where the app cannot write files"""
+    path = path or TRACE_FILE
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(trace_json())
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    return path
+
+
+# --- Overlay ---
+def overlay(run):
+    """Sidebar panel with the rerun's spans, cache counts and cold-start imports"""
+    total_ms = (run["finished"] - run["started"]) * 1e3
+    with st.sidebar.expander(f"⏱️ Perf trace: {total_ms:.0f} ms", expanded=True):
+        st.caption("Spans (ms from rerun start)")
+        st.dataframe(
+            [{"span": name, "start": round((began - run["started"]) * 1e3, 1), "ms": round((ended - began) * 1e3, 1)}
+             for name, began, ended in run["spans"]],
+            hide_index=True,
+        )
+        if run["cache"]:
+            st.caption("Cache hits and misses")
+            st.dataframe(
+                [{"cache": name, "hits": hits, "misses": misses} for name, (hits, misses) in run["cache"].items()],
+                hide_index=True,
+            )
+        imports = slowest_imports()
+        if imports:
+            st.caption("Slowest imports at cold start")
+            st.dataframe([{"module": name, "ms": round(seconds * 1e3, 1)} for name, seconds in imports], hide_index=True)
+        st.caption(f"Chrome trace: {TRACE_FILE}")
+        st.download_button("Download trace", trace_json(), file_name="perf_trace.json", mime="application/json")
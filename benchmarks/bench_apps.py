@@ -0,0 +1,252 @@
+"""End-to-end benchmark of the app2 and app3 Streamlit scripts.
+
+Each app runs headlessly under streamlit.testing.v1.AppTest against a
+generated fixture (data.json for app3, apps.json for app2) in a scratch
+directory, through a fixed scenario of user steps. For every step the
+report records wall time, peak Python memory (tracemalloc, measured in a
+separate pass so it does not skew timings) and the per-phase times the
+apps log through apps/shared/perf_trace.py (app3: load, sidebar, filter,
+render, analytics, hierarchy, save; app2: render, filter).
+
+The report is written as JSON. When a baseline exists, any step or phase
+that got slower than the baseline by more than --threshold (and by more
+than --min-delta-ms) is listed and the script exits with status 1.
+Baselines are per machine, so none is committed: record one on the CI
+agent with --update-baseline. With --ci a missing baseline is an error
+(status 2) instead of a skipped comparison, so the gate cannot pass
+silently.
+
+Usage:
+    python benchmarks/bench_apps.py                       # default sizes, compare to baseline
+    python benchmarks/bench_apps.py --sizes 1000 100000 --report out.json
+    python benchmarks/bench_apps.py --update-baseline     # record this machine's numbers
+    python benchmarks/bench_apps.py --ci                  # regression gate: fails without a baseline
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from common import APP2_DIR, APP3_DIR, ROOT, synthetic_apps
+
+sys.path.insert(0, str(ROOT / "apps" / "shared"))
+import generate_test_data  # noqa: E402
+from perf_trace import RUNS_KEY  # noqa: E402
+
+SHARED_DIR = ROOT / "apps" / "shared"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+TIMEOUT = 600
+
+
+# --- Fixtures ---
+
+def app3_fixture(workdir, rows):
+    shutil.copytree(APP3_DIR, workdir, ignore=shutil.ignore_patterns(
+        "data.json*", "__pycache__", "generate_test_data.py", "upload_app.sql"))
+    parts = generate_test_data.generate(
+        "json-compact", rows, 100_000, 1,
+        seed=0, tagged_ratio=0.9, time_null_rate=0.05, parent_rate=0.1, comment_null_rate=0.1,
+    )
+    with open(workdir / "data.json", "w") as f:
+        generate_test_data.write_array(parts, f, indent=None)
+
+
+def app2_fixture(workdir, rows):
+    shutil.copytree(APP2_DIR, workdir, ignore=shutil.ignore_patterns(
+        "apps.json", "__pycache__", "static", "upload_app.sql"))
+    with open(workdir / "apps.json", "w") as f:
+        json.dump(synthetic_apps(rows), f)
+
+
+# --- Scenarios: (step name, action) run in order on one AppTest ---
+
+def app3_steps():
+    def select_incidents(at):
+        picker = at.multiselect(key="bulk_selected_ids")
+        # Options are labelled "ID <id> - <number>"
+        picker.set_value([int(label.split()[1]) for label in picker.options[:2]])
+
+    def fill_bulk_form(at):
+        for box in at.main.text_input:
+            if box.label.startswith("Custodian Team"):
+                box.set_value("BenchTeam")
+        next(b for b in at.main.button if b.label.startswith("Apply Changes")).click()
+
+    return [
+        ("cold load", lambda at: None),
+        ("widen dates", lambda at: at.sidebar.date_input[0].set_value(
+            (datetime.date(2020, 1, 1), datetime.date(2026, 1, 1)))),
+        ("filter tagged", lambda at: at.sidebar.radio[0].set_value("Tagged")),
+        ("next page", lambda at: at.number_input(key="incident_page").set_value(2)),
+        ("select incidents", select_incidents),
+        ("bulk save", fill_bulk_form),
+    ]
+
+
+def app2_steps():
+    def next_page(at):
+        buttons = [b for b in at.button if b.label.startswith("Next")]
+        if buttons and not buttons[0].disabled:
+            buttons[0].click()
+
+    return [
+        ("cold load", lambda at: None),
+        ("search", lambda at: at.text_input[0].set_value("App 1")),
+        ("clear search", lambda at: at.text_input[0].set_value("")),
+        ("next page", next_page),
+    ]
+
+
+APPS = {
+    "app3": (app3_fixture, app3_steps),
+    "app2": (app2_fixture, app2_steps),
+}
+
+
+# --- Runner ---
+
+def phase_totals(at, seen):
+    """Phase seconds summed over the reruns logged since `seen` reruns"""
+    runs = at.session_state[RUNS_KEY] if RUNS_KEY in at.session_state else []
+    totals = {}
+    for run in runs[seen:]:
+        for name, seconds in run["phases"].items():
+            totals[name] = totals.get(name, 0.0) + seconds
+    return totals, len(runs)
+
+
+def run_scenario(app, rows, measure_memory):
+    """One pass through the app's steps on a fresh fixture and cold caches"""
+    fixture, steps = APPS[app]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"bench_{app}_") as tmp:
+        workdir = Path(tmp) / app
+        fixture(workdir, rows)
+        shutil.copytree(SHARED_DIR, Path(tmp) / "shared", ignore=shutil.ignore_patterns("__pycache__"))
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        os.chdir(workdir)
+        try:
+            at = AppTest.from_file(str(workdir / "streamlit_app.py"), default_timeout=TIMEOUT)
+            results, seen = {}, 0
+            for name, action in steps():
+                if name != "cold load":
+                    action(at)
+                if measure_memory:
+                    tracemalloc.start()
+                started = time.perf_counter()
+                at.run()
+                wall = time.perf_counter() - started
+                peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+                if measure_memory:
+                    tracemalloc.stop()
+                if at.exception:
+                    raise RuntimeError(f"{app} step {name!r} raised: {at.exception[0].message}")
+                phases, seen = phase_totals(at, seen)
+                results[name] = {"wall_s": wall, "phases_s": phases, "peak_mb": peak and peak / 2**20}
+            return results
+        finally:
+            os.chdir(cwd)
+
+
+def bench(app, rows, repeat, measure_memory):
+    """Median wall/phase times over `repeat` passes, plus one tracemalloc pass"""
+    passes = [run_scenario(app, rows, False) for _ in range(repeat)]
+    memory = run_scenario(app, rows, True) if measure_memory else {}
+    steps = {}
+    for name in passes[0]:
+        phase_names = sorted({p for run in passes for p in run[name]["phases_s"]})
+        steps[name] = {
+            "wall_s": statistics.median(run[name]["wall_s"] for run in passes),
+            "phases_s": {
+                p: statistics.median(run[name]["phases_s"].get(p, 0.0) for run in passes) for p in phase_names
+            },
+            "peak_mb": memory.get(name, {}).get("peak_mb"),
+        }
+    return steps
+
+
+def regressions(report, baseline, threshold, min_delta):
+    """(key, baseline seconds, current seconds) for every metric past the threshold"""
+    found = []
+    for key, steps in report["results"].items():
+        base_steps = baseline.get("results", {}).get(key, {})
+        for step, metrics in steps.items():
+            base = base_steps.get(step)
+            if base is None:
+                continue
+            pairs = [("wall", base["wall_s"], metrics["wall_s"])]
+            pairs += [(p, base["phases_s"][p], s) for p, s in metrics["phases_s"].items() if p in base["phases_s"]]
+            for metric, old, new in pairs:
+                if new - old > min_delta and new > old * (1 + threshold):
+                    found.append((f"{key} / {step} / {metric}", old, new))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000],
+                        help="incidents for app3 / catalog entries for app2 (default: 1000 100000)")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per size (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--report", default="bench_apps.json", help="JSON report path (default: bench_apps.json)")
+    parser.add_argument("--baseline", default=str(BASELINE), help=f"baseline report (default: {BASELINE.name})")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline (default: 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0,
+                        help="ignore slowdowns smaller than this (default: 20)")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--ci", action="store_true", help="fail when there is no baseline to compare against")
+    args = parser.parse_args(argv)
+    if args.ci and not args.update_baseline and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one on this machine with --update-baseline")
+
+    report = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "streamlit": st.__version__,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    print(f"{'app':<5} {'rows':>9} {'step':<17} {'wall ms':>9} {'peak MB':>8}  phases ms")
+    for app in args.apps:
+        for rows in args.sizes:
+            steps = bench(app, rows, args.repeat, not args.no_memory)
+            report["results"][f"{app}@{rows}"] = steps
+            for name, m in steps.items():
+                phases = " ".join(f"{p}={s * 1e3:.1f}" for p, s in m["phases_s"].items())
+                peak = f"{m['peak_mb']:.1f}" if m["peak_mb"] is not None else "-"
+                print(f"{app:<5} {rows:>9} {name:<17} {m['wall_s'] * 1e3:>9.1f} {peak:>8}  {phases}")
+
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+
+    if args.update_baseline:
+        shutil.copyfile(args.report, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --update-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    found = regressions(report, baseline, args.threshold, args.min_delta_ms / 1e3)
+    for key, old, new in found:
+        print(f"REGRESSION {key}: {old * 1e3:.1f} ms -> {new * 1e3:.1f} ms ({new / old - 1:+.0%})")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Deploy bundle: stage transfer size and cold start, source files against the bundle.
+
+Pretty-printed incidents and gallery catalogs are bundled with
+build_bundle.build_app. "cold ms" is what a fresh app process spends
+turning the shipped file into its startup structures: load_incidents on
+data.json (no sidecar yet) or data.arrow for app3, gallery_index.load on
+apps.json with or without the prebuilt index for app2. Both sides must
+produce the same frame / search results.
+
+Usage: python benchmarks/bench_bundle.py [incidents] [apps]
+"""
+import gc
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from common import ROOT, synthetic_apps, tiled_incidents
+
+sys.path.insert(0, str(ROOT / "deploy"))
+from build_bundle import build_app  # noqa: E402
+from deploy_apps import AppFiles  # noqa: E402
+import gallery_index  # noqa: E402
+from incident_data import load_incidents  # noqa: E402
+
+
+def cold(load):
+    gc.collect()
+    start = time.perf_counter()
+    result = load()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bundle(tmp, name, files):
+    app = AppFiles(name, "DB", "APP", f"{name.upper()}_STAGE", files)
+    return build_app(app, build_dir=tmp / "build", log=lambda _: None)
+
+
+def row(label, source_files, bundle_files, source_ms, bundle_ms):
+    source_kb = sum(Path(p).stat().st_size for p in source_files) / 1024
+    bundle_kb = sum(Path(p).stat().st_size for p in bundle_files) / 1024
+    print(f"{label:<26} {source_kb:>10.0f} {bundle_kb:>10.0f} {source_ms:>9.0f} {bundle_ms:>9.0f}")
+
+
+def main(incidents=200_000, apps=50_000):
+    print(f"{'':<26} {'source KiB':>10} {'bundle KiB':>10} {'cold ms':>9} {'bundle ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "src").mkdir()
+
+        # app3: pretty data.json -> data.arrow
+        data = tmp / "src" / "data.json"
+        data.write_text(json.dumps(tiled_incidents(incidents).to_dict("records"), indent=2, default=str))
+        out = bundle(tmp, "app3", {"data.json": data})
+        source_df, source_ms = cold(lambda: load_incidents(data))
+        bundle_df, bundle_ms = cold(lambda: load_incidents(out["data.arrow"]))
+        pd.testing.assert_frame_equal(source_df, bundle_df, check_categorical=False)
+        row(f"app3 {incidents:,} incidents", [data], out.values(), source_ms, bundle_ms)
+
+        # app2: pretty apps.json -> minified apps.json + prebuilt index
+        catalog = tmp / "src" / "apps.json"
+        catalog.write_text(json.dumps(synthetic_apps(apps), indent=2))
+        out = bundle(tmp, "app2", {"apps.json": catalog})
+        built, source_ms = cold(lambda: gallery_index.load(catalog))
+        prebuilt, bundle_ms = cold(lambda: gallery_index.read_prebuilt(out["apps.json"]))
+        assert prebuilt is not None
+        for query, tags in [("sales", ()), ("dash", ("ops",)), ("", ("ml", "hr"))]:
+            expected = [built[0].records([i])[0]["url"] for i in built[2].search(query, tags)]
+            actual = [prebuilt[0].records([i])[0]["url"] for i in prebuilt[2].search(query, tags)]
+            assert expected == actual, query
+        row(f"app2 {apps:,} apps", [catalog], out.values(), source_ms, bundle_ms)
+
+        # app2 preview image
+        preview = ROOT / "apps" / "app2" / "preview.png"
+        out = bundle(tmp, "preview", {"preview.png": preview})
+        row("app2 preview.png", [preview], out.values(), 0, 0)
+    print("Bundled data loads to the same frame and search results")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,78 @@
+"""Gallery startup: json.load of the whole catalog against the streaming Catalog scan.
+
+Both paths build the search index; "retained MB" is what stays referenced
+afterwards (the app list vs. offsets, card keys and index), "peak MB" the
+tracemalloc high-water mark while loading.
+
+Usage: python benchmarks/bench_catalog.py [apps ...]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import synthetic_apps
+from app_catalog import Catalog
+from cards import card_key
+from search_index import SearchIndex
+
+
+def eager(path):
+    """What the gallery used to keep for the session: every app plus the index"""
+    with open(path, "r") as f:
+        apps = json.load(f)
+    return apps, [card_key(app) for app in apps], SearchIndex(apps)
+
+
+def streaming(path):
+    catalog = Catalog(path)
+    card_keys = []
+
+    def records():
+        for app in catalog.scan():
+            card_keys.append(card_key(app))
+            yield app
+
+    return catalog, card_keys, SearchIndex(records())
+
+
+def measure(load, path):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load(path)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained / 2**20, peak / 2**20
+
+
+def main(sizes):
+    print(f"{'apps':>8} {'format':<6} {'loader':<10} {'file MB':>8} {'load s':>7} {'retained MB':>12} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            apps = synthetic_apps(rows)
+            paths = {"json": os.path.join(tmp, "apps.json"), "jsonl": os.path.join(tmp, "apps.jsonl")}
+            with open(paths["json"], "w") as f:
+                json.dump(apps, f, indent=2)
+            with open(paths["jsonl"], "w") as f:
+                f.writelines(json.dumps(app) + "\n" for app in apps)
+            (_, eager_keys, _), *stats = measure(eager, paths["json"])
+            size_mb = os.path.getsize(paths["json"]) / 2**20
+            print(f"{rows:>8} {'json':<6} {'eager':<10} {size_mb:>8.1f} {stats[0]:>7.2f} {stats[1]:>12.1f} {stats[2]:>8.1f}")
+            for fmt, path in paths.items():
+                (catalog, keys, _), *stats = measure(streaming, path)
+                assert keys == eager_keys, fmt
+                positions = [0, rows // 2, rows - 1]
+                assert catalog.records(positions) == [apps[i] for i in positions], fmt
+                size_mb = os.path.getsize(path) / 2**20
+                print(f"{rows:>8} {fmt:<6} {'streaming':<10} {size_mb:>8.1f} {stats[0]:>7.2f} {stats[1]:>12.1f} {stats[2]:>8.1f}")
+                catalog.file.close()
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1_000, 20_000])
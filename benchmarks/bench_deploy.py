@@ -0,0 +1,86 @@
+"""Stage uploads for a fleet of apps: snowsql-style full PUTs against deploy_apps.
+
+A synthetic fleet is written to a temporary apps/ tree and deployed to
+LocalDirTransport stages with a fixed latency per operation, standing in
+for a Snowflake round trip. "sequential" re-PUTs every file one app after
+the other, as the per-app snowsql runs did; "deploy" is the manifest-based
+tool, first on empty stages and then after a few files changed.
+
+Usage: python benchmarks/bench_deploy.py [apps] [files per app] [latency ms]
+"""
+import filecmp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT
+
+sys.path.insert(0, str(ROOT / "deploy"))
+from deploy_apps import LocalDirTransport, deploy, read_app  # noqa: E402
+
+
+def write_fleet(base, apps, files):
+    """apps/<app>/upload_app.sql plus files; PUT paths are relative to base/terraform"""
+    (base / "terraform").mkdir()
+    for a in range(apps):
+        app_dir = base / "apps" / f"app{a}"
+        app_dir.mkdir(parents=True)
+        lines = []
+        for i in range(files):
+            (app_dir / f"module_{i}.py").write_text(f"# app {a} module {i}\n" + "x = 1\n" * 200)
+            lines.append(f"PUT file://../apps/app{a}/module_{i}.py @APP{a}_STAGE OVERWRITE = TRUE AUTO_COMPRESS=FALSE;")
+        (app_dir / "upload_app.sql").write_text("\n".join(lines) + "\n")
+
+
+def sequential(fleet, transport):
+    conn = transport.connect()
+    for app in fleet:
+        for path in app.files.values():
+            conn.put(path, app.qualified_stage)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(apps=40, files=15, latency_ms=20):
+    latency = latency_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        write_fleet(base, apps, files)
+
+        def fleet():
+            return [read_app(f"app{a}", "DB", "APP", apps_dir=base / "apps", put_base=base / "terraform")
+                    for a in range(apps)]
+
+        _, full_s = timed(lambda: sequential(fleet(), LocalDirTransport(base / "full", latency)))
+        stages = LocalDirTransport(base / "stages", latency)
+        first, first_s = timed(lambda: deploy(fleet(), stages, workers=8, log=lambda _: None))
+        # First, middle and last app, last module: valid for any fleet size
+        changed = sorted({0, apps // 2, apps - 1})
+        for a in changed:
+            path = base / "apps" / f"app{a}" / f"module_{files - 1}.py"
+            path.write_text(path.read_text() + "y = 2\n")
+        again, again_s = timed(lambda: deploy(fleet(), stages, workers=8, log=lambda _: None))
+        noop, noop_s = timed(lambda: deploy(fleet(), stages, workers=8, log=lambda _: None))
+
+        for app in fleet():
+            for name, path in app.files.items():
+                assert filecmp.cmp(path, base / "stages" / app.qualified_stage / name, shallow=False)
+        count = lambda result: sum(len(up) for up, _ in result.values())  # noqa: E731
+        assert count(first) == apps * files and count(again) == len(changed) and count(noop) == 0
+        print(f"{apps} apps x {files} files, {latency_ms} ms per stage operation, 8 workers")
+        print(f"{'run':<22} {'uploaded':>9} {'seconds':>8}")
+        print(f"{'sequential full PUT':<22} {apps * files:>9} {full_s:>8.2f}")
+        print(f"{'deploy, empty stages':<22} {count(first):>9} {first_s:>8.2f}")
+        print(f"{f'deploy, {len(changed)} changed':<22} {count(again):>9} {again_s:>8.2f}")
+        print(f"{'deploy, nothing new':<22} {count(noop):>9} {noop_s:>8.2f}")
+        print(f"Connections opened across the three deploys: {stages.connections} (<= 8 per deploy)")
+        assert stages.connections <= 3 * 8
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
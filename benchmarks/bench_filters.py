@@ -0,0 +1,83 @@
+"""Sidebar filter latency: chained boolean masks against the FilterIndex planner.
+
+"indexed" times the query down to row positions; "take" is the cost of
+materializing those rows with df.iloc.
+
+Usage: python benchmarks/bench_filters.py [rows ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from common import tiled_incidents
+from filter_index import FilterIndex
+from tagging import TaggedState
+
+SCENARIOS = {
+    "teams only": dict(teams=["Network", "Database", "Application", "Security", "DevOps", "Support"]),
+    "one team + range": dict(teams=["Security"], dates=("2023-01-01", "2023-12-31")),
+    "tagged + multi": dict(tagged=True, multi={"failure_category": ["Hardware"], "prior_notification": ["Yes"]}),
+    "narrow": dict(teams=["Support"], dates=("2024-03-01", "2024-03-31"), multi={"record_created_by": ["alice"]}),
+}
+
+
+def chained(df, teams=(), dates=None, tagged=None, multi=None):
+    """The one-mask-at-a-time filtering the app used to do"""
+    out = df.copy()
+    if tagged is not None:
+        out = out[out["tagged"] == tagged]
+    if teams:
+        out = out[out["custodian_team"].isin(teams)]
+    if dates:
+        start, end = pd.Timestamp(dates[0]), pd.Timestamp(dates[1])
+        out = out[(out["record_created_on"] >= start) & (out["record_created_on"] <= end)]
+    for col, vals in (multi or {}).items():
+        if vals:
+            out = out[out[col].isin(vals)]
+    return out
+
+
+def planned(index, df, teams=(), dates=None, tagged=None, multi=None):
+    mask = None
+    if tagged is not None:
+        mask = df["tagged"].to_numpy() == tagged
+    date_ranges = {"record_created_on": (pd.Timestamp(dates[0]), pd.Timestamp(dates[1]))} if dates else {}
+    return index.query(
+        df,
+        mask=mask,
+        isin=[("custodian_team", list(teams))] + list((multi or {}).items()),
+        date_ranges=date_ranges,
+    )
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'scenario':<18} {'matches':>8} {'chained ms':>11} {'indexed ms':>11} "
+          f"{'take ms':>8} {'build ms':>9}")
+    for rows in sizes:
+        df = tiled_incidents(rows, typed=True)
+        df["tagged"] = TaggedState(df).series(df)
+        index = FilterIndex()
+        for name, params in SCENARIOS.items():
+            expected, t_chained = best_of(lambda: chained(df, **params), repeat=3)
+            start = time.perf_counter()
+            planned(index, df, **params)  # first call builds the column indexes it needs
+            t_build = time.perf_counter() - start
+            positions, t_indexed = best_of(lambda: planned(index, df, **params))
+            result, t_take = best_of(lambda: df.iloc[positions], repeat=3)
+            assert result["incident_id"].tolist() == expected["incident_id"].tolist(), name
+            print(f"{rows:>10} {name:<18} {len(result):>8} {t_chained * 1e3:>11.1f} "
+                  f"{t_indexed * 1e3:>11.1f} {t_take * 1e3:>8.1f} {t_build * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,159 @@
+"""Incident hierarchy: self-joins against the precomputed graph.
+
+Incidents are linked into a random forest (parents picked among earlier
+incidents, so chains get deep), with a few unknown parents and one
+parent cycle. "join ms" answers a query the way a self-join would:
+repeated parent/child lookups over the whole frame, one level at a time,
+and for SQL a recursive CTE in SQLite. "graph ms" asks the snapshot's
+IncidentGraph, whose build time is reported once. Both must agree.
+
+After a save that re-parents and re-times incidents, the graph moved
+along by the store must equal one rebuilt from scratch, and the SQLite
+backend's graph must equal the in-memory one.
+
+Usage: python benchmarks/bench_hierarchy.py [rows ...]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import tiled_incidents
+from hierarchy import IncidentGraph
+from shared_store import SharedStore
+from storage import SQLITE, SqlStorage
+
+QUERIES = 20
+
+
+def with_forest(df, seed=0):
+    """Parents among earlier incidents, ~30% roots, a few unknown parents and one 3-cycle"""
+    rng = np.random.default_rng(seed)
+    n = len(df)
+    back = np.minimum(rng.geometric(0.002, size=n), np.arange(n))
+    parent = np.where((rng.random(n) < 0.3) | (back == 0), -1, np.arange(n) - back)
+    numbers = df["incident_number"].to_numpy()
+    parents = np.where(parent >= 0, numbers[np.maximum(parent, 0)], "").astype(object)
+    parents[rng.choice(n, size=5, replace=False)] = "INC-MISSING"
+    parents[[n - 3, n - 2, n - 1]] = numbers[[n - 1, n - 3, n - 2]]
+    df["parent_incident_number"] = parents
+    return df
+
+
+def join_subtree(df, number):
+    """Incident numbers under `number`, found one level of children at a time"""
+    found, frontier = [number], [number]
+    while frontier:
+        children = df.loc[df["parent_incident_number"].isin(frontier), "incident_number"].tolist()
+        frontier = [c for c in children if c not in found]
+        found += frontier
+    return set(found)
+
+
+def join_chain_minutes(df, number):
+    by_number = df.drop_duplicates("incident_number").set_index("incident_number")
+    total, seen = 0.0, set()
+    while number in by_number.index and number not in seen:
+        seen.add(number)
+        row = by_number.loc[number]
+        total += 0.0 if pd.isna(row["actual_time_spent_in_minutes"]) else row["actual_time_spent_in_minutes"]
+        number = row["parent_incident_number"]
+    return total
+
+
+CTE = """
+WITH RECURSIVE sub(incident_number, minutes) AS (
+    SELECT incident_number, actual_time_spent_in_minutes FROM incidents WHERE incident_number = ?
+    UNION
+    SELECT i.incident_number, i.actual_time_spent_in_minutes FROM incidents i JOIN sub ON i.parent_incident_number = sub.incident_number
+)
+SELECT COUNT(*), COALESCE(SUM(minutes), 0) FROM sub
+"""
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def same_graph(a, b):
+    for name in ["parent", "depth", "size", "dangling", "cycle"]:
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    for name in ["minutes", "subtree_minutes", "chain_minutes"]:
+        assert np.allclose(getattr(a, name), getattr(b, name)), name
+    # Sibling order may differ after moves; each subtree must hold the same incidents
+    for pos in range(0, len(a.parent), max(1, len(a.parent) // 500)):
+        assert set(a.subtree(pos).tolist()) == set(b.subtree(pos).tolist()), pos
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'query':<16} {'join ms':>9} {'graph ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            df = with_forest(tiled_incidents(rows))
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w") as f:
+                json.dump(df.to_dict("records"), f, default=str)
+            store = SharedStore(path)
+            snap = store.snapshot()
+            graph, build_ms = timed(lambda: snap.hierarchy.get(snap.df))
+            print(f"{rows:>8} {'(build)':<16} {'':>9} {build_ms:>9.1f}")
+            dangling, cycles = graph.problems()
+            assert len(dangling) == 5 and set(cycles) == {rows - 3, rows - 2, rows - 1}
+
+            rng = np.random.default_rng(1)
+            numbers = graph.numbers[rng.choice(rows // 10, size=QUERIES)].tolist()
+            expected, join_ms = timed(lambda: [join_subtree(snap.df, n) for n in numbers])
+            found, graph_ms = timed(lambda: [set(graph.numbers[graph.subtree(graph.position(n))]) for n in numbers])
+            assert found == expected
+            print(f"{rows:>8} {'subtree x' + str(QUERIES):<16} {join_ms:>9.1f} {graph_ms:>9.1f}")
+            deep = graph.numbers[np.argsort(-graph.depth)[:QUERIES]].tolist()
+            expected, join_ms = timed(lambda: [join_chain_minutes(snap.df, n) for n in deep])
+            found, graph_ms = timed(lambda: [graph.chain_minutes[graph.position(n)] for n in deep])
+            assert np.allclose(found, expected)
+            print(f"{rows:>8} {'chain x' + str(QUERIES):<16} {join_ms:>9.1f} {graph_ms:>9.1f}")
+
+            # Save re-parenting incidents (including under a deeper one), re-timing others
+            movers = rng.choice(np.arange(rows // 2, rows - 3), size=50, replace=False)
+            targets = rng.choice(rows // 2, size=50)
+            deltas = pd.concat([
+                pd.DataFrame({"incident_id": snap.df["incident_id"].to_numpy()[movers],
+                              "column": "parent_incident_number", "value": graph.numbers[targets]}),
+                pd.DataFrame({"incident_id": snap.df["incident_id"].to_numpy()[targets[:20]],
+                              "column": "actual_time_spent_in_minutes", "value": "90"}),
+                pd.DataFrame({"incident_id": snap.df["incident_id"].to_numpy()[movers[:5]],
+                              "column": "parent_incident_number", "value": ""}),
+            ], ignore_index=True)
+            _, save_ms = timed(lambda: store.commit(deltas, snap.version))
+            after = store.snapshot()
+            assert after.hierarchy.graph is not None
+            same_graph(after.hierarchy.graph, IncidentGraph(after.df))
+            print(f"{rows:>8} {'save (moved)':<16} {'':>9} {save_ms:>9.1f}")
+
+            if rows <= 100_000:
+                sql = SqlStorage(sqlite3.connect(":memory:"), "incidents", SQLITE)
+                sql.create_table(snap.df)
+                sql_graph = sql.view().hierarchy()
+                same_graph(sql_graph, graph)
+                cte = lambda: [sql.fetch(CTE, [n])[0] for n in numbers]  # noqa: E731
+                expected, cte_ms = timed(cte)
+                found, graph_ms = timed(lambda: [
+                    (int(sql_graph.size[p]), sql_graph.subtree_minutes[p]) for p in map(sql_graph.position, numbers)
+                ])
+                assert [c for c, _ in found] == [c for c, _ in expected]
+                assert np.allclose([m for _, m in found], [m for _, m in expected])
+                print(f"{rows:>8} {'sql cte x' + str(QUERIES):<16} {cte_ms:>9.1f} {graph_ms:>9.1f}")
+                sql.commit(deltas, sql.version())
+                same_graph(sql.view().hierarchy(), after.hierarchy.graph)
+            os.remove(path)
+    print("Graph answers match self-joins; moved graphs match rebuilds; SQL graphs match")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
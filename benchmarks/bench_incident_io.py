@@ -0,0 +1,135 @@
+"""Streaming incident I/O (apps/app3/incident_io.py): time and peak memory.
+
+Each step runs in its own process on the same incidents, written as a
+JSON array and converted to JSON Lines:
+
+- "json.load": the whole array parsed to a list of dicts, then typed.
+- "load array" / "load jsonl": `load_incidents`, parsing chunk by chunk.
+- "convert": JSON array to JSON Lines with `convert`.
+- "import": JSON Lines into SQLite via `create_table(read_chunks(...))`.
+- "export csv" / "export jsonl": every tagged incident of the loaded
+  snapshot through `export_file`, as the download button does.
+
+Convert and import stay at the same peak whatever the file size. All
+loads must give the same frame, JSON Lines must round-trip to the same
+records, and the SQL view must export the same bytes as the in-memory one.
+
+Usage: python benchmarks/bench_incident_io.py [rows ...]
+"""
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from bench_memory import peak_mb, reset_peak
+from common import APP3_DIR, tiled_incidents
+from incident_data import apply_schema, concat_incidents, load_incidents, read_chunks, sidecar_path
+from incident_io import convert, export_file, iter_records, record_chunks, to_records
+from shared_store import SharedStore
+from storage import SQLITE, Filters, JsonView, SqlStorage
+
+STEPS = ["json.load", "load array", "load jsonl", "convert", "import", "export csv", "export jsonl"]
+FILTERS = Filters(tagged=True)
+
+
+def step(name, tmp):
+    array, lines = os.path.join(tmp, "data.json"), os.path.join(tmp, "data.jsonl")
+    for path in (array, lines):
+        if os.path.exists(sidecar_path(path)):
+            os.remove(sidecar_path(path))
+    if name.startswith("export"):
+        view = JsonView(SharedStore(array).snapshot())
+    reset_peak()
+    started = time.perf_counter()
+    if name == "json.load":
+        with open(array) as f:
+            apply_schema(pd.DataFrame(json.load(f)))
+    elif name == "load array":
+        load_incidents(array)
+    elif name == "load jsonl":
+        load_incidents(lines)
+    elif name == "convert":
+        convert(array, os.path.join(tmp, "converted.jsonl"))
+    elif name == "import":
+        db = os.path.join(tmp, "incidents.db")
+        if os.path.exists(db):
+            os.remove(db)
+        SqlStorage(sqlite3.connect(db), "incidents", SQLITE).create_table(read_chunks(lines))
+    else:
+        fmt = "CSV" if name == "export csv" else "JSON Lines"
+        with export_file(view.chunks(FILTERS), fmt, view.columns) as out:
+            out.seek(0, os.SEEK_END)
+    return time.perf_counter() - started, peak_mb()
+
+
+def measure(name, tmp):
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", name, tmp], capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_parsing(tmp):
+    """Block-boundary parsing, JSON Lines round trips and both views' exports on the sample"""
+    sample = APP3_DIR / "data.json"
+    with open(sample) as f:
+        expected = json.load(f)
+    for block_size in (1, 7, 1 << 20):
+        with open(sample) as f:
+            assert list(iter_records(f, block_size)) == expected, block_size
+    for text in ("[]", " [ ] ", "\n"):
+        assert list(iter_records(io.StringIO(text))) == []
+    lines, back = os.path.join(tmp, "sample.jsonl"), os.path.join(tmp, "sample.json")
+    assert convert(sample, lines, chunk_rows=7) == len(expected)
+    assert convert(lines, back, chunk_rows=7) == len(expected)
+    with open(back) as f:
+        assert json.load(f) == expected
+    assert sum(len(c) for c in record_chunks(lines, 7)) == len(expected)
+
+    df = load_incidents(str(sample))
+    pd.testing.assert_frame_equal(concat_incidents(read_chunks(lines, 7)), df)
+    view = JsonView(SharedStore(str(sample)).snapshot())
+    sql = SqlStorage(sqlite3.connect(":memory:"), "incidents", SQLITE)
+    assert sql.create_table(read_chunks(lines, 7)) == len(expected)
+    for filters in (FILTERS, Filters(text="disk"), Filters(isin=[("custodian_team", ["Network", "Security"])])):
+        for fmt in ("CSV", "JSON Lines"):
+            with export_file(view.chunks(filters, 7), fmt, view.columns) as a, \
+                    export_file(sql.view().chunks(filters, 7), fmt, view.columns) as b:
+                exported = a.read()
+                assert exported == b.read(), (filters.key(), fmt)
+        matching = view.page(filters).sort_values("incident_id")
+        assert [json.loads(r) for r in exported.decode().splitlines()] == to_records(matching, view.columns)
+    for path in (str(sample), lines):
+        if os.path.exists(sidecar_path(path)):
+            os.remove(sidecar_path(path))
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        check_parsing(tmp)
+        print(f"{'rows':>8} {'step':<13} {'s':>7} {'peak MB':>8}")
+        for rows in sizes:
+            df = tiled_incidents(rows)
+            with open(os.path.join(tmp, "data.json"), "w") as f:
+                json.dump(df.to_dict("records"), f, default=str)
+            del df
+            convert(os.path.join(tmp, "data.json"), os.path.join(tmp, "data.jsonl"))
+            for name in STEPS:
+                seconds, peak = measure(name, tmp)
+                print(f"{rows:>8} {name:<13} {seconds:>7.2f} {peak:>8.0f}")
+            frames = [load_incidents(os.path.join(tmp, name)) for name in ("data.json", "data.jsonl")]
+            pd.testing.assert_frame_equal(frames[0], frames[1])
+    print("Chunked loads match; JSON Lines round-trips; SQL and JSON exports match")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        print(json.dumps(step(*sys.argv[2:4])))
+    else:
+        main([int(a) for a in sys.argv[1:]] or [200_000, 1_000_000])
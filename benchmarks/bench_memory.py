@@ -0,0 +1,172 @@
+"""Peak memory of the incident frame: Python objects against the compact schema.
+
+Each representation runs in its own process on the same data.json:
+
+- "object": the frame as the app first held it, every column Python
+  objects. Filtering copies the frame (`filtered_df = df.copy()` then
+  boolean masks) and a save trims, copies and converts it to objects
+  before dumping all records at once.
+- "compact": `load_incidents` (dictionary-encoded categoricals,
+  Arrow-backed strings, int32 ids, datetime64), filters as row
+  positions with only a page sliced out, and `save_incidents` streaming
+  the JSON in chunks.
+
+Reported are the frame's own size and the peak RSS of each stage (the
+high-water mark is reset between stages where /proc allows it). Both
+saves must write the same records, and the streamed JSON must equal a
+plain `json.dump`.
+
+Usage: python benchmarks/bench_memory.py [rows]
+"""
+import gc
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import tiled_incidents
+from incident_data import load_incidents, save_incidents, to_records
+from incident_io import write_json
+from tagging import TaggedState
+
+PAGE_ROWS = 50
+# Peak RSS while loading, RSS once loaded, then the peaks while filtering and saving
+STAGES = ["load peak", "resident", "filter peak", "save peak"]
+
+
+def reset_peak():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass  # the stage peaks are then running maxima
+
+
+def peak_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def run_object(path, out):
+    peaks = {}
+    reset_peak()
+    with open(path) as f:
+        df = pd.DataFrame(json.load(f))
+    df["tagged"] = TaggedState(df).tagged
+    gc.collect()
+    peaks["load peak"], peaks["resident"] = peak_mb(), rss_mb()
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+
+    reset_peak()
+    teams = df["custodian_team"].dropna().unique()[:3]
+    filtered_df = df.copy()
+    filtered_df = filtered_df[filtered_df["tagged"]]
+    filtered_df = filtered_df[filtered_df["custodian_team"].isin(teams)]
+    page = filtered_df.iloc[:PAGE_ROWS]
+    peaks["filter peak"] = peak_mb()
+    del filtered_df
+
+    reset_peak()
+    df_save = df.drop(columns=["tagged"]).copy()
+    df_save = df_save.where(pd.notnull(df_save), None)
+    df_save = df_save.astype(object)
+    df_save = df_save.where(pd.notnull(df_save), None)
+    with open(out, "w") as f:
+        json.dump(df_save.to_dict(orient="records"), f, separators=(",", ":"))
+    peaks["save peak"] = peak_mb()
+    return frame_mb, peaks, len(page)
+
+
+def run_compact(path, out):
+    peaks = {}
+    reset_peak()
+    df = load_incidents(path)
+    df["tagged"] = TaggedState(df).tagged
+    gc.collect()
+    peaks["load peak"], peaks["resident"] = peak_mb(), rss_mb()
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+
+    reset_peak()
+    teams = df["custodian_team"].dropna().unique()[:3]
+    positions = np.flatnonzero(df["tagged"].to_numpy() & df["custodian_team"].isin(teams).to_numpy())
+    page = df.iloc[positions[:PAGE_ROWS]]
+    peaks["filter peak"] = peak_mb()
+
+    reset_peak()
+    save_incidents(df, out)
+    peaks["save peak"] = peak_mb()
+    return frame_mb, peaks, len(page)
+
+
+def child(kind, path, out):
+    frame_mb, peaks, page = (run_object if kind == "object" else run_compact)(path, out)
+    print(json.dumps({"frame": frame_mb, "peaks": peaks, "page": page}))
+
+
+def measure(kind, path, out):
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", kind, path, out], capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def check_streaming():
+    df = load_incidents(os.path.join(os.path.dirname(__file__), "..", "apps", "app3", "data.json"))
+    for chunk_rows in (1, 7, len(df), 10 * len(df)):
+        f = io.StringIO()
+        write_json(df, f, chunk_rows=chunk_rows)
+        assert f.getvalue() == json.dumps(to_records(df), separators=(",", ":")), chunk_rows
+    f = io.StringIO()
+    write_json(df.iloc[:0], f)
+    assert f.getvalue() == "[]"
+
+
+def main(rows=1_000_000):
+    check_streaming()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "data.json")
+        with open(path, "w") as f:
+            json.dump(tiled_incidents(rows).to_dict("records"), f, default=str)
+        results = {}
+        for kind in ["object", "compact"]:
+            out = os.path.join(tmp, f"saved_{kind}.json")
+            results[kind] = measure(kind, path, out)
+        with open(os.path.join(tmp, "saved_object.json")) as f:
+            before = pd.DataFrame(json.load(f))
+        with open(os.path.join(tmp, "saved_compact.json")) as f:
+            after = pd.DataFrame(json.load(f))
+        # Same records: timestamps differ only in format (ISO "T" vs the source's space)
+        for col in ["record_created_on", "record_updated_on"]:
+            before[col], after[col] = pd.to_datetime(before[col]), pd.to_datetime(after[col])
+        pd.testing.assert_frame_equal(before[after.columns], after, check_dtype=False)
+        assert results["object"]["page"] == results["compact"]["page"]
+
+    print(f"{'rows':>8} {'frame':<8} {'frame MB':>8} " + " ".join(f"{s + ' MB':>14}" for s in STAGES))
+    for kind, result in results.items():
+        print(f"{rows:>8} {kind:<8} {result['frame']:>8.0f} " + " ".join(
+            f"{result['peaks'][s]:>14.0f}" for s in STAGES))
+    print("Both saves write the same records; streamed JSON equals json.dump")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(*sys.argv[2:5])
+    else:
+        main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,145 @@
+"""Record normalization (apps/app3/normalize.py): row-wise checks against vectorized ones.
+
+Incidents are tiled from the sample, written as JSON Lines as an import
+reads them, and a known set of invalid values is planted: unparseable and negative time spent, a
+bad timestamp, an unknown category, sub-categories outside their
+category, a missing incident number, a non-integer and a repeated id.
+
+- "row-wise": every line parsed and its record checked in a Python loop
+  (float(), Timestamp(), a dict lookup per category pair), then typed
+  with `apply_schema`.
+- "normalize": every line parsed, then `normalize` on the whole frame.
+- "pool xN": `normalize_chunks` over CHUNK_ROWS-line chunks with N
+  worker processes, each parsing its own lines (repeated ids are then only caught within a chunk,
+  so the planted repeat sits in the same chunk as its original).
+
+All must keep the same rows, type them the same and report the same
+problems, which must include every planted one.
+
+Usage: python benchmarks/bench_normalize.py [rows ...]
+"""
+import json
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import tiled_incidents
+from incident_data import DATETIME_COLUMNS, FLOAT_COLUMNS, apply_schema, concat_incidents
+from incident_io import CHUNK_ROWS, to_records
+from normalize import normalize, normalize_chunks
+from tagging import EMPTY_TOKENS
+from taxonomy import FAILURE_SUB_CATEGORIES
+
+WORKERS = [1, 4]
+
+
+def planted(rows):
+    """JSON Lines with invalid values at known rows, and the (row, column, problem) expected"""
+    records = to_records(tiled_incidents(rows))
+    at = np.linspace(10, rows - 10, 9).astype(int).tolist()
+    plants = [
+        (at[0], "actual_time_spent_in_minutes", "abc", "not a number"),
+        (at[1], "actual_time_spent_in_minutes", -5, "negative"),
+        (at[2], "record_created_on", "yesterday", "not a date"),
+        (at[3], "failure_category", "Weather", "not in the taxonomy"),
+        (at[4], "failure_sub_category", "Phishing", "not a sub-category of its category"),
+        (at[5], "incident_number", "", "missing"),
+        (at[6], "incident_id", "x", "missing or not an integer"),
+        (at[7], "incident_id", records[at[7] - 1]["incident_id"], "repeated incident_id"),
+    ]
+    for row, col, value, _ in plants:
+        records[row][col] = value
+    records[at[4]]["failure_category"] = "Hardware"
+    return [json.dumps(r) + "\n" for r in records], {(row, col, problem) for row, col, _, problem in plants}
+
+
+def _empty(value):
+    return value is None or str(value).strip() in EMPTY_TOKENS
+
+
+def row_wise(lines):
+    """The per-record loop: one Python check per cell"""
+    problems, kept, seen = [], [], set()
+    for row, line in enumerate(lines):
+        record = json.loads(line)
+        record_id = record.get("incident_id")
+        try:
+            ok = not _empty(record_id) and float(record_id) % 1 == 0
+        except (TypeError, ValueError):
+            ok = False
+        if not ok:
+            problems.append((row, "incident_id", "missing or not an integer"))
+        elif float(record_id) in seen:
+            problems.append((row, "incident_id", "repeated incident_id"))
+        if _empty(record.get("incident_number")):
+            problems.append((row, "incident_number", "missing"))
+        for col in FLOAT_COLUMNS:
+            value = record.get(col)
+            if _empty(value):
+                continue
+            try:
+                if float(value) < 0:
+                    problems.append((row, col, "negative"))
+            except (TypeError, ValueError):
+                problems.append((row, col, "not a number"))
+        for col in DATETIME_COLUMNS:
+            value = record.get(col)
+            if _empty(value):
+                continue
+            try:
+                pd.Timestamp(value)
+            except ValueError:
+                problems.append((row, col, "not a date"))
+        category, sub_category = record.get("failure_category"), record.get("failure_sub_category")
+        if not _empty(category):
+            if category not in FAILURE_SUB_CATEGORIES:
+                problems.append((row, "failure_category", "not in the taxonomy"))
+            elif not _empty(sub_category) and sub_category not in FAILURE_SUB_CATEGORIES[category]:
+                problems.append((row, "failure_sub_category", "not a sub-category of its category"))
+        if ok and float(record_id) not in seen:
+            seen.add(float(record_id))
+            kept.append(record)
+    return apply_schema(pd.DataFrame(kept)), set(problems)
+
+
+def found(problems):
+    return set(zip(problems["row"], problems["column"], problems["problem"]))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def pooled(lines, workers):
+    chunks = (lines[start:start + CHUNK_ROWS] for start in range(0, len(lines), CHUNK_ROWS))
+    frames, problems = zip(*normalize_chunks(chunks, workers))
+    return concat_incidents(frames), pd.concat(problems, ignore_index=True)
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'path':<10} {'ms':>9} {'problems':>9}")
+    for rows in sizes:
+        lines, expected = planted(rows)
+        (frame, problems), ms = timed(lambda: row_wise(lines))
+        assert expected <= problems, expected - problems
+        print(f"{rows:>8} {'row-wise':<10} {ms:>9.1f} {len(problems):>9}")
+
+        (df, vector), ms = timed(lambda: normalize(pd.DataFrame([json.loads(line) for line in lines])))
+        assert found(vector) == problems, found(vector) ^ problems
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), frame)
+        print(f"{rows:>8} {'normalize':<10} {ms:>9.1f} {len(vector):>9}")
+
+        for workers in WORKERS:
+            (df, pool), ms = timed(lambda: pooled(lines, workers))
+            assert found(pool) == problems, found(pool) ^ problems
+            pd.testing.assert_frame_equal(df.reset_index(drop=True), frame, check_categorical=False)
+            print(f"{rows:>8} {'pool x' + str(workers):<10} {ms:>9.1f} {len(pool):>9}")
+    print("Vectorized and pooled normalization keep the same rows and report the same problems")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [200_000, 1_000_000])
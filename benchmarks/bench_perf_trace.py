@@ -0,0 +1,89 @@
+"""Profiling mode (apps/shared/perf_trace.py): rerun cost with it off and on.
+
+Each app runs headlessly through its bench_apps.py scenario twice on a
+fresh fixture, once plain and once with `?perf=1`. Reported are the
+median rerun wall times. The traced pass must show the overlay on every
+full rerun and leave a Chrome trace file with an event per logged span,
+the app's timed imports and its cache counters.
+
+Usage: python benchmarks/bench_perf_trace.py [rows]
+"""
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from bench_apps import APPS, SHARED_DIR, TIMEOUT
+from common import ROOT
+
+sys.path.insert(0, str(ROOT / "apps" / "shared"))
+import perf_trace  # noqa: E402
+
+CACHES = {"app2": {"gallery", "search", "cards", "thumbnails"}, "app3": {"storage"}}
+
+
+def run(app, rows, traced, trace_file):
+    """Rerun wall times and logged runs for one pass of the app's scenario"""
+    fixture, steps = APPS[app]
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"perf_{app}_") as tmp:
+        workdir = Path(tmp) / app
+        fixture(workdir, rows)
+        shutil.copytree(SHARED_DIR, Path(tmp) / "shared", ignore=shutil.ignore_patterns("__pycache__"))
+        st.cache_resource.clear()
+        perf_trace.TRACE_FILE = str(trace_file)
+        os.chdir(workdir)
+        try:
+            at = AppTest.from_file(str(workdir / "streamlit_app.py"), default_timeout=TIMEOUT)
+            if traced:
+                at.query_params["perf"] = "1"
+            walls = []
+            for name, action in steps():
+                if name != "cold load":
+                    action(at)
+                started = time.perf_counter()
+                at.run()
+                walls.append(time.perf_counter() - started)
+                assert not at.exception, at.exception[0].message
+                overlays = [e for e in at.sidebar.expander if e.label.startswith("⏱️ Perf trace")]
+                assert bool(overlays) == traced, (app, name)
+            return walls, list(at.session_state[perf_trace.RUNS_KEY])
+        finally:
+            os.chdir(cwd)
+
+
+def check_trace(app, trace_file, runs):
+    events = json.loads(Path(trace_file).read_text())["traceEvents"]
+    spans = [(e["name"], e["dur"]) for e in events if e["cat"] == "phase"]
+    logged = [(name, round((ended - began) * 1e6, 1)) for r in runs if "finished" in r for name, began, ended in r["spans"]]
+    assert all(span in spans for span in logged), app
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events if e["cat"] != "cache")
+    assert any(e["cat"] == "import" for e in events), app
+    counters = {e["name"].removeprefix("cache ") for e in events if e["ph"] == "C"}
+    assert CACHES[app] <= counters, (app, counters)
+    return len(events)
+
+
+def main(rows=10_000):
+    print(f"{'app':<5} {'rows':>7} {'plain ms':>9} {'traced ms':>10} {'events':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for app in APPS:
+            trace_file = Path(tmp) / f"{app}.json"
+            plain, _ = run(app, rows, False, trace_file)
+            assert not trace_file.exists()
+            traced, runs = run(app, rows, True, trace_file)
+            events = check_trace(app, trace_file, runs)
+            plain_ms, traced_ms = (statistics.median(walls[1:]) * 1e3 for walls in (plain, traced))
+            print(f"{app:<5} {rows:>7} {plain_ms:>9.1f} {traced_ms:>10.1f} {events:>7}")
+    print("Traced reruns show the overlay and every logged span is in the Chrome trace")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:]])
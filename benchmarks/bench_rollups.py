@@ -0,0 +1,94 @@
+"""Analytics panel: groupbys over the raw incidents against the rollup cube.
+
+"raw ms" recomputes the panel's three summaries (by team, by month,
+overall) from the incident rows, as every rerun would without rollups;
+"cube ms" answers them from the cube. After a bulk save the cube moved by
+the save's deltas must equal one rebuilt from scratch, and the SQL
+backend's GROUP BY cube must equal the in-memory one.
+
+Usage: python benchmarks/bench_rollups.py [rows ...]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import tiled_incidents
+from rollups import contributions, summarize
+from shared_store import SharedStore
+from storage import SQLITE, SqlStorage
+
+
+def raw_summaries(df):
+    minutes = df["actual_time_spent_in_minutes"]
+    frame = df.assign(month=df["record_created_on"].dt.strftime("%Y-%m"), timed=minutes.notna())
+    return (
+        frame.groupby("custodian_team", observed=True).agg(incidents=("incident_id", "size"), minutes=(
+            "actual_time_spent_in_minutes", "sum"), tagged=("tagged", "mean")),
+        frame.groupby("month").agg(incidents=("incident_id", "size"), tagged=("tagged", "sum")),
+        (len(frame), minutes.sum(), frame["tagged"].mean()),
+    )
+
+
+def cube_summaries(cube):
+    return summarize(cube, ["custodian_team"]), summarize(cube, ["month"]), summarize(cube, [])
+
+
+def timed(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def same_cube(a, b):
+    a, b = a.sort_index(), b.sort_index()
+    return a.index.equals(b.index) and np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float))
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'cells':>6} {'build ms':>9} {'raw ms':>8} {'cube ms':>8} {'save ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w") as f:
+                json.dump(tiled_incidents(rows).to_dict("records"), f, default=str)
+            store = SharedStore(path)
+            snap = store.snapshot()
+            start = time.perf_counter()
+            cube = snap.rollups.get(snap.df)
+            build_ms = (time.perf_counter() - start) * 1000
+            raw_ms = timed(lambda: raw_summaries(snap.df))
+            cube_ms = timed(lambda: cube_summaries(cube))
+
+            ids = np.arange(1, rows + 1, 7)[:5000]
+            deltas = pd.concat([
+                pd.DataFrame({"incident_id": ids, "column": "custodian_team", "value": "Platform"}),
+                pd.DataFrame({"incident_id": ids[::2], "column": "actual_time_spent_in_minutes", "value": 15.0}),
+                pd.DataFrame({"incident_id": ids[::3], "column": "record_created_on",
+                              "value": pd.Timestamp("2025-02-01")}),
+            ], ignore_index=True)
+            start = time.perf_counter()
+            store.commit(deltas, snap.version)
+            save_ms = (time.perf_counter() - start) * 1000
+            after = store.snapshot()
+            assert same_cube(after.rollups.get(after.df), contributions(after.df)), rows
+            print(f"{rows:>8} {len(cube):>6} {build_ms:>9.1f} {raw_ms:>8.1f} {cube_ms:>8.1f} {save_ms:>8.1f}")
+
+            if rows <= 200_000:
+                sql = SqlStorage(sqlite3.connect(":memory:"), "incidents", SQLITE)
+                sql.create_table(after.df)
+                assert same_cube(sql.view().rollup(), after.rollups.get(after.df)), rows
+            os.remove(path)
+    print("Incremental rollups match a rebuild; SQL rollups match the in-memory cube")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,132 @@
+"""Save time of the vectorized diff_edits against the original row-by-row save loop.
+
+The loop is the original app's, verbatim, run on the raw frame it used
+(dates parsed only in the filtered copy). It is O(rows x N) so it only
+runs up to --legacy-max rows; at those sizes both paths must leave the
+same values once typed. tests/test_edits.py covers the cases one by one,
+including where the two deliberately differ.
+
+Usage: python benchmarks/bench_save_diff.py [--legacy-max N] [rows ...]
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import tiled_incidents
+from change_log import apply_changes
+from edits import diff_edits
+from incident_data import CATEGORY_COLUMNS, DATETIME_COLUMNS, apply_schema
+
+
+def loop_save(df, filtered_df, edited_df, edit_cols):
+    """The original app's "Save Table Changes" loop, verbatim but for the file write"""
+    updated_count = 0
+    for idx, row in edited_df.iterrows():
+        eid = row["incident_id"]
+        orig_row = filtered_df[filtered_df["incident_id"] == eid].iloc[0]
+        row_updated = False
+        updated_cols = {}
+        for col in edit_cols:
+            if col in ["incident_id", "incident_number"]:
+                continue  # skip non-editable columns
+            old_val = orig_row[col]
+            new_val = row[col]
+            # Fix for actual_time_spent_in_minutes
+            if col == "actual_time_spent_in_minutes":
+                try:
+                    if new_val in ["", None]:
+                        new_val = None
+                    else:
+                        new_val = float(new_val)
+                except:  # noqa: E722
+                    new_val = None
+            # Fix for date columns
+            if col in ["record_created_on", "record_updated_on"]:
+                if pd.notnull(new_val) and isinstance(new_val, (datetime.datetime, pd.Timestamp)):
+                    new_val = new_val.isoformat()
+                elif isinstance(new_val, str):
+                    new_val = new_val
+                else:
+                    new_val = ""
+            if pd.isnull(old_val) and new_val not in [None, ""]:
+                row_updated = True
+            elif new_val != old_val and new_val not in [None, ""]:
+                row_updated = True
+            if row_updated:
+                updated_cols[col] = new_val
+        # Only update if changed
+        if row_updated:
+            for col, val in updated_cols.items():
+                df.loc[df["incident_id"] == eid, col] = val
+            updated_count += 1
+    return updated_count
+
+
+def typed_values(df):
+    """Values once saved and read back: typed, categoricals as plain values"""
+    df = apply_schema(df.copy())
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype(object)
+    return df
+
+
+def make_edits(df, fraction=0.01, seed=0):
+    """Edited copy of `df` as st.data_editor would hand it back"""
+    rng = np.random.default_rng(seed)
+    edited = df.copy()
+    for col in edited.columns:
+        if isinstance(edited[col].dtype, pd.CategoricalDtype):
+            edited[col] = edited[col].astype(object)
+    rows = rng.choice(len(df), size=max(1, int(len(df) * fraction)), replace=False)
+    quarter = np.array_split(rows, 4)
+    edited.iloc[quarter[0], edited.columns.get_loc("comments")] = "Edited in benchmark"
+    edited.iloc[quarter[1], edited.columns.get_loc("custodian_team")] = "Platform"
+    edited.iloc[quarter[2], edited.columns.get_loc("actual_time_spent_in_minutes")] = 99.5
+    edited.iloc[quarter[3], edited.columns.get_loc("record_updated_on")] = pd.Timestamp("2025-01-01 12:00")
+    # Blanks never overwrite existing values. They sit left of the row's edit: past a row's
+    # first change the original loop wrote every cell, blanks too (see tests/test_edits.py)
+    edited.iloc[quarter[0], edited.columns.get_loc("failure_reason")] = None
+    edited.iloc[quarter[2], edited.columns.get_loc("action_taken")] = ""
+    return edited
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("rows", nargs="*", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'cells':>8} {'diff s':>8} {'apply s':>8} {'loop s':>8}")
+    for rows in args.rows:
+        raw = tiled_incidents(rows)
+        df = apply_schema(raw.copy())
+        edit_cols = list(df.columns)
+        edited = make_edits(df)
+
+        start = time.perf_counter()
+        deltas = diff_edits(df, edited, edit_cols)
+        t_diff = time.perf_counter() - start
+        vectorized = df.copy()
+        start = time.perf_counter()
+        apply_changes(vectorized, deltas)
+        t_apply = time.perf_counter() - start
+
+        t_loop = float("nan")
+        if rows <= args.legacy_max:
+            looped, filtered = raw.copy(), raw.copy()
+            for date_col in DATETIME_COLUMNS:
+                filtered[date_col] = pd.to_datetime(filtered[date_col], errors="coerce")
+            loop_edited = make_edits(filtered)
+            start = time.perf_counter()
+            loop_save(looped, filtered, loop_edited, edit_cols)
+            t_loop = time.perf_counter() - start
+            pd.testing.assert_frame_equal(typed_values(vectorized), typed_values(looped))
+
+        print(f"{rows:>10} {len(deltas):>8} {t_diff:>8.3f} {t_apply:>8.3f} {t_loop:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Gallery search latency: the linear filter loop against the SearchIndex.
+
+The indexed results must contain exactly the apps the linear loop finds
+(the index additionally ranks them); without a query the order must match.
+
+Usage: python benchmarks/bench_search.py [apps ...]
+"""
+import sys
+import time
+
+from common import synthetic_apps
+from search_index import SearchIndex
+
+SCENARIOS = {
+    "one letter": ("a", []),
+    "word prefix": ("fore", []),
+    "phrase": ("cost usage", []),
+    "author": ("finops", []),
+    "tags only": ("", ["finance", "ml"]),
+    "query + tag": ("dash", ["security"]),
+    "no match": ("zzzz", []),
+}
+
+
+def linear(apps, search, selected_tags):
+    """The per-rerun loop the gallery used to run"""
+    filtered = []
+    for i, app in enumerate(apps):
+        tags = app.get("tags", [])
+        match_search = (
+            not search or
+            search.lower() in app.get("name", "").lower() or
+            search.lower() in app.get("author", "").lower() or
+            any(search.lower() in tag.lower() for tag in tags)
+        )
+        match_tags = not selected_tags or any(tag in tags for tag in selected_tags)
+        if match_search and match_tags:
+            filtered.append(i)
+    return filtered
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(sizes):
+    print(f"{'apps':>8} {'scenario':<12} {'matches':>8} {'linear ms':>10} {'first ms':>9} {'cached ms':>10} {'build s':>8}")
+    for rows in sizes:
+        apps = synthetic_apps(rows)
+        start = time.perf_counter()
+        index = SearchIndex(apps)
+        t_build = time.perf_counter() - start
+        for name, (query, tags) in SCENARIOS.items():
+            expected, t_linear = best_of(lambda: linear(apps, query, tags), repeat=3)
+            start = time.perf_counter()
+            index.search(query, tags)
+            t_first = time.perf_counter() - start
+            result, t_cached = best_of(lambda: index.search(query, tags))
+            assert sorted(result) == expected, name
+            if not query:
+                assert result == expected, name
+            print(f"{rows:>8} {name:<12} {len(result):>8} {t_linear * 1e3:>10.2f} {t_first * 1e3:>9.2f} "
+                  f"{t_cached * 1e3:>10.3f} {t_build:>8.2f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1_000, 20_000])
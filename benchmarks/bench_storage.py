@@ -0,0 +1,105 @@
+"""Dashboard queries on the JSON store against the SQL table backend.
+
+The same tiled incidents are loaded into data.json (JsonStorage) and into
+a SQLite table standing in for Snowflake (SqlStorage). Every sidebar
+scenario must return the same count, page rows and bulk-edit candidates
+from both; the timings show what the pushed-down WHERE / LIMIT / OFFSET
+queries cost per rerun. Last, two saves based on the same version check
+that the second is refused for the incidents the first one changed.
+
+Usage: python benchmarks/bench_storage.py [rows ...]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from common import tiled_incidents
+from storage import SQLITE, Filters, JsonStorage, SqlStorage
+
+SCENARIOS = {
+    "all": Filters(),
+    "tagged": Filters(tagged=True),
+    "untagged": Filters(tagged=False),
+    "tagged + dates": Filters(
+        tagged=True, date_ranges={"record_created_on": ("2024-01-01", "2024-12-31")}
+    ),
+    "teams + multi": Filters(
+        isin=[("custodian_team", ["DevOps", "Security"]), ("failure_category", ["Software"])]
+    ),
+}
+PAGES = [
+    {"offset": 0, "limit": 100},
+    {"sort_by": "actual_time_spent_in_minutes", "descending": True, "offset": 100, "limit": 100},
+    {"sort_by": "custodian_team", "offset": 300, "limit": 50},
+    {"sort_by": "record_created_on", "descending": True, "offset": 0, "limit": 250},
+]
+
+
+def same_rows(a, b):
+    a = a.drop(columns="tagged").reset_index(drop=True).astype(str)
+    b = b.drop(columns="tagged").reset_index(drop=True).astype(str)
+    return a.equals(b)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def check_commit(storage):
+    base = storage.version()
+    first = pd.DataFrame({"incident_id": [1, 2], "column": "custodian_team", "value": "TeamA"})
+    second = pd.DataFrame({"incident_id": [2, 3], "column": "custodian_team", "value": "TeamB"})
+    a = storage.commit(first, base)
+    b = storage.commit(second, base)
+    assert len(a.applied) == 2 and not len(a.conflicts), storage.name
+    assert b.applied["incident_id"].tolist() == [3], storage.name
+    assert b.conflicts["incident_id"].tolist() == [2], storage.name
+    rows = storage.view().rows([1, 2, 3])
+    assert rows["custodian_team"].astype(str).tolist() == ["TeamA", "TeamA", "TeamB"], storage.name
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'scenario':<18} {'matches':>8} {'json ms':>8} {'sql ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            df = tiled_incidents(rows)
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w") as f:
+                json.dump(df.to_dict("records"), f, default=str)
+            storages = [JsonStorage(path), SqlStorage(sqlite3.connect(":memory:"), "incidents", SQLITE)]
+            storages[1].create_table(storages[0].view().df)
+            for name, filters in SCENARIOS.items():
+                results, times = [], []
+                for storage in storages:
+                    view = storage.view()
+
+                    def run():
+                        return (
+                            view.count_matching(filters),
+                            [view.page(filters, **page) for page in PAGES],
+                            view.matching_ids(filters, "inc10", 50),
+                        )
+
+                    result, ms = timed(run)
+                    results.append(result)
+                    times.append(ms)
+                (count, pages, ids), (sql_count, sql_pages, sql_ids) = results
+                assert count == sql_count, (name, count, sql_count)
+                assert all(same_rows(a, b) for a, b in zip(pages, sql_pages)), name
+                assert ids == sql_ids, name
+                print(f"{rows:>8} {name:<18} {count:>8} {times[0]:>8.1f} {times[1]:>8.1f}")
+            for storage in storages:
+                check_commit(storage)
+            os.remove(path)
+    print("JSON and SQL backends agree; stale saves are refused on both")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [20_000, 200_000])
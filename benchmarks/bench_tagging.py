@@ -0,0 +1,45 @@
+"""Compare the columnar TaggedState against the old row-wise is_tagged.
+
+Usage: python benchmarks/bench_tagging.py [rows ...]
+"""
+import sys
+import time
+
+from common import tiled_incidents
+from tagging import TaggedState
+
+
+def rowwise_tagged(df):
+    """The original implementation from streamlit_app.py"""
+    def is_tagged(row):
+        cols = [c for c in df.columns if c not in ["incident_id", "incident_number"]]
+        return any(str(row[c]).strip() not in ["", "None", "nan", "NaN", None] for c in cols)
+    return df.apply(is_tagged, axis=1)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'row-wise s':>12} {'columnar s':>12} {'update s':>10} {'speedup':>8}")
+    for rows in sizes:
+        df = tiled_incidents(rows)
+        expected, t_rows = timed(rowwise_tagged, df)
+        state, t_cols = timed(TaggedState, df)
+        assert (state.series(df) == expected).all(), "columnar result differs from is_tagged"
+
+        # Blank out a handful of rows and patch the state incrementally
+        edited = df["incident_id"].sample(min(100, rows), random_state=0).tolist()
+        df.loc[df["incident_id"].isin(edited), "comments"] = ""
+        _, t_update = timed(state.update, df, edited, ["comments"])
+        edited_rows = df[df["incident_id"].isin(edited)]
+        assert (state.series(edited_rows) == rowwise_tagged(edited_rows)).all(), "incremental update differs"
+
+        print(f"{rows:>10} {t_rows:>12.3f} {t_cols:>12.4f} {t_update:>10.5f} {t_rows / t_cols:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [10_000, 100_000])
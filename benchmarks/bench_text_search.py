@@ -0,0 +1,116 @@
+"""Incident text search: column scans against the text index.
+
+Incidents get generated free-text comments. "scan ms" answers a query by
+matching every row of the five searched columns with the regular
+expressions the SQL backend uses, as a str.contains filter would; "index
+ms" asks the snapshot's TextIndex (first query after a cleared cache).
+Both must return the same incidents in the same ranked order. After a
+bulk save the patched index must agree with one rebuilt from scratch, and
+the SQLite backend's pages with the in-memory ones.
+
+Usage: python benchmarks/bench_text_search.py [rows ...]
+"""
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from common import WORDS, tiled_incidents
+from shared_store import SharedStore
+from storage import SQLITE, Filters, JsonView, SqlStorage
+from text_index import COLUMN_WEIGHTS, SEARCH_COLUMNS, TextIndex, parse_query, term_pattern, term_weight
+
+QUERIES = ["disk", "dash*", '"disk full"', "INC1042", "1042", "memory leak", '"restored back*"', "quality 7*"]
+
+
+def with_comments(df, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = WORDS + ["disk", "full", "restored", "backup", "memory", "leak", "router", "timeout"]
+    words = rng.choice(vocabulary, size=(len(df), 7))
+    numbers = rng.integers(0, 100, size=len(df))
+    df["comments"] = [" ".join(w) + f" ticket-{n}" for w, n in zip(words.tolist(), numbers.tolist())]
+    return df
+
+
+def scan(df, query):
+    """(positions, scores) by matching every row, ranked like TextIndex"""
+    lowered = {col: df[col].astype(object).where(df[col].notna(), None) for col in SEARCH_COLUMNS}
+    lowered = {col: values.map(lambda v: v.lower() if isinstance(v, str) else "") for col, values in lowered.items()}
+    keep = np.ones(len(df), dtype=bool)
+    scores = np.zeros(len(df), dtype=np.float32)
+    for term in parse_query(query):
+        found = np.zeros(len(df), dtype=bool)
+        for col, values in lowered.items():
+            hit = values.str.fullmatch(term_pattern(term), flags=re.S).to_numpy(dtype=bool)
+            scores += hit * (COLUMN_WEIGHTS[col] * term_weight(term))
+            found |= hit
+        keep &= found
+    positions = np.flatnonzero(keep)
+    order = np.lexsort((positions, -scores[positions]))
+    return positions[order], scores[positions][order]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def same(a, b):
+    return np.array_equal(a[0], b[0]) and np.allclose(a[1], b[1])
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'query':<18} {'matches':>8} {'scan ms':>9} {'index ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, "data.json")
+            with open(path, "w") as f:
+                json.dump(with_comments(tiled_incidents(rows)).to_dict("records"), f, default=str)
+            store = SharedStore(path)
+            snap = store.snapshot()
+            index, build_ms = timed(lambda: snap.text_index.get(snap.df))
+            print(f"{rows:>8} {'(build)':<18} {'':>8} {'':>9} {build_ms:>9.1f}")
+            for query in QUERIES:
+                expected, scan_ms = timed(lambda: scan(snap.df, query))
+                index._search.cache_clear()
+                found, index_ms = timed(lambda: index.search(query))
+                assert same(found, expected), query
+                print(f"{rows:>8} {query:<18} {len(found[0]):>8} {scan_ms:>9.1f} {index_ms:>9.1f}")
+
+            # Bulk save touching comments and failure reasons: patched, not rebuilt
+            ids = np.arange(1, rows + 1, 97)[:2000]
+            deltas = pd.concat([
+                pd.DataFrame({"incident_id": ids, "column": "comments", "value": "Disk full after backup zebra"}),
+                pd.DataFrame({"incident_id": ids[::2], "column": "failure_reason", "value": "Zebra Stripes"}),
+            ], ignore_index=True)
+            store.commit(deltas, snap.version)
+            after = store.snapshot()
+            assert after.text_index.fields is snap.text_index.fields and len(after.text_index.patch) == len(ids)
+            rebuilt = TextIndex().get(after.df)
+            for query in QUERIES + ["zebra stri*", '"full after"', "zebra"]:
+                patched, patched_ms = timed(lambda: after.text_index.search(query))
+                assert same(patched, rebuilt.search(query)), query
+            print(f"{rows:>8} {'zebra (patched)':<18} {len(patched[0]):>8} {'':>9} {patched_ms:>9.1f}")
+
+            if rows <= 50_000:
+                sql = SqlStorage(sqlite3.connect(":memory:"), "incidents", SQLITE)
+                sql.create_table(after.df)
+                json_view, sql_view = JsonView(after), sql.view()
+                for query in QUERIES + ["zebra"]:
+                    filters = Filters(tagged=True, text=query)
+                    assert json_view.count_matching(filters) == sql_view.count_matching(filters), query
+                    expected = json_view.page(filters, limit=50)["incident_id"].tolist()
+                    assert sql_view.page(filters, limit=50)["incident_id"].tolist() == expected, query
+            os.remove(path)
+    print("Index results match full scans; patched index matches a rebuild; SQL pages match")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
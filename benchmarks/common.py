@@ -0,0 +1,56 @@
+"""Shared fixtures for the benchmark scripts."""
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+APP2_DIR = ROOT / "apps" / "app2"
+APP3_DIR = ROOT / "apps" / "app3"
+sys.path.insert(0, str(APP3_DIR))
+sys.path.insert(1, str(APP2_DIR))
+
+
+def tiled_incidents(rows, typed=False):
+    """Tile the sample app3 data.json up to `rows` incidents with unique ids"""
+    with open(APP3_DIR / "data.json", "r") as f:
+        sample = pd.DataFrame(json.load(f))
+    reps = int(np.ceil(rows / len(sample)))
+    df = pd.concat([sample] * reps, ignore_index=True).iloc[:rows].copy()
+    df["incident_id"] = np.arange(1, rows + 1)
+    df["incident_number"] = [f"INC{1000 + i}" for i in df["incident_id"]]
+    if typed:
+        from incident_data import apply_schema
+        df = apply_schema(df)
+    return df
+
+
+WORDS = [
+    "sales", "forecast", "incident", "inventory", "pipeline", "snowflake", "cost", "usage", "churn",
+    "quality", "editor", "dashboard", "explorer", "monitor", "report", "ledger", "margin", "query",
+    "warehouse", "lineage", "alerts", "budget", "model", "feature", "store", "audit", "access", "tagging",
+]
+TAGS = ["incident", "finance", "ops", "ml", "security", "reporting", "test", "false", "sales", "hr", "gov", "beta"]
+AUTHORS = ["internal", "data-eng", "platform", "analytics", "finops", "sre", "ml-team"]
+
+
+def synthetic_apps(rows, seed=0):
+    """A varied apps.json catalog of `rows` apps"""
+    rng = np.random.default_rng(seed)
+    apps = []
+    for i in range(1, rows + 1):
+        words = rng.choice(WORDS, size=rng.integers(2, 5), replace=False)
+        apps.append({
+            "name": " ".join(w.title() for w in words) + f" {i}",
+            "author": AUTHORS[int(rng.integers(len(AUTHORS)))],
+            "url": f"url{i}",
+            "source_url": f"src{i}",
+            "image": "preview.png",
+            "theme": "#4A90E2",
+            "new": bool(rng.random() < 0.15),
+            "description": " ".join(rng.choice(WORDS, size=8)).capitalize() + ".",
+            "tags": rng.choice(TAGS, size=rng.integers(1, 4), replace=False).tolist(),
+        })
+    return apps
@@ -0,0 +1,182 @@
+"""Build the optimized per-app bundle that deploy_apps.py uploads.
+
+For each file an app's upload_app.sql ships, the bundle under
+build/<app>/ holds:
+
+- `.py` and other files: copied as they are.
+- JSON: minified.
+- `data.json` or `data.jsonl` (incidents): parsed chunk by chunk and
+  converted to `data.arrow`, zstd-compressed Arrow IPC that
+  incident_data.load_incidents reads without JSON parsing (the app
+  prefers it when present). Without pyarrow it is minified or copied.
+- `apps.json` (gallery catalog): minified, plus `apps.json.index` with
+  the catalog offsets, card keys and search index gallery_index.load
+  would otherwise build at startup.
+- Images: scaled down to the card thumbnail height and re-encoded
+  losslessly, kept only when smaller.
+
+build/<app>/bundle_manifest.json records the SHA-256 of each source, of
+the app code its outputs depend on and of every output. A rebuild only
+redoes sources whose hashes changed.
+
+Usage: python deploy/build_bundle.py app1 app2 app3
+"""
+import io
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from deploy_apps import ROOT, content_hash, read_app
+
+try:
+    from PIL import Image
+except ImportError:  # images are copied unchanged
+    Image = None
+
+BUILD_DIR = ROOT / "build"
+BUNDLE_MANIFEST = "bundle_manifest.json"
+# Bump when a builder's output changes for the same inputs
+BUNDLE_FORMAT = 1
+# Tallest preview the gallery shows (image_cache.CARD_HEIGHT)
+IMAGE_MAX_HEIGHT = 180
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+
+def _app_modules(source):
+    """Make the app's own modules importable; bundle builders reuse its loaders"""
+    app_dir = str(Path(source).parent)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+
+
+def _minify(source, target):
+    with open(source, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+
+
+# --- Builders: (source, output dir) -> output file names ---
+def copy_file(source, out_dir):
+    shutil.copyfile(source, out_dir / source.name)
+    return [source.name]
+
+
+def minify_json(source, out_dir):
+    _minify(source, out_dir / source.name)
+    return [source.name]
+
+
+def build_incidents(source, out_dir):
+    _app_modules(source)
+    import incident_data
+
+    if incident_data.feather is None:
+        return minify_json(source, out_dir) if source.suffix == ".json" else copy_file(source, out_dir)
+    df = incident_data.concat_incidents(incident_data.read_chunks(source))
+    name = source.stem + incident_data.COLUMNAR_SUFFIX
+    incident_data.write_columnar(df, out_dir / name)
+    return [name]
+
+
+def build_gallery(source, out_dir):
+    target = out_dir / source.name
+    _minify(source, target)
+    _app_modules(source)
+    import gallery_index
+
+    gallery = gallery_index.build(target)
+    gallery[0].file.close()
+    gallery_index.write_prebuilt(target, gallery)
+    return [source.name, source.name + gallery_index.INDEX_SUFFIX]
+
+
+def optimize_image(source, out_dir):
+    if Image is None:
+        return copy_file(source, out_dir)
+    data = source.read_bytes()
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            fmt = img.format
+            if img.height > IMAGE_MAX_HEIGHT:
+                width = max(1, round(img.width * IMAGE_MAX_HEIGHT / img.height))
+                img = img.resize((width, IMAGE_MAX_HEIGHT), Image.LANCZOS)
+            out = io.BytesIO()
+            if fmt == "JPEG":
+                img.save(out, fmt, quality=85, optimize=True, progressive=True)
+            elif fmt == "WEBP":
+                img.save(out, fmt, lossless=True, method=6)
+            else:
+                img.save(out, fmt, optimize=True)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return copy_file(source, out_dir)
+    if len(out.getvalue()) >= len(data):
+        return copy_file(source, out_dir)
+    (out_dir / source.name).write_bytes(out.getvalue())
+    return [source.name]
+
+
+# File name -> (builder, app modules its output depends on)
+NAMED_BUILDERS = {
+    "data.json": (build_incidents, ["incident_data.py", "incident_io.py"]),
+    "data.jsonl": (build_incidents, ["incident_data.py", "incident_io.py"]),
+    "apps.json": (build_gallery, ["app_catalog.py", "cards.py", "search_index.py", "gallery_index.py"]),
+}
+
+
+def builder_for(source):
+    if source.name in NAMED_BUILDERS:
+        return NAMED_BUILDERS[source.name]
+    if source.suffix.lower() == ".json":
+        return minify_json, []
+    if source.suffix.lower() in IMAGE_SUFFIXES:
+        return optimize_image, []
+    return copy_file, []
+
+
+def build_app(app, build_dir=BUILD_DIR, log=print):
+    """Build `app`'s bundle; returns {stage file name: bundle path}"""
+    out_dir = Path(build_dir) / app.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / BUNDLE_MANIFEST
+    old = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    if old.get("format") != BUNDLE_FORMAT:
+        old = {}
+    sources, files, rebuilt = {}, {}, 0
+    for name, source in app.files.items():
+        source = Path(source)
+        builder, deps = builder_for(source)
+        key = {
+            "sha256": content_hash(source),
+            "deps": {dep: content_hash(source.parent / dep) for dep in deps if (source.parent / dep).exists()},
+        }
+        previous = old.get("sources", {}).get(name)
+        outputs = previous["outputs"] if previous and previous["key"] == key else None
+        if outputs is None or any(
+            not (out_dir / out).exists() or content_hash(out_dir / out) != digest for out, digest in outputs.items()
+        ):
+            outputs = {out: content_hash(out_dir / out) for out in builder(source, out_dir)}
+            rebuilt += 1
+        sources[name] = {"source": os.path.relpath(source, ROOT), "key": key, "outputs": outputs}
+        files.update({out: out_dir / out for out in outputs})
+    manifest_path.write_text(json.dumps({"format": BUNDLE_FORMAT, "sources": sources}, indent=2, sort_keys=True))
+    source_bytes = sum(Path(p).stat().st_size for p in app.files.values())
+    bundle_bytes = sum(p.stat().st_size for p in files.values())
+    log(f"{app.name}: {rebuilt} of {len(app.files)} source(s) rebuilt, "
+        f"{source_bytes / 1024:.1f} KiB -> {bundle_bytes / 1024:.1f} KiB")
+    return files
+
+
+def main(argv=None):
+    names = (argv if argv is not None else sys.argv[1:]) or sorted(
+        p.name for p in (ROOT / "apps").iterdir() if (p / "upload_app.sql").exists()
+    )
+    for name in names:
+        build_app(read_app(name, "", ""))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
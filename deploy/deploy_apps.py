@@ -0,0 +1,298 @@
+"""Upload the Streamlit apps' files to their Snowflake stages.
+
+Each app's `upload_app.sql` stays the list of files to ship: the tool
+reads its PUT lines (paths relative to `terraform/`, where snowsql ran
+them). A file is uploaded only when its SHA-256 differs from the
+manifest kept on the stage from the previous deploy, and files that
+dropped out of the list are removed. Uploads for all apps share one
+bounded worker pool; each worker opens a single transport connection and
+reuses it for every file it handles.
+
+Transports:
+
+- `snowflake`: PUT / GET / REMOVE through snowflake-connector-python.
+- `local`: a directory per stage, a stand-in for dry runs and benchmarks.
+
+With `--bundle` the files are first run through build_bundle.py and the
+optimized bundle is uploaded instead.
+
+Usage:
+    python deploy/deploy_apps.py --app app1:STREAMLIT_APPS.APP --app app2:STREAMLIT_APPS.APP \
+        --transport snowflake --account ORG-ACCOUNT --user USER --role SYSADMIN --bundle
+    python deploy/deploy_apps.py --app app1:DB.SCHEMA --transport local --local-dir /tmp/stages
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import snowflake.connector as snowflake_connector
+except ImportError:  # only the snowflake transport needs it
+    snowflake_connector = None
+
+ROOT = Path(__file__).resolve().parent.parent
+# The content hash is shared with the apps, whose helpers live in apps/shared
+sys.path.append(str(ROOT / "apps" / "shared"))
+from hashing import content_hash  # noqa: E402
+
+# PUT paths in upload_app.sql are relative to the directory snowsql runs in
+PUT_BASE = ROOT / "terraform"
+MANIFEST_NAME = "deploy_manifest.json"
+MANIFEST_FORMAT = 1
+DEFAULT_WORKERS = 8
+_PUT_LINE = re.compile(r"^\s*PUT\s+'?file://(?P<path>[^'\s]+)'?\s+@(?P<stage>[\w$.]+)", re.IGNORECASE)
+
+
+# --- App file lists and hashes ---
+class AppFiles:
+    """Files of one app as listed in its upload_app.sql"""
+
+    def __init__(self, name, database, schema, stage, files):
+        self.name = name
+        self.database = database
+        self.schema = schema
+        self.stage = stage
+        self.files = files  # stage file name -> local path
+
+    @property
+    def qualified_stage(self):
+        return f"{self.database}.{self.schema}.{self.stage}"
+
+
+def read_app(name, database, schema, apps_dir=ROOT / "apps", put_base=PUT_BASE):
+    """AppFiles from apps/<name>/upload_app.sql"""
+    stage, files = None, {}
+    with open(Path(apps_dir) / name / "upload_app.sql", "r") as f:
+        for line in f:
+            match = _PUT_LINE.match(line)
+            if not match:
+                continue
+            path = (Path(put_base) / match["path"]).resolve()
+            stage = match["stage"]
+            if path.name in files and files[path.name] != path:
+                raise ValueError(f"{name}: two files upload as {path.name}")
+            files[path.name] = path
+    if stage is None:
+        raise ValueError(f"{name}: no PUT lines in upload_app.sql")
+    return AppFiles(name, database, schema, stage, files)
+
+
+def plan(app, manifest):
+    """(names to upload, names to remove, new manifest) for one app"""
+    hashes = {name: content_hash(path) for name, path in app.files.items()}
+    old = manifest.get("files", {}) if manifest else {}
+    uploads = sorted(name for name, digest in hashes.items() if old.get(name) != digest)
+    removals = sorted(name for name in old if name not in hashes)
+    return uploads, removals, {"format": MANIFEST_FORMAT, "files": hashes}
+
+
+# --- Transports ---
+class LocalDirTransport:
+    """Stages as directories under `root`; stands in for Snowflake in dry runs and benchmarks.
+
+    `latency` (seconds) is added to every operation to model a remote round trip.
+    """
+
+    def __init__(self, root, latency=0.0):
+        self.root = Path(root)
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def connect(self):
+        with self.lock:
+            self.connections += 1
+        return self
+
+    def close(self):
+        pass
+
+    def _stage_dir(self, stage):
+        path = self.root / stage
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def put(self, path, stage):
+        time.sleep(self.latency)
+        shutil.copyfile(path, self._stage_dir(stage) / Path(path).name)
+
+    def get(self, stage, name):
+        time.sleep(self.latency)
+        path = self._stage_dir(stage) / name
+        return path.read_bytes() if path.exists() else None
+
+    def remove(self, stage, name):
+        time.sleep(self.latency)
+        (self._stage_dir(stage) / name).unlink(missing_ok=True)
+
+
+class SnowflakeConnection:
+    """One Snowflake session used by one worker"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _execute(self, sql):
+        cur = self.connection.cursor()
+        try:
+            cur.execute(sql)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def close(self):
+        self.connection.close()
+
+    def put(self, path, stage):
+        self._execute(f"PUT 'file://{Path(path).as_posix()}' @{stage} OVERWRITE = TRUE AUTO_COMPRESS = FALSE")
+
+    def get(self, stage, name):
+        if not self._execute(f"LIST @{stage}/{name}"):
+            return None
+        with tempfile.TemporaryDirectory() as tmp:
+            self._execute(f"GET @{stage}/{name} 'file://{Path(tmp).as_posix()}/'")
+            target = Path(tmp) / name
+            return target.read_bytes() if target.exists() else None
+
+    def remove(self, stage, name):
+        self._execute(f"REMOVE @{stage}/{name}")
+
+
+class SnowflakeTransport:
+    def __init__(self, **connect_args):
+        if snowflake_connector is None:
+            raise RuntimeError("The snowflake transport needs snowflake-connector-python")
+        self.connect_args = connect_args
+
+    def connect(self):
+        return SnowflakeConnection(snowflake_connector.connect(**self.connect_args))
+
+
+# --- Deploy ---
+class WorkerPool:
+    """Bounded thread pool whose workers each hold one transport connection"""
+
+    def __init__(self, transport, workers):
+        self.transport = transport
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+    def connection(self):
+        conn = getattr(self.local, "connection", None)
+        if conn is None:
+            conn = self.local.connection = self.transport.connect()
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def map(self, fn, items):
+        """fn(connection, item) for each item; results in item order, first error re-raised"""
+        futures = [self.executor.submit(lambda item=item: fn(self.connection(), item)) for item in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for conn in self.connections:
+            conn.close()
+
+
+def deploy(apps, transport, workers=DEFAULT_WORKERS, dry_run=False, force=False, log=print):
+    """Sync every app's stage with its files; returns {app name: (uploaded, removed)}"""
+    pool = WorkerPool(transport, workers)
+    try:
+        manifests = pool.map(lambda conn, app: conn.get(app.qualified_stage, MANIFEST_NAME), apps)
+        plans = {}
+        for app, raw in zip(apps, manifests):
+            manifest = None if force or raw is None else json.loads(raw)
+            plans[app.name] = plan(app, manifest)
+        by_name = {app.name: app for app in apps}
+        uploads = [(name, file) for name, (files, _, _) in plans.items() for file in files]
+        removals = [(name, file) for name, (_, files, _) in plans.items() for file in files]
+        for name, (up, rm, _) in plans.items():
+            log(f"{name}: {len(up)} to upload, {len(rm)} to remove, "
+                f"{len(by_name[name].files) - len(up)} unchanged")
+        if dry_run:
+            return {name: (up, rm) for name, (up, rm, _) in plans.items()}
+
+        pool.map(lambda conn, job: conn.put(by_name[job[0]].files[job[1]], by_name[job[0]].qualified_stage), uploads)
+        pool.map(lambda conn, job: conn.remove(by_name[job[0]].qualified_stage, job[1]), removals)
+
+        # Manifests last: a failed upload above leaves the old manifest, so the next run retries it
+        changed = [name for name, (up, rm, _) in plans.items() if up or rm or force]
+
+        def write_manifest(conn, name):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = Path(tmp) / MANIFEST_NAME
+                path.write_text(json.dumps(plans[name][2], indent=2, sort_keys=True))
+                conn.put(path, by_name[name].qualified_stage)
+
+        pool.map(write_manifest, changed)
+        return {name: (up, rm) for name, (up, rm, _) in plans.items()}
+    finally:
+        pool.close()
+
+
+def parse_app(spec):
+    """app_name:DATABASE.SCHEMA"""
+    name, _, location = spec.partition(":")
+    database, _, schema = location.partition(".")
+    if not (name and database and schema):
+        raise argparse.ArgumentTypeError(f"Expected app_name:DATABASE.SCHEMA, got {spec!r}")
+    return name, database, schema
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", dest="apps", action="append", type=parse_app, required=True,
+                        help="app_name:DATABASE.SCHEMA (repeatable)")
+    parser.add_argument("--transport", choices=["snowflake", "local"], default="snowflake")
+    parser.add_argument("--local-dir", help="Stage root for the local transport")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--account", default=os.environ.get("SNOWFLAKE_ACCOUNT"))
+    parser.add_argument("--user", default=os.environ.get("SNOWFLAKE_USER"))
+    parser.add_argument("--role", default=os.environ.get("SNOWFLAKE_ROLE"))
+    parser.add_argument("--warehouse", default=os.environ.get("SNOWFLAKE_WAREHOUSE"))
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would change")
+    parser.add_argument("--force", action="store_true", help="Ignore the stage manifests and upload everything")
+    parser.add_argument("--bundle", action="store_true",
+                        help="Upload the optimized bundle from build_bundle.py instead of the source files")
+    args = parser.parse_args(argv)
+
+    apps = [read_app(name, database, schema) for name, database, schema in args.apps]
+    if args.bundle:
+        from build_bundle import build_app
+
+        for app in apps:
+            app.files = build_app(app)
+    if args.transport == "local":
+        if not args.local_dir:
+            parser.error("--local-dir is required with --transport local")
+        transport = LocalDirTransport(args.local_dir)
+    else:
+        connect_args = {
+            "account": args.account,
+            "user": args.user,
+            "password": os.environ.get("SNOWFLAKE_PASSWORD"),
+            "role": args.role,
+            "warehouse": args.warehouse,
+        }
+        transport = SnowflakeTransport(**{k: v for k, v in connect_args.items() if v})
+    start = time.perf_counter()
+    results = deploy(apps, transport, workers=args.workers, dry_run=args.dry_run, force=args.force)
+    uploaded = sum(len(up) for up, _ in results.values())
+    verb = "would upload" if args.dry_run else "uploaded"
+    print(f"Deployed {len(apps)} app(s): {uploaded} file(s) {verb} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
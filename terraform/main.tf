@@ -18,19 +18,20 @@ resource "snowflake_streamlit" "streamlit_app" {
   query_warehouse = var.snowflake_warehouse
 }
 
+# Builds the optimized app bundles, then uploads only the files whose hash differs
+# from each stage's deploy manifest, for all apps at once through a bounded worker
+# pool (see deploy/build_bundle.py and deploy/deploy_apps.py)
 resource "null_resource" "upload_streamlit_script" {
-  for_each   = { for app in var.apps : app.app_name => app }
   depends_on = [snowflake_streamlit.streamlit_app]
   provisioner "local-exec" {
     environment = {
-      SNOWSQL_PWD = var.snowflake_password
+      SNOWFLAKE_PASSWORD = var.snowflake_password
     }
 
-    command = "snowsql -a ${var.snowflake_org_name}-${var.snowflake_account_name} -u ${var.snowflake_user} -r ${var.snowflake_role} -d ${each.value.database} -s ${each.value.schema} -f ../apps/${each.value.app_name}/upload_app.sql"
+    command = "python3 ../deploy/deploy_apps.py --transport snowflake --account ${var.snowflake_org_name}-${var.snowflake_account_name} --user ${var.snowflake_user} --role ${var.snowflake_role} --warehouse ${var.snowflake_warehouse} --workers ${var.deploy_workers} --bundle ${join(" ", [for app in var.apps : "--app ${app.app_name}:${app.database}.${app.schema}"])}"
   }
 
   triggers = {
     always_run = timestamp()
   }
 }
-
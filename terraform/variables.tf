@@ -36,6 +36,12 @@ variable "snowflake_warehouse" {
   default     = "COMPUTE_WH"
 }
 
+variable "deploy_workers" {
+  description = "Concurrent stage uploads (one Snowflake connection each) across all apps"
+  type        = number
+  default     = 8
+}
+
 variable "apps" {
   description = "List of apps with their configurations"
   type = list(object({
@@ -0,0 +1,25 @@
+"""Shared fixtures for the app tests.
+
+The app modules import each other by bare name, as they do on the stage,
+so the app directory goes on sys.path first.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+APP3_DIR = ROOT / "apps" / "app3"
+sys.path.insert(0, str(APP3_DIR))
+
+
+@pytest.fixture
+def records():
+    """The first 20 sample incidents as JSON records, with a few missing values"""
+    with open(APP3_DIR / "data.json", "r") as f:
+        records = json.load(f)[:20]
+    records[2]["actual_time_spent_in_minutes"] = None
+    records[3]["failure_reason"] = None
+    records[4]["record_updated_on"] = None
+    return records
@@ -0,0 +1,245 @@
+"""diff_edits and bulk_edit_deltas against the row-by-row loops they replaced.
+
+`baseline_save` and `baseline_bulk` are the original app's save loops,
+copied verbatim with only the file writes left out. Both paths run on the
+same edits and must leave the same values once typed. Where the new paths
+deliberately differ, a separate test pins the difference down.
+"""
+import datetime
+
+import pandas as pd
+
+from change_log import apply_changes
+from edits import bulk_edit_deltas, diff_edits
+from incident_data import CATEGORY_COLUMNS, DATETIME_COLUMNS, apply_schema
+
+NEW_DATE = pd.Timestamp("2025-01-01 12:00")
+
+
+def baseline_save(df, filtered_df, edited_df, edit_cols):
+    """"Save Table Changes" of the original app: updates `df` in place, returns the updated count"""
+    updated_count = 0
+    for idx, row in edited_df.iterrows():
+        eid = row["incident_id"]
+        orig_row = filtered_df[filtered_df["incident_id"] == eid].iloc[0]
+        row_updated = False
+        updated_cols = {}
+        for col in edit_cols:
+            if col in ["incident_id", "incident_number"]:
+                continue  # skip non-editable columns
+            old_val = orig_row[col]
+            new_val = row[col]
+            # Fix for actual_time_spent_in_minutes
+            if col == "actual_time_spent_in_minutes":
+                try:
+                    if new_val in ["", None]:
+                        new_val = None
+                    else:
+                        new_val = float(new_val)
+                except:  # noqa: E722
+                    new_val = None
+            # Fix for date columns
+            if col in ["record_created_on", "record_updated_on"]:
+                if pd.notnull(new_val) and isinstance(new_val, (datetime.datetime, pd.Timestamp)):
+                    new_val = new_val.isoformat()
+                elif isinstance(new_val, str):
+                    new_val = new_val
+                else:
+                    new_val = ""
+            if pd.isnull(old_val) and new_val not in [None, ""]:
+                row_updated = True
+            elif new_val != old_val and new_val not in [None, ""]:
+                row_updated = True
+            if row_updated:
+                updated_cols[col] = new_val
+        # Only update if changed
+        if row_updated:
+            for col, val in updated_cols.items():
+                df.loc[df["incident_id"] == eid, col] = val
+            updated_count += 1
+    return updated_count
+
+
+def baseline_bulk(df, selected_ids, edit_cols, bulk_edit_values):
+    """"Apply Changes to All Selected" of the original app: updates `df` in place, returns the updated count"""
+    updated_count = 0
+    for eid in selected_ids:
+        row_updated = False
+        for col in edit_cols:
+            if col in ["incident_id", "incident_number"]:
+                continue
+            val = bulk_edit_values[col]
+            # Handle skip logic for dropdown and datetime
+            if col == "failure_category" and val == "":
+                continue
+            if col in ["record_created_on", "record_updated_on"] and val is None:
+                continue
+            if isinstance(val, str) and val.strip() == "":
+                continue
+            if col == "actual_time_spent_in_minutes":
+                try:
+                    if val in ["", None]:
+                        val = None
+                    else:
+                        val = float(val)
+                except:  # noqa: E722
+                    val = None
+            # Only update if value is different
+            old_val = df.loc[df["incident_id"] == eid, col].values[0]
+            if pd.isnull(old_val) and val not in [None, ""]:
+                df.loc[df["incident_id"] == eid, col] = val
+                row_updated = True
+            elif val != old_val and val not in [None, ""]:
+                df.loc[df["incident_id"] == eid, col] = val
+                row_updated = True
+        if row_updated:
+            updated_count += 1
+    return updated_count
+
+
+def saved(df):
+    """Values as they read back after a save: typed, categoricals as plain values"""
+    df = apply_schema(df.copy())
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype(object)
+    return df
+
+
+def edit(frame, changes):
+    """Copy of `frame` as st.data_editor hands it back after `changes` ({(row, column): value})"""
+    frame = frame.copy()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(object)
+    for (row, col), value in changes.items():
+        frame.iloc[row, frame.columns.get_loc(col)] = value
+    return frame
+
+
+def run_save(records, changes):
+    """(baseline frame, baseline count, new frame, deltas) after saving the same table edits both ways"""
+    df = pd.DataFrame(records)
+    filtered_df = df.copy()
+    for date_col in DATETIME_COLUMNS:
+        filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], errors="coerce")
+    edit_cols = list(df.columns)
+    count = baseline_save(df, filtered_df, edit(filtered_df[edit_cols], changes), edit_cols)
+
+    typed = apply_schema(pd.DataFrame(records))
+    deltas = diff_edits(typed, edit(typed, changes), edit_cols)
+    return saved(df), count, saved(apply_changes(typed, deltas)), deltas
+
+
+def run_bulk(records, incident_ids, values):
+    """(baseline frame, baseline count, new frame, deltas) after the same bulk edit both ways"""
+    df = pd.DataFrame(records)
+    edit_cols = list(df.columns)
+    form = {col: None if col in DATETIME_COLUMNS else "" for col in edit_cols}
+    count = baseline_bulk(df, incident_ids, edit_cols, {**form, **values})
+
+    typed = apply_schema(pd.DataFrame(records))
+    deltas = bulk_edit_deltas(typed, incident_ids, values)
+    return saved(df), count, saved(apply_changes(typed, deltas)), deltas
+
+
+def cells(deltas):
+    return set(zip(deltas["incident_id"], deltas["column"]))
+
+
+# --- Save Table Changes ---
+def test_unchanged_rows_save_nothing(records):
+    before, _, after, deltas = run_save(records, {})
+    assert len(deltas) == 0
+    pd.testing.assert_frame_equal(after, before)
+    pd.testing.assert_frame_equal(after, saved(pd.DataFrame(records)))
+
+
+def test_nan_and_none_are_the_same_blank(records):
+    changes = {
+        (2, "actual_time_spent_in_minutes"): None,  # NaN before, None after
+        (3, "failure_reason"): "",  # None before, "" after
+        (3, "failure_caused_by"): None,  # a value cleared before any change in the row
+        (2, "failure_reason"): "Edited reason",  # a value where there was one
+        (4, "record_updated_on"): pd.NaT,
+    }
+    before, _, after, deltas = run_save(records, changes)
+    pd.testing.assert_frame_equal(after, before)
+    assert cells(deltas) == {(records[2]["incident_id"], "failure_reason")}
+
+
+def test_date_edits(records):
+    changes = {(0, "record_updated_on"): NEW_DATE, (4, "record_updated_on"): NEW_DATE}
+    before, _, after, deltas = run_save(records, changes)
+    pd.testing.assert_frame_equal(after, before)
+    assert cells(deltas) == {(records[0]["incident_id"], "record_updated_on"),
+                             (records[4]["incident_id"], "record_updated_on")}
+    assert (deltas["value"] == NEW_DATE).all()
+
+
+def test_categorical_edits(records):
+    changes = {(0, "custodian_team"): "Network", (1, "custodian_team"): "Platform", (1, "failure_category"): "Database"}
+    before, _, after, deltas = run_save(records, changes)
+    pd.testing.assert_frame_equal(after, before)
+    assert after.loc[1, "custodian_team"] == "Platform"
+
+
+def test_multi_row_edits(records):
+    changes = {}
+    for row in (0, 5, 6, 11, 19):
+        changes[(row, "comments")] = f"Reviewed {row}"
+        changes[(row, "actual_time_spent_in_minutes")] = 10.0 + row
+    changes[(5, "prior_notification")] = "Yes" if records[5]["prior_notification"] != "Yes" else "No"
+    before, _, after, deltas = run_save(records, changes)
+    pd.testing.assert_frame_equal(after, before)
+    ids = {records[row]["incident_id"] for row in (0, 5, 6, 11, 19)}
+    assert set(deltas["incident_id"]) == ids
+
+
+# Intended deviations from the original save loop
+def test_only_changed_rows_count_as_updated(records):
+    """The original compared ISO strings with Timestamps, so every row with a date counted as updated"""
+    _, count, _, deltas = run_save(records, {(7, "comments"): "Edited"})
+    assert count == len(records)
+    assert deltas["incident_id"].nunique() == 1
+
+
+def test_blank_edits_never_clear_a_value(records):
+    """After the first changed column the original wrote every later cell, blanks included"""
+    before, _, after, deltas = run_save(records, {(7, "comments"): None})
+    assert pd.isna(before.loc[7, "comments"])
+    assert after.loc[7, "comments"] == records[7]["comments"]
+    assert len(deltas) == 0
+
+
+# --- Bulk edit ---
+def test_bulk_edit_matches_baseline(records):
+    ids = [records[i]["incident_id"] for i in (0, 2, 3, 9)]
+    values = {"custodian_team": "Platform", "actual_time_spent_in_minutes": "42", "failure_reason": "Disk Full"}
+    before, count, after, deltas = run_bulk(records, ids, values)
+    pd.testing.assert_frame_equal(after, before)
+    assert count == deltas["incident_id"].nunique() == len(ids)
+
+
+def test_bulk_edit_skips_blank_and_invalid_values(records):
+    ids = [records[i]["incident_id"] for i in (1, 2)]
+    values = {"comments": "  ", "actual_time_spent_in_minutes": "abc", "failure_category": ""}
+    before, count, after, deltas = run_bulk(records, ids, values)
+    pd.testing.assert_frame_equal(after, before)
+    assert count == 0 and len(deltas) == 0
+
+
+def test_bulk_edit_dates(records):
+    ids = [records[i]["incident_id"] for i in (0, 4)]
+    values = {"record_updated_on": NEW_DATE.to_pydatetime()}
+    before, _, after, deltas = run_bulk(records, ids, values)
+    pd.testing.assert_frame_equal(after, before)
+    assert cells(deltas) == {(i, "record_updated_on") for i in ids}
+
+
+def test_bulk_edit_same_date_is_not_a_change(records):
+    """Intended deviation: the original compared the stored string with a datetime, so it always rewrote"""
+    same = pd.Timestamp(records[0]["record_updated_on"]).to_pydatetime()
+    before, count, after, deltas = run_bulk(records, [records[0]["incident_id"]], {"record_updated_on": same})
+    pd.testing.assert_frame_equal(after, before)
+    assert count == 1
+    assert len(deltas) == 0
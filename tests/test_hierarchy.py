@@ -0,0 +1,51 @@
+"""Incident graph moved along by saves against one rebuilt from the saved rows."""
+import numpy as np
+import pandas as pd
+
+from change_log import apply_changes
+from hierarchy import HIERARCHY_COLUMNS, IncidentGraph
+from incident_data import apply_schema
+
+
+def deltas(*cells):
+    return pd.DataFrame(list(cells), columns=["incident_id", "column", "value"])
+
+
+def assert_same_graph(a, b):
+    for name in ["parent", "depth", "size", "dangling", "cycle"]:
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+    for name in ["minutes", "subtree_minutes", "chain_minutes"]:
+        assert np.allclose(getattr(a, name), getattr(b, name)), name
+    for pos in range(len(a.parent)):
+        assert set(a.subtree(pos).tolist()) == set(b.subtree(pos).tolist()), pos
+
+
+def test_advance_matches_a_rebuild(records):
+    df = apply_schema(pd.DataFrame(records))[HIERARCHY_COLUMNS]
+    numbers = df["incident_number"].tolist()
+    ids = df["incident_id"].tolist()
+    edits = deltas(
+        (ids[1], "parent_incident_number", numbers[0]),
+        (ids[2], "parent_incident_number", numbers[1]),
+        (ids[0], "parent_incident_number", numbers[5]),
+        (ids[2], "actual_time_spent_in_minutes", 42.0),
+    )
+    moved = IncidentGraph(df).advance(edits)
+    assert_same_graph(moved, IncidentGraph(apply_changes(df.copy(), edits)))
+    assert moved.ancestors(2) == [1, 0, 5]
+
+
+def test_advance_skips_unknown_incidents(records):
+    df = apply_schema(pd.DataFrame(records))[HIERARCHY_COLUMNS]
+    unknown = int(df["incident_id"].max()) + 1
+    ids = df["incident_id"].tolist()
+    edits = deltas(
+        # A deleted incident, and a parent number nothing holds
+        (unknown, "parent_incident_number", df["incident_number"].iloc[0]),
+        (unknown, "actual_time_spent_in_minutes", 10.0),
+        (ids[3], "parent_incident_number", "INC-DELETED"),
+    )
+    moved = IncidentGraph(df).advance(edits)
+    rebuilt = IncidentGraph(apply_changes(df.copy(), edits))
+    assert_same_graph(moved, rebuilt)
+    assert moved.dangling[3] and moved.parent[3] == -1
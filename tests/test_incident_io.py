@@ -0,0 +1,35 @@
+"""incident_io's import command into a SQLite table."""
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from incident_io import main
+
+SAMPLE = str(Path(__file__).resolve().parent.parent / "apps" / "app3" / "data.json")
+
+
+def rows(db, table="INCIDENTS"):
+    return sqlite3.connect(db).execute(f"SELECT COUNT(*), MAX(row_version) FROM {table}").fetchone()
+
+
+def test_import_into_a_new_table(tmp_path, capsys):
+    db = str(tmp_path / "incidents.db")
+    main(["import", SAMPLE, "--sqlite", db, "--chunk-rows", "30"])
+    assert "Imported 100 incidents into INCIDENTS" in capsys.readouterr().out
+    assert rows(db) == (100, 0)
+
+
+def test_import_refuses_a_table_that_holds_incidents(tmp_path, capsys):
+    db = str(tmp_path / "incidents.db")
+    main(["import", SAMPLE, "--sqlite", db])
+    sqlite3.connect(db).execute("UPDATE INCIDENTS SET row_version = 3 WHERE incident_id = 1").connection.commit()
+    with pytest.raises(SystemExit) as error:
+        main(["import", SAMPLE, "--sqlite", db])
+    assert error.value.code == 2
+    assert "Table INCIDENTS already holds incidents" in capsys.readouterr().err
+    assert rows(db) == (100, 3)
+
+    # Another table in the same database is fine
+    main(["import", SAMPLE, "--sqlite", db, "--table", "INCIDENTS_COPY"])
+    assert rows(db, "INCIDENTS_COPY") == (100, 0)
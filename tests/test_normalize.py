@@ -0,0 +1,122 @@
+"""Record validation shared by imports (`normalize`) and saves (`check_edits`, `hold_invalid`)."""
+import pandas as pd
+
+from incident_data import apply_schema
+from normalize import PROBLEM_COLUMNS, check_edits, hold_invalid, normalize
+
+
+def problems_of(problems):
+    return set(zip(problems["row"], problems["column"], problems["problem"]))
+
+
+def deltas(*cells):
+    return pd.DataFrame(list(cells), columns=["incident_id", "column", "value"])
+
+
+# --- Imports ---
+def test_clean_records_pass(records):
+    df, problems = normalize(pd.DataFrame(records))
+    assert len(problems) == 0 and list(problems.columns) == PROBLEM_COLUMNS
+    pd.testing.assert_frame_equal(df, apply_schema(pd.DataFrame(records)))
+
+
+def test_missing_ids_are_dropped(records):
+    records[1]["incident_id"] = None
+    records[5]["incident_id"] = "x"
+    records[6]["incident_id"] = 7.5
+    del records[7]["incident_id"]
+    df, problems = normalize(pd.DataFrame(records))
+    assert problems_of(problems) == {(row, "incident_id", "missing or not an integer") for row in (1, 5, 6, 7)}
+    assert problems["incident_id"].isna().all()
+    assert len(df) == len(records) - 4
+
+
+def test_repeated_ids_keep_the_first(records):
+    records[9]["incident_id"] = records[3]["incident_id"]
+    df, problems = normalize(pd.DataFrame(records))
+    assert problems_of(problems) == {(9, "incident_id", "repeated incident_id")}
+    assert df["incident_id"].is_unique
+    assert df.loc[df["incident_id"] == records[3]["incident_id"], "incident_number"].tolist() == [
+        records[3]["incident_number"]
+    ]
+
+
+def test_bad_dates_become_missing(records):
+    missing = apply_schema(pd.DataFrame(records))["record_created_on"].isna()
+    records[2]["record_created_on"] = "yesterday"
+    records[8]["record_updated_on"] = "2024-13-45T00:00:00"
+    df, problems = normalize(pd.DataFrame(records))
+    assert problems_of(problems) == {(2, "record_created_on", "not a date"), (8, "record_updated_on", "not a date")}
+    assert problems.loc[problems["row"] == 2, "value"].tolist() == ["yesterday"]
+    assert (df["record_created_on"].isna() == (missing | (df.index == 2))).all()
+
+
+def test_sub_category_outside_its_category(records):
+    records[0].update(failure_category="Hardware", failure_sub_category="Phishing")
+    records[1].update(failure_category="Weather", failure_sub_category="Rain")
+    records[2].update(failure_category="Security", failure_sub_category=None)
+    df, problems = normalize(pd.DataFrame(records))
+    assert problems_of(problems) == {
+        (0, "failure_sub_category", "not a sub-category of its category"),
+        (1, "failure_category", "not in the taxonomy"),
+    }
+    # Kept as entered for review
+    assert df.loc[0, "failure_sub_category"] == "Phishing"
+
+
+def test_non_numeric_and_negative_minutes(records):
+    records[0]["actual_time_spent_in_minutes"] = "abc"
+    records[1]["actual_time_spent_in_minutes"] = -5
+    records[3]["actual_time_spent_in_minutes"] = "12.5"
+    df, problems = normalize(pd.DataFrame(records))
+    assert problems_of(problems) == {
+        (0, "actual_time_spent_in_minutes", "not a number"),
+        (1, "actual_time_spent_in_minutes", "negative"),
+    }
+    assert pd.isna(df.loc[0, "actual_time_spent_in_minutes"])
+    assert df.loc[3, "actual_time_spent_in_minutes"] == 12.5
+
+
+# --- Saves ---
+def test_empty_deltas(records):
+    rows = apply_schema(pd.DataFrame(records))
+    problems = check_edits(rows, deltas())
+    assert len(problems) == 0 and "row" not in problems.columns
+    clean, held = hold_invalid(rows, deltas())
+    assert len(clean) == 0 and len(held) == 0
+
+
+def test_check_edits_sees_the_values_after_the_edit(records):
+    rows = apply_schema(pd.DataFrame(records))
+    first, second = records[0]["incident_id"], records[1]["incident_id"]
+    problems = check_edits(rows, deltas(
+        (first, "actual_time_spent_in_minutes", "abc"),
+        (second, "failure_category", "Weather"),
+        (second, "comments", "not checked"),
+    ))
+    assert set(zip(problems["incident_id"], problems["column"], problems["problem"])) == {
+        (first, "actual_time_spent_in_minutes", "not a number"),
+        (second, "failure_category", "not in the taxonomy"),
+    }
+
+
+def test_hold_invalid_saves_only_the_clean_cells(records):
+    rows = apply_schema(pd.DataFrame(records))
+    ids = [r["incident_id"] for r in records[:3]]
+    category = records[2]["failure_category"]
+    other = next(c for c in ("Hardware", "Security") if c != category)
+    edits = deltas(
+        (ids[0], "actual_time_spent_in_minutes", "-5"),
+        (ids[0], "comments", "Reviewed"),
+        (ids[1], "actual_time_spent_in_minutes", "30"),
+        # Only the category is edited, but it no longer fits the stored sub-category
+        (ids[2], "failure_category", other),
+    )
+    clean, held = hold_invalid(rows, edits)
+    assert list(zip(clean["incident_id"], clean["column"])) == [
+        (ids[0], "comments"), (ids[1], "actual_time_spent_in_minutes")
+    ]
+    assert list(zip(held["incident_id"], held["column"], held["problem"])) == [
+        (ids[0], "actual_time_spent_in_minutes", "negative"),
+        (ids[2], "failure_category", "not a sub-category of its category"),
+    ]
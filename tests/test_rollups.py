@@ -0,0 +1,33 @@
+"""Analytics cube and the sidebar scope it is summarized under."""
+import pandas as pd
+
+from incident_data import apply_schema
+from rollups import contributions, sidebar_scope, summarize
+from tagging import TaggedState
+
+
+def cube_of(records):
+    df = apply_schema(pd.DataFrame(records))
+    df["tagged"] = TaggedState(df).tagged
+    return df, contributions(df)
+
+
+def test_no_teams_picked_means_every_team(records):
+    df, cube = cube_of(records)
+    everything = summarize(cube, [], teams=None).iloc[0]
+    assert everything["incidents"] == len(df)
+    assert summarize(cube, [], teams=[]).iloc[0]["incidents"] == 0
+
+    # What the dashboard passes for a cleared team picker: analytics match the table
+    scoped = summarize(cube, [], **sidebar_scope([], None)).iloc[0]
+    pd.testing.assert_series_equal(scoped, everything)
+    assert summarize(cube, ["custodian_team"], **sidebar_scope([], None))["incidents"].sum() == len(df)
+
+
+def test_picked_teams_and_tagged_state_narrow_the_cube(records):
+    df, cube = cube_of(records)
+    team = records[0]["custodian_team"]
+    for tagged in (None, True, False):
+        expected = (df["custodian_team"] == team) & (df["tagged"] == tagged if tagged is not None else True)
+        scoped = summarize(cube, [], **sidebar_scope([team], tagged)).iloc[0]
+        assert scoped["incidents"] == int(expected.sum())
@@ -0,0 +1,38 @@
+"""SharedStore catching up on changes written by another process."""
+import json
+
+import pandas as pd
+
+from catalog import ValueCatalog
+from change_log import locked, write_changes
+from shared_store import SharedStore
+
+COLUMNS = ["custodian_team", "failure_category", "comments"]
+
+
+def test_catch_up_on_batches_editing_one_cell(records, tmp_path):
+    path = str(tmp_path / "data.json")
+    with open(path, "w") as f:
+        json.dump(records, f)
+    store = SharedStore(path)
+    snap = store.snapshot()
+    for col in COLUMNS:
+        snap.catalog.values(snap.df, col)  # counted before the outside writes
+
+    first, second = records[0]["incident_id"], records[1]["incident_id"]
+    with locked(path):
+        # Another process: two saves, the second overwriting the first's cell
+        write_changes(path, [(first, "custodian_team", "X1"), (second, "comments", "Interim")])
+        write_changes(path, [(first, "custodian_team", "X2"), (second, "comments", "Final")])
+
+    snap = store.snapshot()
+    assert snap.df.loc[snap.df["incident_id"] == first, "custodian_team"].tolist() == ["X2"]
+    fresh = ValueCatalog(snap.df)
+    for col in COLUMNS:
+        assert snap.catalog.values(snap.df, col) == fresh.values(snap.df, col)
+        for value in fresh.values(snap.df, col):
+            assert snap.catalog.count(snap.df, col, value) == fresh.count(snap.df, col, value), (col, value)
+    assert snap.catalog.count(snap.df, "custodian_team", "X1") == 0
+    assert snap.catalog.count(snap.df, "custodian_team", records[0]["custodian_team"]) == int(
+        (pd.DataFrame(records)["custodian_team"] == records[0]["custodian_team"]).sum() - 1
+    )
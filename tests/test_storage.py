@@ -0,0 +1,165 @@
+"""SqlStorage on its SQLite stand-in against the in-memory JsonStorage.
+
+Both backends are loaded with the same incidents: the pushed-down WHERE,
+ORDER BY and LIMIT queries must return what the in-memory indexes do,
+keyset chunks must cover every match exactly once, and saves must never
+overwrite an incident changed after the version they were based on.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from storage import SQLITE, Filters, JsonStorage, SqlStorage, tagged_sql
+from tagging import EMPTY_TOKENS, TaggedState
+
+SAMPLE = Path(__file__).resolve().parent.parent / "apps" / "app3" / "data.json"
+
+FILTERS = [
+    Filters(),
+    Filters(tagged=True),
+    Filters(tagged=False),
+    Filters(isin=[("custodian_team", ["DevOps", "Security"]), ("failure_category", ["Software"])]),
+    Filters(tagged=True, date_ranges={"record_created_on": ("2022-01-01", "2023-12-31")}),
+    Filters(text="firmware"),
+    Filters(text='"query load" high', isin=[("prior_notification", ["No"])]),
+]
+
+
+@pytest.fixture
+def incidents():
+    """All sample incidents, a few of them untagged or holding only empty tokens"""
+    with open(SAMPLE, "r") as f:
+        records = json.load(f)
+    for i, record in enumerate(records[:4]):
+        for col in record:
+            if col not in ("incident_id", "incident_number"):
+                record[col] = None
+        if i:
+            # Values that only look filled: untagged all the same
+            record["comments"] = EMPTY_TOKENS[i] if i < len(EMPTY_TOKENS) else " nan "
+    records[4] = {col: None for col in records[4]} | {
+        "incident_id": records[4]["incident_id"], "incident_number": records[4]["incident_number"],
+        "actual_time_spent_in_minutes": 5.0,
+    }
+    return records
+
+
+@pytest.fixture
+def backends(incidents, tmp_path):
+    """(JsonStorage, SqlStorage) holding the same incidents"""
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(incidents))
+    json_storage = JsonStorage(str(path))
+    sql = SqlStorage(sqlite3.connect(tmp_path / "incidents.db", check_same_thread=False), "incidents", SQLITE)
+    sql.create_table(json_storage.view().df)
+    return json_storage, sql
+
+
+def ids(frame):
+    return frame["incident_id"].tolist()
+
+
+# --- Pushed-down queries ---
+@pytest.mark.parametrize("filters", FILTERS, ids=lambda f: repr(f.key()))
+def test_where_pushdown_matches_in_memory_filters(backends, filters):
+    json_view, sql_view = (storage.view() for storage in backends)
+    assert sql_view.count_matching(filters) == json_view.count_matching(filters)
+    assert ids(sql_view.page(filters)) == ids(json_view.page(filters))
+    assert sql_view.matching_ids(filters, limit=10) == json_view.matching_ids(filters, limit=10)
+    for sort_by, descending in [("actual_time_spent_in_minutes", True), ("custodian_team", False)]:
+        page = dict(sort_by=sort_by, descending=descending, offset=5, limit=10)
+        assert ids(sql_view.page(filters, **page)) == ids(json_view.page(filters, **page))
+
+
+@pytest.mark.parametrize("filters", FILTERS[:4], ids=lambda f: repr(f.key()))
+@pytest.mark.parametrize("chunk_rows", [1, 7, 50, 1000])
+def test_keyset_chunks_skip_and_repeat_nothing(backends, filters, chunk_rows):
+    json_view, sql_view = (storage.view() for storage in backends)
+    chunks = list(sql_view.chunks(filters, chunk_rows=chunk_rows))
+    assert all(0 < len(chunk) <= chunk_rows for chunk in chunks)
+    chunked = [i for chunk in chunks for i in ids(chunk)]
+    assert chunked == sorted(set(chunked))
+    assert chunked == sorted(ids(json_view.page(filters)))
+
+
+def test_tagged_sql_matches_empty_mask(backends):
+    df = backends[0].view().df.drop(columns="tagged")
+    sql = backends[1]
+    tagged = set(i for i, in sql.fetch(f"SELECT incident_id FROM incidents WHERE {tagged_sql()}"))
+    untagged = set(i for i, in sql.fetch(f"SELECT incident_id FROM incidents WHERE NOT {tagged_sql()}"))
+    expected = TaggedState(df).tagged
+    assert tagged == set(df.loc[expected, "incident_id"])
+    assert untagged == set(df.loc[~expected, "incident_id"])
+    # Empty tokens only leave an incident untagged; one time spent tags it
+    assert set(df["incident_id"].iloc[:4]) <= untagged
+    assert df["incident_id"].iloc[4] in tagged
+
+
+# --- Saves ---
+def deltas(*cells):
+    return pd.DataFrame(cells, columns=["incident_id", "column", "value"])
+
+
+def comments(sql, incident_id):
+    return sql.fetch("SELECT comments, row_version FROM incidents WHERE incident_id = ?", [incident_id])[0]
+
+
+def test_merge_guard_refuses_stale_rows(backends):
+    sql = backends[1]
+    base = sql.version()
+    first = sql.commit(deltas((10, "comments", "first")), base)
+    assert first.version == base + 1 and len(first.applied) == 1
+
+    # Based on the version before the first save: incident 10 is refused, 11 goes through
+    second = sql.commit(deltas((10, "comments", "second"), (11, "comments", "second")), base)
+    assert second.conflicts["incident_id"].tolist() == [10]
+    assert second.applied["incident_id"].tolist() == [11]
+    assert comments(sql, 10) == ("first", first.version)
+    assert comments(sql, 11) == ("second", second.version)
+
+    # The MERGE itself skips rows changed after its base, whatever the caller checked
+    cur = sql.connection.cursor()
+    cur.execute(*SQLITE.merge("incidents", "comments", [(10, "merged")], second.version + 1, base))
+    sql.connection.commit()
+    assert comments(sql, 10) == ("first", first.version)
+
+
+def test_refused_save_takes_no_version(backends):
+    sql = backends[1]
+    first = sql.commit(deltas((10, "comments", "first")), sql.version())
+    refused = sql.commit(deltas((10, "comments", "late")), first.version - 1)
+    assert len(refused.applied) == 0 and refused.version == first.version == sql.version()
+    assert sql.commit(deltas((12, "comments", "next")), sql.version()).version == first.version + 1
+
+
+def test_concurrent_saves_get_distinct_versions(backends, tmp_path):
+    """A save waits for one in flight elsewhere, then sees its rows as changed"""
+    sql = backends[1]
+    base = sql.version()
+    sql.commit(deltas((20, "comments", "warm-up")), base)
+    base = sql.version()
+
+    other = SqlStorage(sqlite3.connect(tmp_path / "incidents.db", timeout=10), "incidents", SQLITE)
+    cur = other.connection.cursor()
+    version = other._next_version(cur)  # another process, mid-save
+    cur.execute(*SQLITE.merge("incidents", "comments", [(21, "other")], version, base))
+
+    results = []
+    mine = deltas((21, "comments", "mine"), (22, "comments", "mine"))
+    save = threading.Thread(target=lambda: results.append(sql.commit(mine, base)))
+    save.start()
+    time.sleep(0.3)
+    assert save.is_alive(), "the save did not wait for the one in flight"
+    other.connection.commit()
+    save.join(10)
+
+    assert results[0].version == version + 1
+    assert results[0].conflicts["incident_id"].tolist() == [21]
+    assert comments(sql, 21) == ("other", version)
+    assert comments(sql, 22) == ("mine", version + 1)
+    assert sql.fetch("SELECT COUNT(*) FROM incidents_version") == [(1,)]